@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+
+from django import forms
+from django.utils.translation import ugettext_lazy as _
+
+from category.models import Category
+from transaction.models import Transaction
+
+
+class ResourceForm(forms.Form):
+    """
+    The parameters every list accepts, fields is a comma separated list.
+    """
+    MAX_LIMIT = 500
+
+    fields = forms.CharField(required=False)
+    cursor = forms.CharField(required=False)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT)
+
+    def __init__(self, data, allowed_fields, default_fields):
+        super(ResourceForm, self).__init__(data)
+        self.allowed_fields = allowed_fields
+        self.default_fields = default_fields
+
+    def clean_fields(self):
+        if not self.cleaned_data['fields']:
+            return list(self.default_fields)
+
+        fields = [field.strip() for field in self.cleaned_data['fields'].split(',') if field.strip()]
+        unknown = [field for field in fields if field not in self.allowed_fields]
+
+        if unknown:
+            raise forms.ValidationError(_('Unknown fields: %s.') % ', '.join(unknown))
+
+        return fields
+
+    def filter(self, queryset):
+        return queryset
+
+
+class TransactionFilterForm(ResourceForm):
+    start_date = forms.DateField(required=False)
+    end_date = forms.DateField(required=False)
+    category = forms.ModelChoiceField(queryset=Category.objects.all(), to_field_name='slug', required=False)
+    type = forms.ChoiceField(choices=Transaction.TRANSACTION_TYPES, required=False)
+
+    def filter(self, queryset):
+        if self.cleaned_data['start_date']:
+            queryset = queryset.filter(date__gte=self.cleaned_data['start_date'])
+
+        if self.cleaned_data['end_date']:
+            queryset = queryset.filter(date__lte=self.cleaned_data['end_date'])
+
+        if self.cleaned_data['category']:
+            queryset = queryset.filter(category=self.cleaned_data['category'])
+
+        if self.cleaned_data['type']:
+            queryset = queryset.filter(transaction_type=self.cleaned_data['type'])
+
+        return queryset
+
+
+class BudgetFilterForm(ResourceForm):
+    start_date = forms.DateField(required=False)
+    end_date = forms.DateField(required=False)
+
+    def filter(self, queryset):
+        if self.cleaned_data['start_date']:
+            queryset = queryset.filter(start_date__gte=self.cleaned_data['start_date'])
+
+        if self.cleaned_data['end_date']:
+            queryset = queryset.filter(start_date__lte=self.cleaned_data['end_date'])
+
+        return queryset
+
+
+class EstimateFilterForm(ResourceForm):
+    category = forms.ModelChoiceField(queryset=Category.objects.all(), to_field_name='slug', required=False)
+
+    def filter(self, queryset):
+        if self.cleaned_data['category']:
+            queryset = queryset.filter(category=self.cleaned_data['category'])
+
+        return queryset
@@ -0,0 +1,226 @@
+from __future__ import unicode_literals
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from model_mommy import mommy
+
+from base.utils import BaseTestCase
+
+
+class ApiTestCase(BaseTestCase):
+    def get(self, url, status=200, **params):
+        self.login()
+        response = self.client.get(url, params)
+
+        self.assertEqual(status, response.status_code)
+        return response
+
+    def get_json(self, url, status=200, **params):
+        response = self.get(url, status, **params)
+
+        self.assertEqual('application/json', response['Content-Type'])
+        return json.loads(response.content.decode('utf-8'))
+
+
+class TransactionListTest(ApiTestCase):
+    url = reverse('api:transaction_list')
+
+    def test_list_with_the_default_fields(self):
+        category = mommy.make('Category')
+        transaction = mommy.make('Transaction', category=category, amount=Decimal('10.5'),
+                                 date=date(2014, 1, 10), notes='Spam')
+        mommy.make('Transaction', is_deleted=True)
+
+        data = self.get_json(self.url)
+
+        self.assertEqual([{'id': transaction.pk,
+                           'transaction_type': 'expense',
+                           'category': category.pk,
+                           'notes': 'Spam',
+                           'amount': '10.50',
+                           'date': '2014-01-10'}], data['results'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_fields_projection(self):
+        category = mommy.make('Category', name='Eggs')
+        mommy.make('Transaction', category=category, amount=Decimal('10.0'))
+
+        with CaptureQueriesContext(connection) as context:
+            data = self.get_json(self.url, fields='amount,category__name')
+
+        self.assertEqual([{'amount': '10.00', 'category__name': 'Eggs'}], data['results'])
+
+        page_query = [query['sql'] for query in context.captured_queries if 'LIMIT' in query['sql']][0]
+        self.assertNotIn('"notes"', page_query)
+
+    def test_unknown_fields(self):
+        data = self.get_json(self.url, status=400, fields='amount,password')
+
+        self.assertIn('password', data['errors']['fields'][0])
+
+    def test_filters(self):
+        from transaction.models import Transaction
+
+        category = mommy.make('Category')
+        expected = mommy.make('Transaction', category=category, date=date(2014, 1, 10))
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10))
+        mommy.make('Transaction', date=date(2014, 1, 10))
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), transaction_type=Transaction.INCOME)
+
+        data = self.get_json(self.url, fields='id', start_date='2014-01-01', end_date='2014-01-31',
+                             category=category.slug, type='expense')
+
+        self.assertEqual([{'id': expected.pk}], data['results'])
+
+    def test_cursor_pagination(self):
+        transactions = [mommy.make('Transaction', date=date(2014, 1, day)) for day in range(1, 4)]
+
+        first_page = self.get_json(self.url, fields='id', limit=2)
+        second_page = self.get_json(self.url, fields='id', limit=2, cursor=first_page['next_cursor'])
+
+        self.assertEqual([transactions[2].pk, transactions[1].pk], [row['id'] for row in first_page['results']])
+        self.assertEqual([transactions[0].pk], [row['id'] for row in second_page['results']])
+        self.assertIsNone(second_page['next_cursor'])
+        self.assertIsNotNone(second_page['previous_cursor'])
+
+    def test_invalid_cursor(self):
+        self.get_json(self.url, status=400, cursor='spam')
+
+    def test_not_modified(self):
+        mommy.make('Transaction')
+        response = self.get(self.url)
+
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEqual(304, self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code)
+        self.assertEqual(304, self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code)
+
+    def test_etag_changes_with_the_rows(self):
+        transaction = mommy.make('Transaction')
+        etag = self.get(self.url)['ETag']
+
+        transaction.delete()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_etag_changes_with_the_categories(self):
+        category = mommy.make('Category', name='Spam')
+        mommy.make('Transaction', category=category)
+        etag = self.get(self.url, fields='id,category__name')['ETag']
+
+        category.name = 'Eggs'
+        category.save()
+
+        response = self.client.get(self.url, {'fields': 'id,category__name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('Eggs', json.loads(response.content.decode('utf-8'))['results'][0]['category__name'])
+
+    def test_etag_depends_on_the_parameters(self):
+        mommy.make('Transaction')
+
+        self.assertNotEqual(self.get(self.url)['ETag'], self.get(self.url, fields='id')['ETag'])
+
+    def test_anonymous_user(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(401, response.status_code)
+
+    def test_only_safe_methods(self):
+        self.login()
+
+        self.assertEqual(405, self.client.post(self.url).status_code)
+
+
+class CategoryListTest(ApiTestCase):
+    def test_list(self):
+        category = mommy.make('Category', name='Spam')
+
+        data = self.get_json(reverse('api:category_list'))
+
+        self.assertEqual([{'id': category.pk, 'name': 'Spam', 'slug': category.slug}], data['results'])
+
+
+class BudgetListTest(ApiTestCase):
+    def test_list(self):
+        first = mommy.make('Budget', start_date=date(2014, 1, 1))
+        second = mommy.make('Budget', start_date=date(2014, 6, 1))
+
+        data = self.get_json(reverse('api:budget_list'), fields='slug,start_date')
+
+        self.assertEqual([{'slug': second.slug, 'start_date': '2014-06-01'},
+                          {'slug': first.slug, 'start_date': '2014-01-01'}], data['results'])
+
+    def test_estimates(self):
+        budget = mommy.make('Budget')
+        estimate = mommy.make('BudgetEstimate', budget=budget, amount=Decimal('100.0'))
+        mommy.make('BudgetEstimate')
+
+        data = self.get_json(reverse('api:estimate_list', kwargs={'slug': budget.slug}))
+
+        self.assertEqual([{'id': estimate.pk, 'category': estimate.category_id, 'amount': '100.00'}], data['results'])
+
+    def test_estimates_of_an_unknown_budget(self):
+        self.get_json(reverse('api:estimate_list', kwargs={'slug': 'spam'}), status=404)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'api-summary-tests'}})
+class SummaryTest(ApiTestCase):
+    def setUp(self):
+        from base.cache import get_budget_cache
+
+        super(SummaryTest, self).setUp()
+        get_budget_cache().clear()
+
+    def test_month_summary(self):
+        category = mommy.make('Category', name='Spam')
+        budget = mommy.make('Budget', start_date=date(2014, 1, 1))
+        mommy.make('BudgetEstimate', budget=budget, category=category, amount=Decimal('100.0'))
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10), amount=Decimal('10.0'))
+
+        data = self.get_json(reverse('api:summary_month', kwargs={'year': 2014, 'month': 2}))
+
+        self.assertEqual(budget.slug, data['budget']['slug'])
+        self.assertEqual('2014-02-28', data['end_date'])
+        self.assertEqual('100.00', data['estimated_total'])
+        self.assertEqual('10.00', data['actual_total'])
+        self.assertEqual([{'id': category.pk, 'name': 'Spam', 'slug': category.slug,
+                           'estimated': '100.00', 'actual': '10.00'}], data['categories'])
+
+    def test_year_summary(self):
+        category = mommy.make('Category')
+        budget = mommy.make('Budget', start_date=date(2014, 1, 1))
+        mommy.make('BudgetEstimate', budget=budget, category=category, amount=Decimal('100.0'))
+
+        data = self.get_json(reverse('api:summary_year', kwargs={'year': 2014}))
+
+        self.assertEqual('1200.00', data['estimated_total'])
+
+    def test_summary_is_not_modified_until_its_period_changes(self):
+        category = mommy.make('Category')
+        mommy.make('Budget', start_date=date(2014, 1, 1))
+        url = reverse('api:summary_month', kwargs={'year': 2014, 'month': 2})
+        etag = self.get(url)['ETag']
+
+        mommy.make('Transaction', category=category, date=date(2014, 3, 10))
+        self.assertEqual(304, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10))
+        self.assertEqual(200, self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+
+    def test_summary_without_budget(self):
+        self.get_json(reverse('api:summary_month', kwargs={'year': 2014, 'month': 2}), status=404)
+
+    def test_report(self):
+        mommy.make('Transaction', date=date(2014, 2, 10), amount=Decimal('10.0'))
+
+        data = self.get_json(reverse('api:summary_report'), start_date='2014-01-01', end_date='2014-02-28')
+
+        self.assertEqual(['0.00', '10.00'], data['categories'][0]['actual'])
@@ -0,0 +1,14 @@
+from __future__ import unicode_literals
+
+from django.conf.urls import patterns, url
+
+urlpatterns = patterns(
+    'api.views',
+    url(r'^transactions/$', 'transaction_list', name='transaction_list'),
+    url(r'^categories/$', 'category_list', name='category_list'),
+    url(r'^budgets/$', 'budget_list', name='budget_list'),
+    url(r'^budgets/(?P<slug>[\w-]+)/estimates/$', 'estimate_list', name='estimate_list'),
+    url(r'^summaries/report/$', 'summary_report', name='summary_report'),
+    url(r'^summaries/(?P<year>\d{4})/$', 'summary', name='summary_year'),
+    url(r'^summaries/(?P<year>\d{4})/(?P<month>\d{1,2})/$', 'summary', name='summary_month'),
+)
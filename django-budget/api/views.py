@@ -0,0 +1,222 @@
+"""
+Read-only JSON API.
+
+The lists return only the requested fields, read with values() so no model
+instances or related rows are loaded, a page at a time by cursor. Every
+response carries an ETag, and the lists a Last-Modified derived from the
+updated timestamp of their rows, so clients can revalidate with a
+conditional request.
+"""
+
+from __future__ import unicode_literals
+
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.translation import ugettext as _
+from django.views.generic import View
+
+from base.pagination import CursorPaginator, InvalidCursor
+from base.views import conditional_response
+from budget.models import Budget, BudgetEstimate
+from category.models import Category
+from summary.forms import SummaryReportForm
+from summary.reports import category_month_report, month_period, period_summary, period_versions, report_as_dict, year_period
+from transaction.models import Transaction
+from .forms import BudgetFilterForm, EstimateFilterForm, ResourceForm, TransactionFilterForm
+
+
+class ApiView(View):
+    http_method_names = ['get', 'head']
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated():
+            return self.error(401, _('Authentication required.'))
+
+        return super(ApiView, self).dispatch(request, *args, **kwargs)
+
+    def render_json(self, data, status=200):
+        return HttpResponse(json.dumps(data, cls=DjangoJSONEncoder),
+                            content_type='application/json',
+                            status=status)
+
+    def error(self, status, errors):
+        return self.render_json({'errors': errors}, status=status)
+
+
+class ResourceListView(ApiView):
+    """
+    A list of rows of the model, filtered by the form.
+    """
+    model = None
+    form_class = ResourceForm
+    allowed_fields = ()
+    default_fields = ()
+    ordering = ('-id',)
+    per_page = 50
+    # Foreign keys whose fields can be requested, their latest updated is a
+    # validator too, so renaming a category changes the lists showing it.
+    related_validators = ()
+
+    def get_queryset(self):
+        """
+        Every row, including the deleted ones, so deleting a row changes the
+        validators of the list.
+        """
+        return self.model.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        form = self.form_class(request.GET, self.allowed_fields, self.default_fields)
+
+        if not form.is_valid():
+            return self.error(400, form.errors)
+
+        queryset = form.filter(self.get_queryset())
+        related = ['%s__updated' % name for name in self.related_validators]
+        validators = queryset.aggregate(Max('updated'), Count('id'), *[Max(name) for name in related])
+        updated = [validators['%s__max' % name] for name in ['updated'] + related]
+
+        return conditional_response(request, [validators['id__count']] + updated,
+                                    lambda: self.render_page(queryset.filter(is_deleted=False), form),
+                                    last_modified=max(updated) if all(updated) else None)
+
+    def render_page(self, queryset, form):
+        fields = form.cleaned_data['fields']
+        ordering_fields = [name.lstrip('-') for name in self.ordering]
+        values = queryset.values(*(fields + [name for name in ordering_fields if name not in fields]))
+        paginator = CursorPaginator(values, form.cleaned_data['limit'] or self.per_page, self.ordering)
+
+        try:
+            page = paginator.page(form.cleaned_data['cursor'])
+
+        except InvalidCursor:
+            return self.error(400, {'cursor': [_('Invalid cursor.')]})
+
+        decimal_places = dict((field.name, field.decimal_places) for field in self.model._meta.fields
+                              if hasattr(field, 'decimal_places'))
+
+        return self.render_json({'results': [self.serialize(row, fields, decimal_places) for row in page],
+                                 'next_cursor': page.next_cursor,
+                                 'previous_cursor': page.previous_cursor})
+
+    def serialize(self, row, fields, decimal_places):
+        data = {}
+
+        for name in fields:
+            value = row[name]
+
+            if isinstance(value, Decimal) and name in decimal_places:
+                value = '%.*f' % (decimal_places[name], value)
+
+            data[name] = value
+
+        return data
+
+
+class TransactionListView(ResourceListView):
+    model = Transaction
+    form_class = TransactionFilterForm
+    allowed_fields = ('id', 'transaction_type', 'category', 'category__name', 'category__slug',
+                      'notes', 'amount', 'date', 'created', 'updated')
+    default_fields = ('id', 'transaction_type', 'category', 'notes', 'amount', 'date')
+    ordering = ('-date', '-id')
+    related_validators = ('category',)
+
+transaction_list = TransactionListView.as_view()
+
+
+class CategoryListView(ResourceListView):
+    model = Category
+    allowed_fields = ('id', 'name', 'slug', 'created', 'updated')
+    default_fields = ('id', 'name', 'slug')
+    ordering = ('id',)
+
+category_list = CategoryListView.as_view()
+
+
+class BudgetListView(ResourceListView):
+    model = Budget
+    form_class = BudgetFilterForm
+    allowed_fields = ('id', 'name', 'slug', 'start_date', 'created', 'updated')
+    default_fields = ('id', 'name', 'slug', 'start_date')
+    ordering = ('-start_date', '-id')
+
+budget_list = BudgetListView.as_view()
+
+
+class EstimateListView(ResourceListView):
+    model = BudgetEstimate
+    form_class = EstimateFilterForm
+    allowed_fields = ('id', 'budget', 'category', 'category__name', 'category__slug',
+                      'amount', 'created', 'updated')
+    default_fields = ('id', 'category', 'amount')
+    ordering = ('id',)
+    related_validators = ('category',)
+
+    def get(self, request, slug):
+        self.budget = Budget.active.filter(slug=slug).values_list('pk', flat=True).first()
+
+        if self.budget is None:
+            return self.error(404, _('Budget not found.'))
+
+        return super(EstimateListView, self).get(request)
+
+    def get_queryset(self):
+        return self.model.objects.filter(budget=self.budget)
+
+estimate_list = EstimateListView.as_view()
+
+
+class SummaryView(ApiView):
+    """
+    The summary of a month or a year, as in the summary pages.
+    """
+    def get(self, request, year, month=None):
+        start_date, end_date = month_period(year, month) if month else year_period(year)
+
+        try:
+            budget = Budget.active.most_current_for_date(end_date)
+
+        except Budget.DoesNotExist:
+            return self.error(404, _('No budget for this period.'))
+
+        return conditional_response(request, (budget.pk,) + period_versions(budget, start_date, end_date),
+                                    lambda: self.render_summary(start_date, end_date, budget))
+
+    def render_summary(self, start_date, end_date, budget):
+        budget, estimates_and_amounts, actual_total = period_summary(start_date, end_date, budget)
+        months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+
+        return self.render_json({
+            'budget': {'id': budget.pk, 'name': budget.name, 'slug': budget.slug, 'start_date': budget.start_date},
+            'start_date': start_date,
+            'end_date': end_date,
+            'estimated_total': '%.02f' % (budget.monthly_estimated_total() * months),
+            'actual_total': '%.02f' % actual_total,
+            'categories': [{'id': group['estimate'].category.pk,
+                            'name': group['estimate'].category.name,
+                            'slug': group['estimate'].category.slug,
+                            'estimated': '%.02f' % (group['estimate'].amount * months),
+                            'actual': '%.02f' % group['actual_amount']} for group in estimates_and_amounts],
+        })
+
+summary = SummaryView.as_view()
+
+
+class SummaryReportView(ApiView):
+    """
+    The category by month report of summary/report.
+    """
+    def get(self, request):
+        form = SummaryReportForm(request.GET)
+
+        if not form.is_valid():
+            return self.error(400, form.errors)
+
+        report = category_month_report(form.cleaned_data['start_date'], form.cleaned_data['end_date'])
+        return self.render_json(report_as_dict(report))
+
+summary_report = SummaryReportView.as_view()
@@ -0,0 +1,123 @@
+"""
+Versioned caching helpers.
+
+Cached values are stored under keys that include the data versions they were
+computed from. Changing a model bumps its version, so stale entries are never
+read again and simply expire.
+"""
+
+from __future__ import unicode_literals
+
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import get_cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_delete, post_save
+from django.test.signals import setting_changed
+from django.utils.encoding import force_bytes
+
+from .signals import post_restore, post_soft_delete
+
+_caches = {}
+
+
+def get_budget_cache():
+    alias = getattr(settings, 'BUDGET_CACHE_ALIAS', 'default')
+
+    if alias not in _caches:
+        _caches[alias] = get_cache(alias)
+
+    return _caches[alias]
+
+
+def check_shared_cache():
+    """
+    Raises ImproperlyConfigured if BUDGET_REQUIRE_SHARED_CACHE is on and the
+    budget cache lives in the memory of each process.
+
+    The versions are kept in this cache, so with a local one a change handled
+    by a process is never seen by the others, which keep serving their cached
+    pages, ETags and budget index.
+    """
+    if getattr(settings, 'BUDGET_REQUIRE_SHARED_CACHE', False) and isinstance(get_budget_cache(), LocMemCache):
+        raise ImproperlyConfigured('The cache %r is local to each process, the budget cache must be shared by all '
+                                   'of them, e.g. a database or memcached one.'
+                                   % getattr(settings, 'BUDGET_CACHE_ALIAS', 'default'))
+
+
+def get_cache_timeout():
+    return getattr(settings, 'BUDGET_CACHE_TIMEOUT', 60 * 60)
+
+
+def make_key(prefix, *parts):
+    """
+    Builds a cache key safe for every backend from any number of parts.
+    """
+    digest = md5(force_bytes(':'.join('%s' % part for part in parts))).hexdigest()
+    return 'budget:%s:%s' % (prefix, digest)
+
+
+def get_versions(*names):
+    """
+    Returns the current version of each named data set, initializing the
+    missing ones.
+    """
+    cache = get_budget_cache()
+    keys = [_version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = dict((key, _new_version()) for key in keys if key not in versions)
+
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    return tuple(versions[key] for key in keys)
+
+
+def bump_version(*names):
+    cache = get_budget_cache()
+
+    for name in names:
+        key = _version_key(name)
+
+        try:
+            cache.incr(key)
+
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+
+
+def bump_version_on_change(model, *names):
+    """
+    Bumps the named versions whenever an instance of the model is saved,
+    deleted, or soft deleted or restored.
+    """
+    def receiver(sender, **kwargs):
+        if not kwargs.get('raw', False):
+            bump_version(*names)
+
+    uid = 'bump_version:%s.%s' % (model._meta.app_label, model._meta.object_name)
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_soft_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_restore.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+
+
+def _version_key(name):
+    return 'budget:version:%s' % name
+
+
+def _new_version():
+    # A missing version may have been evicted, so it must not restart from a
+    # value that was already used.
+    return int(time.time() * 1000000)
+
+
+def reset_caches(sender, setting, **kwargs):
+    if setting in ('CACHES', 'BUDGET_CACHE_ALIAS'):
+        _caches.clear()
+
+setting_changed.connect(reset_caches)
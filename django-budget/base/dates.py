@@ -0,0 +1,85 @@
+"""
+Calendar periods.
+
+The windows are whole months, quarters or years, from the first to the last
+day inclusive, as the summaries and the monthly totals count them.
+"""
+
+from __future__ import unicode_literals
+
+from calendar import monthrange
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+
+class Period(namedtuple('Period', 'start_date end_date')):
+    def __contains__(self, day):
+        return self.start_date <= day <= self.end_date
+
+    def months(self):
+        return months_between(self.start_date, self.end_date)
+
+
+def today():
+    """
+    The current date in the current time zone, not in UTC.
+    """
+    now = timezone.now()
+    return timezone.localtime(now).date() if timezone.is_aware(now) else now.date()
+
+
+def last_day_of_month(day):
+    return day.replace(day=monthrange(day.year, day.month)[1])
+
+
+def first_day_of_next_month(day):
+    return last_day_of_month(day) + timedelta(days=1)
+
+
+def months_between(start_date, end_date):
+    """
+    The first day of each month from start_date to end_date.
+    """
+    months = []
+    year, month = start_date.year, start_date.month
+
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append(date(year, month, 1))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return months
+
+
+def month_window(day):
+    return Period(day.replace(day=1), last_day_of_month(day))
+
+
+def quarter_window(day):
+    first_month = (day.month - 1) // 3 * 3 + 1
+    return Period(date(day.year, first_month, 1), last_day_of_month(date(day.year, first_month + 2, 1)))
+
+
+def year_window(day):
+    return Period(date(day.year, 1, 1), date(day.year, 12, 31))
+
+
+WINDOWS = {
+    'month': month_window,
+    'quarter': quarter_window,
+    'year': year_window,
+}
+
+
+def period_window(kind, day=None):
+    """
+    The month, quarter or year window containing the day, today by default.
+    """
+    try:
+        window = WINDOWS[kind]
+
+    except KeyError:
+        raise ValueError('Unknown period %r, expected one of %s.' % (kind, ', '.join(sorted(WINDOWS))))
+
+    return window(day or today())
@@ -0,0 +1,198 @@
+"""
+Per-request SQL profiling and template render timing.
+
+Every statement of a request is recorded through the debug cursor, which is
+turned on for the request even with DEBUG = False, then the request is
+logged to the budget.sql logger when it goes over the thresholds below:
+
+    BUDGET_SLOW_REQUEST_MS           total time of the request
+    BUDGET_SLOW_QUERY_MS             time of a single statement
+    BUDGET_MAX_REQUEST_QUERIES       number of statements
+    BUDGET_DUPLICATE_QUERY_THRESHOLD runs of the same statement with
+                                     different parameters, the N+1 signature
+
+With BUDGET_TEMPLATE_TIMING the time spent rendering each template is
+measured too, and the request is logged to budget.templates when rendering
+takes BUDGET_SLOW_RENDER_MS or more.
+
+With BUDGET_SERVER_TIMING the timings are sent in a Server-Timing header.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+import re
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .rendering import install_render_timing, start_render_timing, stop_render_timing
+
+logger = logging.getLogger('budget.sql')
+templates_logger = logging.getLogger('budget.templates')
+
+# Backends without their own last_executed_query, as SQLite, record the
+# statement and its parameters apart, the others with the values in place.
+PARAMS = re.compile(r"^QUERY = u?(['\"])(?P<sql>.*)\1 - PARAMS = .*$", re.DOTALL)
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LISTS = re.compile(r'IN \((?:%s|\?)(?:, (?:%s|\?))*\)')
+
+
+def add_server_timing(response, metric):
+    if response.has_header('Server-Timing'):
+        metric = '%s, %s' % (response['Server-Timing'], metric)
+
+    response['Server-Timing'] = metric
+
+
+def normalize_sql(sql):
+    """
+    The statement without its parameters, so the runs of one query with
+    different values compare equal.
+    """
+    match = PARAMS.match(sql)
+
+    if match:
+        sql = match.group('sql')
+
+    else:
+        sql = LITERALS.sub('?', sql)
+
+    return IN_LISTS.sub('IN (...)', sql)
+
+
+class QueryProfile(object):
+    def __init__(self, queries, duration):
+        self.queries = queries
+        self.duration = duration
+        self.count = len(queries)
+        self.sql_duration = sum(float(query['time']) for query in queries) * 1000
+
+    def duplicates(self, threshold):
+        """
+        The statements run at least threshold times, with their counts.
+        """
+        counts = defaultdict(int)
+
+        for query in self.queries:
+            counts[normalize_sql(query['sql'])] += 1
+
+        return sorted(((sql, count) for sql, count in counts.items() if count >= threshold),
+                      key=lambda item: -item[1])
+
+    def slow_queries(self, threshold):
+        return [query for query in self.queries if float(query['time']) * 1000 >= threshold]
+
+
+class QueryProfilingMiddleware(object):
+    def __init__(self):
+        if not getattr(settings, 'BUDGET_SQL_PROFILING', True):
+            raise MiddlewareNotUsed
+
+    def process_request(self, request):
+        state = {}
+
+        for connection in connections.all():
+            state[connection.alias] = (connection.use_debug_cursor, len(connection.queries))
+            connection.use_debug_cursor = True
+
+        request._query_profiling = (time.time(), state)
+
+    def process_response(self, request, response):
+        if not hasattr(request, '_query_profiling'):
+            return response
+
+        started, state = request._query_profiling
+        del request._query_profiling
+        queries = []
+
+        for connection in connections.all():
+            use_debug_cursor, offset = state.get(connection.alias, (connection.use_debug_cursor, 0))
+            queries.extend(connection.queries[offset:])
+            connection.use_debug_cursor = use_debug_cursor
+
+        profile = QueryProfile(queries, (time.time() - started) * 1000)
+        self.report(request, profile)
+
+        if getattr(settings, 'BUDGET_SERVER_TIMING', False):
+            add_server_timing(response, 'db;dur=%.2f;desc="%d queries", total;dur=%.2f' % (
+                profile.sql_duration, profile.count, profile.duration))
+
+        return response
+
+    def report(self, request, profile):
+        problems = []
+
+        if profile.duration >= getattr(settings, 'BUDGET_SLOW_REQUEST_MS', 500):
+            problems.append('slow request')
+
+        if profile.count > getattr(settings, 'BUDGET_MAX_REQUEST_QUERIES', 50):
+            problems.append('too many queries')
+
+        duplicates = profile.duplicates(getattr(settings, 'BUDGET_DUPLICATE_QUERY_THRESHOLD', 5))
+        slow_queries = profile.slow_queries(getattr(settings, 'BUDGET_SLOW_QUERY_MS', 100))
+
+        if duplicates:
+            problems.append('duplicate queries')
+
+        if slow_queries:
+            problems.append('slow queries')
+
+        message = '%s %s: %d queries in %.2f ms, request in %.2f ms' % (
+            request.method, request.get_full_path(), profile.count, profile.sql_duration, profile.duration)
+
+        if not problems:
+            logger.debug(message)
+            return
+
+        lines = ['%s (%s)' % (message, ', '.join(problems))]
+        lines.extend('  %d times: %s' % (count, sql) for sql, count in duplicates)
+        lines.extend('  %.2f ms: %s' % (float(query['time']) * 1000, query['sql']) for query in slow_queries)
+
+        logger.warning('\n'.join(lines), extra={'request': request,
+                                                'queries': profile.count,
+                                                'duration': profile.duration})
+
+
+class RenderTimingMiddleware(object):
+    def __init__(self):
+        if not getattr(settings, 'BUDGET_TEMPLATE_TIMING', False):
+            raise MiddlewareNotUsed
+
+        install_render_timing()
+
+    def process_request(self, request):
+        request._render_timing = start_render_timing()
+
+    def process_response(self, request, response):
+        if not hasattr(request, '_render_timing'):
+            return response
+
+        del request._render_timing
+        timer = stop_render_timing()
+
+        if timer is None or not timer.templates:
+            return response
+
+        self.report(request, timer)
+
+        if getattr(settings, 'BUDGET_SERVER_TIMING', False):
+            add_server_timing(response, 'tpl;dur=%.2f;desc="%d templates"' % (timer.duration, len(timer.templates)))
+
+        return response
+
+    def report(self, request, timer):
+        lines = ['%s %s: %d templates rendered in %.2f ms' % (
+            request.method, request.get_full_path(), len(timer.templates), timer.duration)]
+        lines.extend('  %.2f ms (%.2f ms with the templates it renders), %d times: %s' % (
+            stats['own'], stats['total'], stats['count'], name) for name, stats in timer.slowest())
+
+        level = logging.DEBUG
+
+        if timer.duration >= getattr(settings, 'BUDGET_SLOW_RENDER_MS', 100):
+            level = logging.WARNING
+
+        templates_logger.log(level, '\n'.join(lines), extra={'request': request, 'duration': timer.duration})
@@ -1,25 +1,112 @@
+"""
+Soft deletion.
+
+Deleting a row marks it and the rows that depend on it as deleted, following
+the relations named in soft_delete_cascade, with one UPDATE per table. The
+rows are stamped with the same updated time, so restoring a row restores
+the ones deleted along with it, but not the ones that were deleted before.
+"""
+
 from __future__ import unicode_literals
 
 from django.db import models
+from django.db.models import F
+from django.db.models.query import QuerySet
+from django.db.transaction import atomic
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from .signals import post_restore, post_soft_delete, pre_restore, pre_soft_delete
+
+
+class SoftDeleteQuerySet(QuerySet):
+    def soft_delete(self):
+        """
+        Marks the active rows and their dependents as deleted, returns the
+        number of rows of this queryset that were.
+        """
+        return _soft_delete(self, timezone.now())
+
+    def restore(self):
+        """
+        Marks the deleted rows and the dependents deleted with them as
+        active, returns the number of rows of this queryset that were.
+        """
+        return _restore(self, timezone.now())
+
+
+class SoftDeleteManager(models.Manager):
+    def get_query_set(self):
+        return SoftDeleteQuerySet(self.model, using=self._db)
+
 
 class StandardMetadata(models.Model):
     """
     A basic (abstract) model for metadata.
+
+    soft_delete_cascade names the relations, by their accessor, whose rows
+    are deleted and restored with this one.
     """
-    created = models.DateTimeField(_('Created'), auto_now=True)
-    updated = models.DateTimeField(_('Updated'), auto_now_add=True)
+    created = models.DateTimeField(_('Created'), auto_now_add=True)
+    updated = models.DateTimeField(_('Updated'), auto_now=True)
     is_deleted = models.BooleanField(_('Is deleted'), default=False, db_index=True)
 
+    soft_delete_cascade = ()
+
     class Meta:
         abstract = True
 
     def delete(self):
+        self.updated = timezone.now()
+        _soft_delete(SoftDeleteQuerySet(type(self), using=self._state.db).filter(pk=self.pk), self.updated)
         self.is_deleted = True
-        self.save()
+
+    def restore(self):
+        self.updated = timezone.now()
+        _restore(SoftDeleteQuerySet(type(self), using=self._state.db).filter(pk=self.pk), self.updated)
+        self.is_deleted = False
 
 
-class ActiveManager(models.Manager):
+class ActiveManager(SoftDeleteManager):
     def get_query_set(self):
         return super(ActiveManager, self).get_query_set().filter(is_deleted=False)
+
+
+def _dependents(model):
+    """
+    The models and foreign key names of the relations of soft_delete_cascade.
+    """
+    cascade = getattr(model, 'soft_delete_cascade', ())
+    return [(related.model, related.field.name) for related in model._meta.get_all_related_objects()
+            if related.get_accessor_name() in cascade]
+
+
+def _soft_delete(queryset, now):
+    rows = queryset.filter(is_deleted=False)
+
+    with atomic():
+        # The dependents first, while their parents are still selected by rows.
+        for model, field_name in _dependents(queryset.model):
+            _soft_delete(SoftDeleteQuerySet(model, using=rows.db).filter(**{'%s__in' % field_name: rows}), now)
+
+        pre_soft_delete.send(sender=queryset.model, queryset=rows)
+        count = rows.update(is_deleted=True, updated=now)
+        post_soft_delete.send(sender=queryset.model, count=count)
+
+    return count
+
+
+def _restore(queryset, now):
+    rows = queryset.filter(is_deleted=True)
+
+    with atomic():
+        # Only the dependents stamped with the time their parent was deleted.
+        for model, field_name in _dependents(queryset.model):
+            dependents = {'%s__in' % field_name: rows, 'updated': F('%s__updated' % field_name)}
+            _restore(SoftDeleteQuerySet(model, using=rows.db).filter(**dependents), now)
+
+        pre_restore.send(sender=queryset.model, queryset=rows)
+        count = rows.update(is_deleted=False, updated=now)
+        post_restore.send(sender=queryset.model, count=count)
+
+    return count
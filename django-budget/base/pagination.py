@@ -0,0 +1,213 @@
+"""
+Keyset (seek) pagination.
+
+Instead of an OFFSET and a COUNT(*), each page is found by filtering on the
+ordering values of the first or last row of the page the user came from, so
+every page costs the same index range scan no matter how deep it is.
+"""
+
+from __future__ import unicode_literals
+
+import base64
+import json
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.encoding import force_bytes, force_text
+from django.utils.translation import ugettext as _
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(object):
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %d objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator(object):
+    """
+    Paginates a queryset by the given ordering, which must be unique and have
+    every field in the same direction, e.g. ('-date', '-id'). A values()
+    queryset must include the ordering fields.
+    """
+    # The number of objects is never counted.
+    count = None
+
+    def __init__(self, object_list, per_page, ordering):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = [object_list.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    def page(self, cursor=None):
+        direction, values = NEXT, None
+
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+
+        if direction == NEXT:
+            object_list = self._fetch(values, True, self.ordering)
+            has_next, has_previous = len(object_list) > self.per_page, bool(cursor)
+            object_list = object_list[:self.per_page]
+
+        else:
+            object_list = self._fetch(values, False, self._reversed_ordering())
+            has_next, has_previous = True, len(object_list) > self.per_page
+            object_list = object_list[:self.per_page][::-1]
+
+        next_cursor = previous_cursor = None
+
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(NEXT, object_list[-1])
+
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(PREVIOUS, object_list[0])
+
+        return CursorPage(object_list, self, next_cursor, previous_cursor)
+
+    def _fetch(self, values, forward, ordering, queryset=None):
+        """
+        Up to one more row than a page, after (or before) the ordering values
+        when given, in the given ordering.
+        """
+        queryset = self.object_list if queryset is None else queryset
+
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+
+        return list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+    def encode_cursor(self, direction, obj):
+        if isinstance(obj, dict):
+            obj = _ValuesRow(obj, self.fields)
+
+        values = [field.value_to_string(obj) for field in self.fields]
+        token = json.dumps([direction, values], separators=(',', ':'))
+        return force_text(base64.urlsafe_b64encode(force_bytes(token))).rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            token = base64.urlsafe_b64decode(force_bytes(cursor + '=' * (-len(cursor) % 4)))
+            direction, values = json.loads(force_text(token))
+
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.fields):
+                raise ValueError(cursor)
+
+            return direction, [field.to_python(value) for field, value in zip(self.fields, values)]
+
+        except Exception:
+            raise InvalidCursor(cursor)
+
+    def _seek(self, values, forward):
+        """
+        The rows after (or before) the given ordering values, as in
+        (a < x) OR (a = x AND b < y) for a descending (a, b) ordering.
+        """
+        lookup = 'lt' if forward == self.descending else 'gt'
+        seek = Q()
+
+        for index, field in enumerate(self.fields):
+            condition = Q(**{'%s__%s' % (field.name, lookup): values[index]})
+
+            for previous, value in zip(self.fields[:index], values[:index]):
+                condition &= Q(**{previous.name: value})
+
+            seek |= condition
+
+        return seek
+
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else '-' + name for name in self.ordering]
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """
+    Paginates several querysets as one, e.g. the live and the archived rows,
+    by an ordering unique across all of them.
+
+    Each page reads one page from every queryset and merges them, so it costs
+    one index range scan per queryset.
+    """
+    def __init__(self, object_lists, per_page, ordering):
+        self.object_lists = list(object_lists)
+        super(MergedCursorPaginator, self).__init__(self.object_lists[0], per_page, ordering)
+
+    def _fetch(self, values, forward, ordering, queryset=None):
+        rows = []
+
+        for object_list in self.object_lists:
+            rows.extend(super(MergedCursorPaginator, self)._fetch(values, forward, ordering, object_list))
+
+        rows.sort(key=self._sort_key, reverse=ordering[0].startswith('-'))
+        return rows[:self.per_page + 1]
+
+    def _sort_key(self, obj):
+        if isinstance(obj, dict):
+            return tuple(obj[field.name] for field in self.fields)
+
+        return tuple(getattr(obj, field.attname) for field in self.fields)
+
+
+class _ValuesRow(object):
+    """
+    A row of values(), with the attributes the fields read their value from.
+    """
+    def __init__(self, values, fields):
+        for field in fields:
+            setattr(self, field.attname, values[field.name])
+
+
+class CursorPaginationMixin(object):
+    """
+    Opt-in keyset pagination for a ListView, enabled by cursor_pagination.
+    """
+    cursor_pagination = False
+    cursor_ordering = ('-id',)
+    cursor_kwarg = 'cursor'
+
+    def get_cursor_pagination(self):
+        return self.cursor_pagination
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.get_cursor_pagination():
+            return super(CursorPaginationMixin, self).paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.get_cursor_ordering())
+
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+
+        except InvalidCursor:
+            raise Http404(_('Invalid cursor.'))
+
+        return (paginator, page, page.object_list, page.has_other_pages())
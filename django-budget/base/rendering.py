@@ -0,0 +1,136 @@
+"""
+Template warm-up and render timing.
+
+warm_templates compiles every template of the project and of the installed
+apps, so with the cached loader the first requests do not pay for reading
+and parsing them.
+
+The render timing wraps Template._render, the way the test runner
+instruments it, and while a timer is active in the thread it records how
+long each template took, with and without the templates it included,
+extended or rendered through a tag such as {% crispy %}.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.template.base import Template, TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.template.loaders.app_directories import app_template_dirs
+
+logger = logging.getLogger('budget.templates')
+
+_local = threading.local()
+
+
+class RenderTimer(object):
+    def __init__(self):
+        self.templates = {}
+        self.children = []
+
+    def start(self):
+        self.children.append(0.0)
+
+    def stop(self, name, duration):
+        children = self.children.pop()
+
+        if self.children:
+            self.children[-1] += duration
+
+        stats = self.templates.setdefault(name, {'count': 0, 'total': 0.0, 'own': 0.0})
+        stats['count'] += 1
+        stats['total'] += duration
+        stats['own'] += duration - children
+
+    @property
+    def duration(self):
+        return sum(stats['own'] for stats in self.templates.values())
+
+    def slowest(self):
+        """
+        The templates with their stats, the most expensive first.
+        """
+        return sorted(self.templates.items(), key=lambda item: -item[1]['own'])
+
+
+def start_render_timing():
+    _local.timer = RenderTimer()
+    return _local.timer
+
+
+def stop_render_timing():
+    timer = getattr(_local, 'timer', None)
+    _local.timer = None
+    return timer
+
+
+def install_render_timing():
+    if getattr(Template._render, 'timed', False):
+        return
+
+    render = Template._render
+
+    def timed_render(self, context):
+        timer = getattr(_local, 'timer', None)
+
+        if timer is None:
+            return render(self, context)
+
+        timer.start()
+        started = time.time()
+
+        try:
+            return render(self, context)
+
+        finally:
+            timer.stop(self.name, (time.time() - started) * 1000)
+
+    timed_render.timed = True
+    Template._render = timed_render
+
+
+def template_names():
+    """
+    The names of the templates in the template dirs and the app dirs.
+    """
+    names = set()
+
+    for directory in tuple(settings.TEMPLATE_DIRS) + tuple(app_template_dirs):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+
+    return sorted(names)
+
+
+def warm_templates(names=None):
+    """
+    Compiles the templates, by default all of them when BUDGET_WARM_TEMPLATES
+    is on, and returns how many were compiled. The ones that do not compile
+    on their own, as fragments of other apps, are skipped.
+    """
+    if names is None:
+        if not getattr(settings, 'BUDGET_WARM_TEMPLATES', False):
+            return 0
+
+        names = template_names()
+
+    started = time.time()
+    count = 0
+
+    for name in names:
+        try:
+            get_template(name)
+            count += 1
+
+        except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+            logger.debug('Template %s was not warmed: %s', name, e)
+
+    logger.info('%d templates warmed in %.2f ms', count, (time.time() - started) * 1000)
+    return count
@@ -0,0 +1,13 @@
+from __future__ import unicode_literals
+
+from django.dispatch import Signal
+
+# Sent by the soft delete engine, which changes the rows with one UPDATE
+# per table instead of saving them, so without post_save. The pre signals
+# are sent inside the same atomic block, before the UPDATE, with the
+# queryset of the rows about to change, the post signals after it with the
+# number of rows changed.
+pre_soft_delete = Signal(providing_args=['queryset'])
+post_soft_delete = Signal(providing_args=['count'])
+pre_restore = Signal(providing_args=['queryset'])
+post_restore = Signal(providing_args=['count'])
@@ -24,3 +24,52 @@ def pagactive(context, page_number):
         return 'active'
 
     return ''
+
+
+@register.simple_tag(takes_context=True)
+def pagcursor(context, cursor, cursor_kwarg='cursor'):
+    """
+    The query string for the page at the given cursor, keeping the other
+    parameters of the request.
+    """
+    query = context['request'].GET.copy()
+    query.pop('page', None)
+    query[cursor_kwarg] = cursor
+    return '?%s' % query.urlencode()
+
+
+@register.simple_tag(takes_context=True)
+def pagnumber(context, number, page_kwarg='page'):
+    """
+    The query string for the given page number, keeping the other
+    parameters of the request.
+    """
+    query = context['request'].GET.copy()
+    query[page_kwarg] = number
+    return '?%s' % query.urlencode()
+
+
+@register.simple_tag(takes_context=True)
+def sortquery(context, field, default='', sort_kwarg='sort'):
+    """
+    The query string sorting by the field, descending first and reversed if
+    the list is already sorted by it, from the first page.
+    """
+    query = context['request'].GET.copy()
+    query.pop('page', None)
+    query.pop('cursor', None)
+    query[sort_kwarg] = field if query.get(sort_kwarg, default) == '-' + field else '-' + field
+    return '?%s' % query.urlencode()
+
+
+@register.simple_tag(takes_context=True)
+def filterquery(context, name, value):
+    """
+    The query string filtering by the value, keeping the other filters and
+    the sort, from the first page.
+    """
+    query = context['request'].GET.copy()
+    query.pop('page', None)
+    query.pop('cursor', None)
+    query[name] = value
+    return '?%s' % query.urlencode()
@@ -1,9 +1,13 @@
 from __future__ import unicode_literals
 
+from bisect import bisect_right
 from decimal import Decimal, InvalidOperation
 
 from django import template
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test.signals import setting_changed
+from django.utils import six
 
 register = template.Library()
 
@@ -15,24 +19,82 @@ BUDGET_DEFAULT_CSS_PERCENTAGE = (
     (0.75, 'warning'),
     (0.0, 'success'))
 
-BUDGET_CSS_PERCENTAGE = getattr(settings,
-                                'BUDGET_CSS_PERCENTAGE',
-                                BUDGET_DEFAULT_CSS_PERCENTAGE)
+_thresholds = []
+
+
+def css_thresholds():
+    """
+    The percentages of BUDGET_CSS_PERCENTAGE as decimals in ascending order,
+    and their CSS classes, parsed and validated once.
+    """
+    if not _thresholds:
+        thresholds = []
+
+        for entry in getattr(settings, 'BUDGET_CSS_PERCENTAGE', BUDGET_DEFAULT_CSS_PERCENTAGE):
+            try:
+                percentage, css_class = entry
+                percentage = make_decimal(percentage)
+
+            except (TypeError, ValueError, InvalidOperation):
+                raise ImproperlyConfigured('BUDGET_CSS_PERCENTAGE entries must be (percentage, CSS class) '
+                                           'pairs, not %r.' % (entry,))
+
+            if not isinstance(css_class, six.string_types):
+                raise ImproperlyConfigured('The CSS class of %r in BUDGET_CSS_PERCENTAGE must be a string.' % (entry,))
+
+            thresholds.append((percentage, css_class))
+
+        thresholds.sort(key=lambda threshold: threshold[0])
+        _thresholds[:] = [tuple(threshold[0] for threshold in thresholds),
+                          tuple(threshold[1] for threshold in thresholds)]
+
+    return _thresholds
 
 
 @register.simple_tag()
 def colorize_amount(estimate_amount, actual_amount):
+    percentages, css_classes = css_thresholds()
+    return _colorize(percentages, css_classes, estimate_amount, actual_amount)
+
+
+@register.filter
+def colorize_amounts(items, keys=None):
+    """
+    Pairs each item of the list with its CSS class, all classified at once.
+
+    The items are (estimate, actual) pairs, or dicts or objects whose
+    amounts are named by keys, as in:
+
+        {% for cell, css_class in row.cells|colorize_amounts:"estimated,actual" %}
+    """
+    percentages, css_classes = css_thresholds()
+    estimate_key, actual_key = keys.split(',') if keys else (None, None)
+    colorized = []
+
+    for item in items:
+        if estimate_key is None:
+            estimate_amount, actual_amount = item
+
+        elif isinstance(item, dict):
+            estimate_amount, actual_amount = item[estimate_key], item[actual_key]
+
+        else:
+            estimate_amount, actual_amount = getattr(item, estimate_key), getattr(item, actual_key)
+
+        colorized.append((item, _colorize(percentages, css_classes, estimate_amount, actual_amount)))
+
+    return colorized
+
+
+def _colorize(percentages, css_classes, estimate_amount, actual_amount):
     try:
         percentage = actual_amount / estimate_amount
 
     except (ZeroDivisionError, InvalidOperation):
         return ''
 
-    for css_percentage, css_class in BUDGET_CSS_PERCENTAGE:
-        css_percentage = make_decimal(css_percentage)
-
-        if percentage >= css_percentage:
-            return css_class
+    index = bisect_right(percentages, percentage)
+    return css_classes[index - 1] if index else ''
 
 
 def make_decimal(amount):
@@ -43,3 +105,10 @@ def make_decimal(amount):
         amount = Decimal(str(amount))
 
     return amount
+
+
+def reset_thresholds(sender, setting, **kwargs):
+    if setting == 'BUDGET_CSS_PERCENTAGE':
+        del _thresholds[:]
+
+setting_changed.connect(reset_thresholds)
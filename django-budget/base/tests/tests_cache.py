@@ -0,0 +1,58 @@
+from __future__ import unicode_literals
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+
+class CheckSharedCacheTest(SimpleTestCase):
+
+    @override_settings(BUDGET_REQUIRE_SHARED_CACHE=True,
+                       CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_cache_is_refused(self):
+        from base.cache import check_shared_cache
+
+        self.assertRaises(ImproperlyConfigured, check_shared_cache)
+
+    @override_settings(BUDGET_REQUIRE_SHARED_CACHE=False,
+                       CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_cache_for_a_single_process(self):
+        from base.cache import check_shared_cache
+
+        check_shared_cache()
+
+    @override_settings(BUDGET_REQUIRE_SHARED_CACHE=True,
+                       CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                           'LOCATION': '/tmp/budget-shared-cache-tests'}})
+    def test_shared_cache(self):
+        from base.cache import check_shared_cache
+
+        check_shared_cache()
+
+    def test_production_defaults(self):
+        import os
+
+        from mock import patch
+
+        from base.cache import check_shared_cache
+
+        environ = dict((name, value) for name, value in os.environ.items()
+                       if not name.startswith('CACHE_') and name != 'BUDGET_REQUIRE_SHARED_CACHE')
+        environ['SECRET_KEY'] = 'spam'
+
+        with patch.dict(os.environ, environ, clear=True):
+            production = self.load_settings('config.settings.production')
+
+        self.assertTrue(production.BUDGET_REQUIRE_SHARED_CACHE)
+
+        with override_settings(CACHES=production.CACHES,
+                               BUDGET_REQUIRE_SHARED_CACHE=production.BUDGET_REQUIRE_SHARED_CACHE):
+            check_shared_cache()
+
+    def load_settings(self, name):
+        import sys
+        from importlib import import_module
+
+        sys.modules.pop(name, None)
+        self.addCleanup(sys.modules.pop, name, None)
+        return import_module(name)
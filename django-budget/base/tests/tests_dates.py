@@ -0,0 +1,53 @@
+from __future__ import unicode_literals
+
+from datetime import date, datetime
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from mock import patch
+
+from base.dates import Period, month_window, months_between, period_window, quarter_window, today, year_window
+
+
+class WindowsTest(TestCase):
+    def test_month_window(self):
+        self.assertEqual(Period(date(2014, 1, 1), date(2014, 1, 31)), month_window(date(2014, 1, 15)))
+        self.assertEqual(Period(date(2014, 11, 1), date(2014, 11, 30)), month_window(date(2014, 11, 30)))
+        self.assertEqual(Period(date(2014, 12, 1), date(2014, 12, 31)), month_window(date(2014, 12, 1)))
+
+    def test_month_window_of_february(self):
+        self.assertEqual(date(2014, 2, 28), month_window(date(2014, 2, 10)).end_date)
+        self.assertEqual(date(2016, 2, 29), month_window(date(2016, 2, 10)).end_date)
+
+    def test_quarter_window(self):
+        self.assertEqual(Period(date(2014, 1, 1), date(2014, 3, 31)), quarter_window(date(2014, 3, 31)))
+        self.assertEqual(Period(date(2014, 4, 1), date(2014, 6, 30)), quarter_window(date(2014, 4, 1)))
+        self.assertEqual(Period(date(2014, 10, 1), date(2014, 12, 31)), quarter_window(date(2014, 11, 15)))
+
+    def test_year_window(self):
+        self.assertEqual(Period(date(2014, 1, 1), date(2014, 12, 31)), year_window(date(2014, 6, 15)))
+
+    def test_period_window(self):
+        self.assertEqual(quarter_window(date(2014, 5, 1)), period_window('quarter', date(2014, 5, 1)))
+        self.assertRaises(ValueError, period_window, 'week', date(2014, 5, 1))
+
+    def test_period(self):
+        period = month_window(date(2014, 12, 10))
+
+        self.assertIn(date(2014, 12, 31), period)
+        self.assertNotIn(date(2015, 1, 1), period)
+        self.assertEqual([date(2014, 12, 1)], period.months())
+
+    def test_months_between(self):
+        self.assertEqual([date(2013, 12, 1), date(2014, 1, 1)], months_between(date(2013, 12, 31), date(2014, 1, 1)))
+
+
+class TodayTest(TestCase):
+    @override_settings(TIME_ZONE='America/Los_Angeles')
+    def test_today_is_local(self):
+        utc_midnight = datetime(2014, 12, 1, 2, 0, tzinfo=timezone.utc)
+
+        with patch('django.utils.timezone.now', return_value=utc_midnight):
+            self.assertEqual(date(2014, 11, 30), today())
@@ -0,0 +1,166 @@
+from __future__ import unicode_literals
+
+import logging
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from mock import patch
+from model_mommy import mommy
+
+from base import middleware
+from base.middleware import QueryProfilingMiddleware, RenderTimingMiddleware, normalize_sql
+
+
+@override_settings(DEBUG=False,
+                   BUDGET_SLOW_REQUEST_MS=10000,
+                   BUDGET_SLOW_QUERY_MS=10000,
+                   BUDGET_MAX_REQUEST_QUERIES=50,
+                   BUDGET_DUPLICATE_QUERY_THRESHOLD=3,
+                   BUDGET_SERVER_TIMING=False)
+class QueryProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.middleware = QueryProfilingMiddleware()
+        self.request = RequestFactory().get('/spam/')
+
+    def process(self, view):
+        self.middleware.process_request(self.request)
+        return self.middleware.process_response(self.request, view())
+
+    def categories_one_by_one(self, ids):
+        from category.models import Category
+
+        def view():
+            for pk in ids:
+                Category.objects.get(pk=pk)
+
+            return HttpResponse()
+
+        return view
+
+    def test_queries_are_recorded_without_debug(self):
+        categories = mommy.make('Category', _quantity=2)
+
+        with patch.object(middleware.logger, 'debug') as debug:
+            self.process(self.categories_one_by_one([category.pk for category in categories]))
+
+        self.assertIn('2 queries', debug.call_args[0][0])
+        self.assertIsNone(connection.use_debug_cursor)
+
+    def test_duplicate_queries_are_logged(self):
+        categories = mommy.make('Category', _quantity=3)
+
+        with patch.object(middleware.logger, 'warning') as warning:
+            self.process(self.categories_one_by_one([category.pk for category in categories]))
+
+        self.assertEqual(1, warning.call_count)
+        message = warning.call_args[0][0]
+        self.assertIn('duplicate queries', message)
+        self.assertIn('3 times:', message)
+
+    @override_settings(BUDGET_MAX_REQUEST_QUERIES=1)
+    def test_requests_over_the_queries_threshold_are_logged(self):
+        categories = mommy.make('Category', _quantity=2)
+
+        with patch.object(middleware.logger, 'warning') as warning:
+            self.process(self.categories_one_by_one([category.pk for category in categories]))
+
+        self.assertIn('too many queries', warning.call_args[0][0])
+
+    @override_settings(BUDGET_SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged(self):
+        category = mommy.make('Category')
+
+        with patch.object(middleware.logger, 'warning') as warning:
+            self.process(self.categories_one_by_one([category.pk]))
+
+        self.assertIn('slow queries', warning.call_args[0][0])
+
+    def test_server_timing_is_off_by_default(self):
+        response = self.process(HttpResponse)
+
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(BUDGET_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        category = mommy.make('Category')
+        response = self.process(self.categories_one_by_one([category.pk]))
+
+        self.assertRegexpMatches(response['Server-Timing'],
+                                 r'^db;dur=[\d.]+;desc="1 queries", total;dur=[\d.]+$')
+
+    @override_settings(BUDGET_SQL_PROFILING=False)
+    def test_middleware_can_be_disabled(self):
+        self.assertRaises(MiddlewareNotUsed, QueryProfilingMiddleware)
+
+
+@override_settings(BUDGET_TEMPLATE_TIMING=True,
+                   BUDGET_SLOW_RENDER_MS=10000,
+                   BUDGET_SERVER_TIMING=False)
+class RenderTimingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.middleware = RenderTimingMiddleware()
+        self.request = RequestFactory().get('/spam/')
+
+    def process(self):
+        from django.template import Context, Template
+        from django.template.loader import get_template_from_string
+
+        def view():
+            inner = get_template_from_string('{{ spam }}', name='inner.html')
+            outer = Template('{% for i in items %}{{ inner }}{% endfor %}', name='outer.html')
+            context = Context({'items': range(3), 'inner': lambda: inner.render(Context({'spam': 'eggs'}))})
+            return HttpResponse(outer.render(context))
+
+        self.middleware.process_request(self.request)
+        return self.middleware.process_response(self.request, view())
+
+    def test_templates_are_timed(self):
+        with patch.object(middleware.templates_logger, 'log') as log:
+            response = self.process()
+
+        self.assertEqual(b'eggseggseggs', response.content)
+        message = log.call_args[0][1]
+        self.assertEqual(logging.DEBUG, log.call_args[0][0])
+        self.assertIn('2 templates rendered', message)
+        self.assertIn('3 times: inner.html', message)
+        self.assertIn('1 times: outer.html', message)
+
+    def test_slow_renders_are_logged(self):
+        with override_settings(BUDGET_SLOW_RENDER_MS=0):
+            with patch.object(middleware.templates_logger, 'log') as log:
+                self.process()
+
+        self.assertEqual(logging.WARNING, log.call_args[0][0])
+
+    def test_server_timing_header(self):
+        with override_settings(BUDGET_SERVER_TIMING=True):
+            response = self.process()
+
+        self.assertTrue(response['Server-Timing'].startswith('tpl;dur='))
+        self.assertIn('desc="2 templates"', response['Server-Timing'])
+
+    def test_renders_outside_of_requests_are_not_timed(self):
+        from django.template import Context, Template
+
+        self.assertEqual('spam', Template('spam').render(Context()))
+
+    def test_middleware_is_off_by_default(self):
+        with override_settings(BUDGET_TEMPLATE_TIMING=False):
+            self.assertRaises(MiddlewareNotUsed, RenderTimingMiddleware)
+
+
+class NormalizeSqlTest(TestCase):
+    def test_parameters_apart(self):
+        sql = "QUERY = u'SELECT * FROM \"spam\" WHERE \"id\" IN (%s, %s)' - PARAMS = (1, 2)"
+
+        self.assertEqual('SELECT * FROM "spam" WHERE "id" IN (...)', normalize_sql(sql))
+
+    def test_parameters_in_place(self):
+        sql = "SELECT * FROM \"spam\" WHERE \"name\" = 'eggs' AND \"amount\" > 10.5"
+
+        self.assertEqual('SELECT * FROM "spam" WHERE "name" = ? AND "amount" > ?', normalize_sql(sql))
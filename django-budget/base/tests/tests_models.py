@@ -0,0 +1,116 @@
+from __future__ import unicode_literals
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from model_mommy import mommy
+
+
+class SoftDeleteTest(TestCase):
+    def setUp(self):
+        self.category = mommy.make('Category')
+        self.budget = mommy.make('Budget', start_date=date(2014, 1, 1))
+        self.estimate = mommy.make('BudgetEstimate', budget=self.budget, category=self.category, amount=Decimal('100.0'))
+        self.transactions = mommy.make('Transaction', category=self.category, amount=Decimal('10.0'),
+                                       date=date(2014, 3, 15), _quantity=5)
+
+    def test_deleting_a_category_cascades(self):
+        from budget.models import BudgetEstimate
+        from transaction.models import Transaction
+
+        self.category.delete()
+
+        self.assertTrue(self.category.is_deleted)
+        self.assertTrue(self.refresh(self.category).is_deleted)
+        self.assertFalse(BudgetEstimate.active.exists())
+        self.assertFalse(Transaction.active.exists())
+        self.assertFalse(self.refresh(self.budget).is_deleted)
+
+    def test_cascade_runs_one_update_per_table(self):
+        mommy.make('Transaction', category=self.category, date=date(2014, 4, 1), _quantity=20)
+
+        with CaptureQueriesContext(connection) as context:
+            self.category.delete()
+
+        updates = [query['sql'] for query in context.captured_queries
+                   if 'UPDATE ' in query['sql'] and 'monthlycategorytotal' not in query['sql']]
+        self.assertEqual(3, len(updates))
+
+    def test_deleting_a_budget_cascades_to_its_estimates(self):
+        from budget.models import Budget, BudgetEstimate
+
+        other = mommy.make('BudgetEstimate', category=self.category)
+        self.budget.delete()
+
+        self.assertEqual([other], list(BudgetEstimate.active.all()))
+        self.assertRaises(Budget.DoesNotExist, Budget.active.most_current_for_date, date(2014, 3, 1))
+        self.assertFalse(self.refresh(self.category).is_deleted)
+
+    def test_rollup_follows_the_cascade(self):
+        from transaction.models import MonthlyCategoryTotal
+
+        self.category.delete()
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(date(2014, 3, 1), date(2014, 3, 31), [self.category.pk])
+        self.assertEqual(Decimal('0.0'), amounts.get(self.category.pk, Decimal('0.0')))
+
+        self.category.restore()
+        self.assertEqual({self.category.pk: Decimal('50.0')},
+                         MonthlyCategoryTotal.objects.amounts_by_category(date(2014, 3, 1), date(2014, 3, 31),
+                                                                          [self.category.pk]))
+
+    def test_restore_brings_back_only_the_rows_deleted_with_it(self):
+        from transaction.models import Transaction
+
+        deleted_before = self.transactions[0]
+        deleted_before.delete()
+        self.category.delete()
+
+        self.category.restore()
+
+        self.assertFalse(self.refresh(self.category).is_deleted)
+        self.assertFalse(self.refresh(self.estimate).is_deleted)
+        self.assertEqual(4, Transaction.active.count())
+        self.assertTrue(self.refresh(deleted_before).is_deleted)
+
+    def test_queryset_soft_delete_and_restore(self):
+        from transaction.models import Transaction
+
+        self.assertEqual(2, Transaction.objects.filter(pk__in=[t.pk for t in self.transactions[:2]]).soft_delete())
+        self.assertEqual(0, Transaction.objects.filter(pk=self.transactions[0].pk).soft_delete())
+        self.assertEqual(3, Transaction.active.count())
+
+        self.assertEqual(2, Transaction.objects.all().restore())
+        self.assertEqual(5, Transaction.active.count())
+
+    def test_deleted_instance_saved_again_keeps_the_rollup(self):
+        from transaction.models import MonthlyCategoryTotal
+
+        transaction = self.transactions[0]
+        transaction.delete()
+        transaction.save()
+
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(date(2014, 3, 1), date(2014, 3, 31), [self.category.pk])
+        self.assertEqual(Decimal('40.0'), amounts[self.category.pk])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'soft-delete-tests'}})
+    def test_versions_are_bumped(self):
+        from base.cache import get_budget_cache, get_versions
+        from budget.models import estimates_version
+        from transaction.models import month_version
+
+        get_budget_cache().clear()
+        names = ('category', 'estimate', 'transaction', estimates_version(self.budget.pk), month_version(2014, 3))
+        versions = get_versions(*names)
+
+        self.category.delete()
+
+        for name, old, new in zip(names, versions, get_versions(*names)):
+            self.assertNotEqual(old, new, name)
+
+    def refresh(self, instance):
+        return type(instance).objects.get(pk=instance.pk)
@@ -0,0 +1,76 @@
+from __future__ import unicode_literals
+
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from model_mommy import mommy
+
+
+class CursorPaginatorTest(TestCase):
+
+    def setUp(self):
+        from base.pagination import CursorPaginator
+        from transaction.models import Transaction
+
+        today = date.today()
+        # Two transactions per day, so the id breaks the ties.
+        self.transactions = [mommy.make('Transaction', date=today - timedelta(days=day // 2)) for day in range(7)]
+        self.transactions.sort(key=lambda t: (t.date, t.id), reverse=True)
+        self.paginator = CursorPaginator(Transaction.objects.all(), 3, ('-date', '-id'))
+
+    def test_first_page(self):
+        page = self.paginator.page()
+
+        self.assertEqual(self.transactions[:3], page.object_list)
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_walk_forward_and_backward(self):
+        second = self.paginator.page(self.paginator.page().next_cursor)
+        third = self.paginator.page(second.next_cursor)
+
+        self.assertEqual(self.transactions[3:6], second.object_list)
+        self.assertEqual(self.transactions[6:], third.object_list)
+        self.assertFalse(third.has_next())
+        self.assertTrue(third.has_previous())
+
+        back = self.paginator.page(third.previous_cursor)
+
+        self.assertEqual(self.transactions[3:6], back.object_list)
+        self.assertTrue(back.has_next())
+        self.assertTrue(back.has_previous())
+
+        first = self.paginator.page(back.previous_cursor)
+
+        self.assertEqual(self.transactions[:3], first.object_list)
+        self.assertFalse(first.has_previous())
+
+    def test_page_runs_no_count_query(self):
+        with self.assertNumQueries(1):
+            self.paginator.page()
+
+    def test_invalid_cursor(self):
+        from base.pagination import InvalidCursor
+
+        self.assertRaises(InvalidCursor, self.paginator.page, 'foo')
+
+
+class MergedCursorPaginatorTest(TestCase):
+    def test_walks_both_querysets_in_order(self):
+        from base.pagination import MergedCursorPaginator
+        from transaction.archive import archive_transactions
+        from transaction.models import ArchivedTransaction, Transaction
+
+        transactions = [mommy.make('Transaction', date=date(2014, 1, day)) for day in range(1, 8)]
+        archive_transactions(Transaction.objects.filter(pk__in=[t.pk for t in transactions[::2]]))
+        paginator = MergedCursorPaginator((Transaction.objects.all(), ArchivedTransaction.objects.all()),
+                                          3, ('date', 'id'))
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        self.assertEqual([t.pk for t in transactions], [t.pk for page in (first, second, third) for t in page])
+        self.assertFalse(third.has_next())
+        self.assertEqual([t.pk for t in second], [t.pk for t in paginator.page(third.previous_cursor)])
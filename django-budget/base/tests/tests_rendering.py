@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from base.rendering import RenderTimer, template_names, warm_templates
+
+
+class RenderTimerTest(TestCase):
+    def test_own_time_excludes_the_inner_templates(self):
+        timer = RenderTimer()
+        timer.start()
+        timer.start()
+        timer.stop('inner.html', 3.0)
+        timer.stop('outer.html', 5.0)
+
+        self.assertEqual({'count': 1, 'total': 5.0, 'own': 2.0}, timer.templates['outer.html'])
+        self.assertEqual({'count': 1, 'total': 3.0, 'own': 3.0}, timer.templates['inner.html'])
+        self.assertEqual(5.0, timer.duration)
+        self.assertEqual(['inner.html', 'outer.html'], [name for name, _ in timer.slowest()])
+
+
+class WarmTemplatesTest(TestCase):
+    def test_template_names(self):
+        names = template_names()
+
+        self.assertIn('base.html', names)
+        self.assertIn('pagination.html', names)
+        self.assertIn('bootstrap3/field.html', names)
+
+    @override_settings(BUDGET_WARM_TEMPLATES=False)
+    def test_off_by_default(self):
+        self.assertEqual(0, warm_templates())
+
+    @override_settings(TEMPLATE_LOADERS=(('django.template.loaders.cached.Loader',
+                                          ('django.template.loaders.filesystem.Loader',
+                                           'django.template.loaders.app_directories.Loader')),))
+    def test_templates_are_cached(self):
+        from django.template import loader
+
+        loader.template_source_loaders = None
+
+        try:
+            self.assertEqual(2, warm_templates(['base.html', 'pagination.html']))
+            self.assertIn('base.html', loader.template_source_loaders[0].template_cache)
+
+        finally:
+            loader.template_source_loaders = None
+
+    def test_broken_templates_are_skipped(self):
+        self.assertEqual(1, warm_templates(['base.html', 'spam.html']))
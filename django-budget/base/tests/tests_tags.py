@@ -3,8 +3,10 @@ from __future__ import unicode_literals
 from decimal import Decimal
 
 from django.core.urlresolvers import reverse
-from django.http import HttpRequest
-from django.test import TestCase
+from django.http import HttpRequest, QueryDict
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
 
 
 class TagNavActiveTestCase(TestCase):
@@ -57,6 +59,25 @@ class TagPaginationActiveTestCase(TestCase):
         self.assertEqual('', self.tag(self.context, 1))
 
 
+class TagPaginationCursorTestCase(TestCase):
+
+    def setUp(self):
+        from base.templatetags.active_tags import pagcursor
+
+        self.tag = pagcursor
+
+    def test_tag_should_return_cursor_query_string(self):
+        context = {'request': RequestFactory().get('/')}
+
+        self.assertEqual('?cursor=abc', self.tag(context, 'abc'))
+
+    def test_tag_should_keep_other_parameters_and_drop_page(self):
+        context = {'request': RequestFactory().get('/', {'page': '2', 'cursor': 'old', 'foo': 'bar'})}
+        query = QueryDict(self.tag(context, 'abc')[1:])
+
+        self.assertEqual({'cursor': ['abc'], 'foo': ['bar']}, dict(query.lists()))
+
+
 class TagColarizeAmountTestCase(TestCase):
 
     def setUp(self):
@@ -87,3 +108,51 @@ class TagColarizeAmountTestCase(TestCase):
         self.assertEqual(Decimal('1'), make_decimal('1'))
         self.assertEqual(Decimal('1'), make_decimal(Decimal('1')))
         self.assertEqual(Decimal('1'), make_decimal(float(1)))
+
+    def test_tag_should_return_empty_below_every_percentage(self):
+        self.assertEqual('', self.tag(Decimal('100'), Decimal('-1')))
+
+    @override_settings(BUDGET_CSS_PERCENTAGE=((0.5, 'info'), (2, 'danger')))
+    def test_tag_should_read_the_percentages_from_the_settings(self):
+        self.assertEqual('', self.tag(Decimal('100'), Decimal('49')))
+        self.assertEqual('info', self.tag(Decimal('100'), Decimal('150')))
+        self.assertEqual('danger', self.tag(Decimal('100'), Decimal('200')))
+
+    def test_tag_should_fail_with_invalid_percentages(self):
+        with override_settings(BUDGET_CSS_PERCENTAGE=(('spam', 'danger'),)):
+            self.assertRaises(ImproperlyConfigured, self.tag, Decimal('100'), Decimal('1'))
+
+        with override_settings(BUDGET_CSS_PERCENTAGE=((1.0, None),)):
+            self.assertRaises(ImproperlyConfigured, self.tag, Decimal('100'), Decimal('1'))
+
+        with override_settings(BUDGET_CSS_PERCENTAGE=(1.0,)):
+            self.assertRaises(ImproperlyConfigured, self.tag, Decimal('100'), Decimal('1'))
+
+
+class FilterColorizeAmountsTestCase(TestCase):
+
+    def setUp(self):
+        from base.templatetags.budget_tags import colorize_amounts
+
+        self.filter = colorize_amounts
+
+    def test_filter_should_classify_pairs(self):
+        pairs = [(Decimal('100'), Decimal('100')), (Decimal('100'), Decimal('80')), (Decimal('0'), Decimal('1'))]
+
+        self.assertEqual(['danger', 'warning', ''], [css_class for _, css_class in self.filter(pairs)])
+
+    def test_filter_should_read_the_amounts_by_key(self):
+        cells = [{'estimated': Decimal('100'), 'actual': Decimal('10')}]
+
+        self.assertEqual([(cells[0], 'success')], self.filter(cells, 'estimated,actual'))
+
+    def test_filter_in_a_template(self):
+        from django.template import Context, Template
+
+        template = Template('{% load budget_tags %}'
+                            '{% for cell, css_class in cells|colorize_amounts:"estimated,actual" %}'
+                            '{{ cell.actual }}:{{ css_class }} {% endfor %}')
+        cells = [{'estimated': Decimal('10'), 'actual': Decimal('10')},
+                 {'estimated': Decimal('10'), 'actual': Decimal('1')}]
+
+        self.assertEqual('10:danger 1:success ', template.render(Context({'cells': cells})))
@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.views import login, logout_then_login
 from django.core.urlresolvers import reverse
+from django.http import HttpResponse
 
 from base.utils import BaseTestCase
 
@@ -118,3 +119,81 @@ class IndexViewTest(BaseTestCase):
         self.assertEqual(301, response.status_code)
         self.assertEqual(
             reverse('dashboard'), response._headers['location'][1])
+
+
+class ConditionalResponseTest(BaseTestCase):
+    def render(self):
+        self.rendered += 1
+        return HttpResponse('spam')
+
+    def setUp(self):
+        super(ConditionalResponseTest, self).setUp()
+        self.rendered = 0
+
+    def get(self, validators, **headers):
+        from base.views import conditional_response
+
+        request = self.factory.get(path='/spam/', user=self.mock_user, **headers)
+        return conditional_response(request, validators, self.render)
+
+    def test_renders_with_an_etag(self):
+        response = self.get((1, 2))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, self.rendered)
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_not_modified_without_rendering(self):
+        etag = self.get((1, 2))['ETag']
+        response = self.get((1, 2), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+        self.assertEqual(1, self.rendered)
+
+    def test_renders_when_the_validators_change(self):
+        etag = self.get((1, 2))['ETag']
+        response = self.get((1, 3), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_etag_depends_on_the_language(self):
+        from django.utils import translation
+
+        etag = self.get((1, 2))['ETag']
+
+        with translation.override('pt-br'):
+            self.assertNotEqual(etag, self.get((1, 2))['ETag'])
+
+    def test_last_modified(self):
+        from datetime import datetime
+        from django.utils.timezone import utc
+
+        from base.views import conditional_response
+
+        last_modified = datetime(2014, 1, 1, tzinfo=utc)
+
+        request = self.factory.get(path='/spam/', user=self.mock_user,
+                                   HTTP_IF_MODIFIED_SINCE='Wed, 01 Jan 2014 00:00:00 GMT')
+        response = conditional_response(request, (1, 2), self.render, last_modified=last_modified)
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual('Wed, 01 Jan 2014 00:00:00 GMT', response['Last-Modified'])
+
+    def test_pages_with_messages_are_rendered(self):
+        from base.views import conditional_response
+
+        etag = self.get((1, 2))['ETag']
+        request = self.factory.get(path='/spam/', user=self.mock_user, HTTP_IF_NONE_MATCH=etag)
+        request._messages = ['Spam']
+
+        self.assertEqual(200, conditional_response(request, (1, 2), self.render).status_code)
+
+    def test_errors_have_no_etag(self):
+        from base.views import conditional_response
+
+        request = self.factory.get(path='/spam/', user=self.mock_user)
+        response = conditional_response(request, (1, 2), lambda: HttpResponse(status=404))
+
+        self.assertFalse(response.has_header('ETag'))
@@ -1,10 +1,92 @@
 from __future__ import unicode_literals
 
+from calendar import timegm
+from hashlib import md5
+
+from django.contrib.messages import get_messages
 from django.core.urlresolvers import reverse_lazy
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.encoding import force_bytes
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils.translation import get_language
 from django.views.generic import RedirectView, TemplateView
 
 from braces.views import LoginRequiredMixin
 
+from .cache import get_versions
+
+
+def conditional_response(request, validators, render, last_modified=None):
+    """
+    Returns 304 Not Modified, without calling render, if the client already
+    has the current page, else the response of render, both with the ETag.
+
+    The ETag is computed from the validators, which must change whenever
+    the data the page shows does, and from the user, the language and the
+    query string. Pages with pending messages are always rendered, so the
+    messages are shown.
+    """
+    if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+        return render()
+
+    parts = (request.path, request.GET.urlencode(), request.user.pk, get_language()) + tuple(validators)
+    etag = md5(force_bytes(':'.join('%s' % part for part in parts))).hexdigest()
+    last_modified = http_date(timegm(last_modified.utctimetuple())) if last_modified else None
+
+    if _not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+
+    else:
+        response = render()
+
+        if response.status_code != 200:
+            return response
+
+    response['ETag'] = quote_etag(etag)
+
+    if last_modified:
+        response['Last-Modified'] = last_modified
+
+    return response
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+
+    if if_modified_since and last_modified:
+        return parse_http_date_safe(last_modified) <= if_modified_since
+
+    return False
+
+
+class ConditionalGetMixin(object):
+    """
+    Answers GET with 304 Not Modified, before the queries of the view run,
+    when nothing it shows has changed.
+
+    The validators are the given data versions or, by default, the latest
+    updated timestamp and the row count of the queryset of the view.
+    """
+    validator_versions = ()
+
+    def get_validators(self):
+        if self.validator_versions:
+            return get_versions(*self.validator_versions)
+
+        validators = self.get_queryset().aggregate(Max('updated'), Count('id'))
+        return (validators['updated__max'], validators['id__count'])
+
+    def get(self, request, *args, **kwargs):
+        return conditional_response(request, self.get_validators(),
+                                    lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs))
+
 
 class BudgetSetupView(LoginRequiredMixin, TemplateView):
     template_name = "setup.html"
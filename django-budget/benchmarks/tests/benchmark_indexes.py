@@ -0,0 +1,78 @@
+from __future__ import unicode_literals
+
+import time
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from model_mommy import mommy
+
+from benchmarks.utils import TRANSACTIONS, seed_transactions
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The query plans are read with EXPLAIN QUERY PLAN.')
+class ExpensesByCategoryIndexBenchmark(TestCase):
+    """
+    Shows the query plan of the expenses of a category in a month, the query
+    behind BudgetEstimate.actual_transactions, with and without the composite
+    index on (category, transaction_type, is_deleted, date).
+    """
+
+    def setUp(self):
+        from transaction.models import Transaction
+
+        self.categories = mommy.make('Category', _quantity=50)
+        seed_transactions(self.categories, TRANSACTIONS)
+
+        end_date = date.today()
+        start_date = end_date - timedelta(days=30)
+        self.queryset = Transaction.expenses.filter(category=self.categories[0],
+                                                    date__range=(start_date, end_date))
+
+    def test_query_plan(self):
+        index, index_sql = self.composite_index()
+
+        after_plan, after_time = self.explain()
+
+        cursor = connection.cursor()
+        cursor.execute('DROP INDEX "%s"' % index)
+
+        before_plan, before_time = self.explain()
+
+        cursor.execute(index_sql)
+
+        print('\n%d transactions, expenses of a category in a month' % TRANSACTIONS)
+        print('Without the composite index (%.2f ms):\n  %s' % (before_time, '\n  '.join(before_plan)))
+        print('With the composite index (%.2f ms):\n  %s' % (after_time, '\n  '.join(after_plan)))
+
+        self.assertNotIn(index, ' '.join(before_plan))
+        self.assertIn(index, ' '.join(after_plan))
+
+    def composite_index(self):
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA index_list("transaction_transaction")')
+
+        for row in cursor.fetchall():
+            cursor.execute('PRAGMA index_info("%s")' % row[1])
+
+            if [column[2] for column in cursor.fetchall()] == ['category_id', 'transaction_type', 'is_deleted', 'date']:
+                cursor.execute('SELECT sql FROM sqlite_master WHERE name = %s', [row[1]])
+                return row[1], cursor.fetchone()[0]
+
+        self.fail('The composite index was not created.')
+
+    def explain(self):
+        sql, params = self.queryset.query.sql_with_params()
+
+        cursor = connection.cursor()
+        cursor.execute('ANALYZE')
+        cursor.execute('EXPLAIN QUERY PLAN %s' % sql, params)
+        plan = [row[-1] for row in cursor.fetchall()]
+
+        started = time.time()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+
+        return plan, (time.time() - started) * 1000
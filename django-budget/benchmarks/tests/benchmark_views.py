@@ -0,0 +1,125 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import platform
+from datetime import date
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.db.transaction import atomic, set_rollback
+from django.test import TestCase
+from django.test.testcases import connections_support_transactions
+from django.test.utils import override_settings
+
+from benchmarks.utils import BUDGETS, CATEGORIES, TRANSACTIONS, measure, seed_dataset
+
+RESULTS = os.environ.get('BENCHMARK_RESULTS', 'benchmark-results.json')
+REPEAT = int(os.environ.get('BENCHMARK_REPEAT', 3))
+
+
+class ViewsBenchmark(TestCase):
+    """
+    Measures every read view against a large dataset and writes the results
+    to the BENCHMARK_RESULTS json file, to be compared between commits.
+
+    The number of queries of each view must stay within its budget. The
+    budgets include the two queries of the session and the user.
+    """
+    query_budgets = {
+        'dashboard': 8,
+        'summary_list': 3,
+        'summary_year': 5,
+        'summary_month': 5,
+        'summary_report': 6,
+        # One of them reads the years of the archive, cached outside the tests.
+        'summary_transactions': 5,
+        # One of them is the validator of the conditional GET.
+        'category_list': 5,
+        'budget_list': 5,
+        'estimate_list': 5,
+        # One of them lists the categories of the filter form, another one
+        # groups the facets, cached outside the tests.
+        'transaction_list': 6,
+        'transaction_list_cursor': 5,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        # The dataset is created once and rolled back after the last view.
+        # The transactions support is checked first, as it can't be inside
+        # an atomic block.
+        connections_support_transactions()
+        cls.atomic = atomic()
+        cls.atomic.__enter__()
+
+        cls.categories, cls.budgets = seed_dataset()
+        get_user_model().objects.create_user('spam', '', 'eggs')
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        set_rollback(True)
+        cls.atomic.__exit__(None, None, None)
+
+        with open(RESULTS, 'w') as results:
+            json.dump({'dataset': {'categories': CATEGORIES,
+                                   'budgets': BUDGETS,
+                                   'transactions': TRANSACTIONS},
+                       'environment': {'python': platform.python_version(),
+                                       'django': django.get_version(),
+                                       'database': connection.vendor},
+                       'views': cls.results}, results, indent=2, separators=(',', ': '), sort_keys=True)
+
+    def setUp(self):
+        self.client.login(username='spam', password='eggs')
+
+    def benchmark(self, name, url):
+        response, result = measure(lambda: self.client.get(url), repeat=REPEAT)
+
+        self.assertEqual(200, response.status_code)
+        self.results[name] = result
+        print('\n%(name)s: %(queries)d queries, %(time_ms).2f ms, %(peak_memory_kb)d KB' % dict(result, name=name))
+
+        self.assertLessEqual(result['queries'], self.query_budgets[name],
+                             '%s ran %d queries, over its budget of %d.' % (name, result['queries'], self.query_budgets[name]))
+
+    def test_dashboard(self):
+        self.benchmark('dashboard', reverse('dashboard'))
+
+    def test_summary_list(self):
+        self.benchmark('summary_list', reverse('summary:summary_list'))
+
+    def test_summary_year(self):
+        self.benchmark('summary_year', reverse('summary:summary_year', kwargs={'year': date.today().year}))
+
+    def test_summary_month(self):
+        today = date.today()
+        self.benchmark('summary_month', reverse('summary:summary_month', kwargs={'year': today.year,
+                                                                                 'month': today.month}))
+
+    def test_summary_report(self):
+        self.benchmark('summary_report', reverse('summary:summary_report'))
+
+    def test_summary_transactions(self):
+        today = date.today()
+        self.benchmark('summary_transactions', '%s?category=%s&start_date=%s&end_date=%s' % (
+            reverse('summary:summary_transactions'), self.categories[0].slug, date(today.year, 1, 1), today))
+
+    def test_category_list(self):
+        self.benchmark('category_list', reverse('category:category_list'))
+
+    def test_budget_list(self):
+        self.benchmark('budget_list', reverse('budget:budget_list'))
+
+    def test_estimate_list(self):
+        self.benchmark('estimate_list', reverse('budget:estimate_list', kwargs={'slug': self.budgets[-1].slug}))
+
+    def test_transaction_list(self):
+        self.benchmark('transaction_list', reverse('transaction:transaction_list'))
+
+    @override_settings(BUDGET_CURSOR_PAGINATION=True)
+    def test_transaction_list_cursor(self):
+        self.benchmark('transaction_list_cursor', reverse('transaction:transaction_list'))
@@ -0,0 +1,116 @@
+from __future__ import unicode_literals
+
+import gc
+import os
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from model_mommy import mommy
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+    import resource
+
+BATCH_SIZE = 1000
+
+CATEGORIES = int(os.environ.get('BENCHMARK_CATEGORIES', 100))
+BUDGETS = int(os.environ.get('BENCHMARK_BUDGETS', 20))
+TRANSACTIONS = int(os.environ.get('BENCHMARK_TRANSACTIONS', 100000))
+
+
+def seed_transactions(categories, count, start_date=None, days=365, deleted_ratio=0.05):
+    """
+    Creates count random transactions over the given days with bulk_create,
+    then rebuilds the monthly totals, which bulk_create skips.
+    """
+    from transaction.models import MonthlyCategoryTotal, Transaction
+
+    start_date = start_date or date.today() - timedelta(days=days)
+    types = (Transaction.EXPENSE,) * 4 + (Transaction.INCOME,)
+    batch = []
+
+    for _ in range(count):
+        batch.append(mommy.prepare(Transaction,
+                                   category=random.choice(categories),
+                                   transaction_type=random.choice(types),
+                                   amount=Decimal(random.randint(1, 100000)) / 100,
+                                   date=start_date + timedelta(days=random.randint(0, days - 1)),
+                                   is_deleted=random.random() < deleted_ratio))
+
+        if len(batch) == BATCH_SIZE:
+            Transaction.objects.bulk_create(batch)
+            batch = []
+
+    Transaction.objects.bulk_create(batch)
+    MonthlyCategoryTotal.objects.rebuild()
+
+
+def seed_dataset(categories=CATEGORIES, budgets=BUDGETS, transactions=TRANSACTIONS, days=365):
+    """
+    Creates the categories, budgets starting along the period, each with an
+    estimate for every category, and the transactions.
+    """
+    from budget.models import BudgetEstimate
+
+    start_date = date.today() - timedelta(days=days)
+    categories = mommy.make('Category', _quantity=categories)
+    budgets = [mommy.make('Budget', start_date=start_date + timedelta(days=days * index // budgets))
+               for index in range(budgets)]
+
+    BudgetEstimate.objects.bulk_create([mommy.prepare(BudgetEstimate, budget=budget, category=category)
+                                        for budget in budgets for category in categories])
+
+    seed_transactions(categories, transactions, start_date=start_date, days=days)
+
+    return categories, budgets
+
+
+def measure(function, repeat=1):
+    """
+    Calls the function repeat times and returns its last result with the
+    number of queries of a call, the best wall time in milliseconds and the
+    peak memory in kilobytes.
+
+    The peak memory is the traced peak on Python 3 and the growth of the
+    maximum resident set size, a coarser figure, on Python 2.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        gc.collect()
+        memory = _start_memory()
+
+        with CaptureQueriesContext(connection) as context:
+            started = time.time()
+            result = function()
+            timings.append((time.time() - started) * 1000)
+
+        peak_memory = _peak_memory(memory)
+
+    return result, {'queries': len(context.captured_queries),
+                    'time_ms': round(min(timings), 2),
+                    'peak_memory_kb': peak_memory}
+
+
+def _start_memory():
+    if tracemalloc:
+        tracemalloc.start()
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _peak_memory(start):
+    if tracemalloc:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak // 1024
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start
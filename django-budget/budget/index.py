@@ -0,0 +1,103 @@
+"""
+In-process index of the active budgets by start date.
+
+The budget of a date is the active one with the latest start date on or
+before it, found with a binary search instead of a query. The index is
+rebuilt on the next lookup after a budget changes, in this process through
+the model signals and in the others through the budget version, which is
+why the budget cache must be shared by the processes (see
+base.cache.check_shared_cache).
+"""
+
+from __future__ import unicode_literals
+
+from bisect import bisect_right
+from datetime import datetime
+from threading import Lock
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from base.cache import get_versions
+
+
+class BudgetIndex(object):
+    def __init__(self, model):
+        self.model = model
+        self.lock = Lock()
+        self.stale = True
+        # The budget version the entries were built for, and the entries:
+        # the start dates, sorted, and the field values of their budgets.
+        # Replaced together, so a reader never pairs a version with the
+        # entries of another one.
+        self.state = (None, ((), ()))
+
+    def invalidate(self, **kwargs):
+        self.stale = True
+
+    def budget_for_date(self, date):
+        """
+        The active budget for the date, raises DoesNotExist if none.
+        """
+        budget = self.budgets_for_dates([date])[0]
+
+        if budget is None:
+            raise self.model.DoesNotExist('No active budget starts on or before %s.' % date)
+
+        return budget
+
+    def budgets_for_dates(self, dates):
+        """
+        The active budget for each date, or None, in the order given.
+        """
+        start_dates, rows = self.get_entries()
+        budgets = []
+
+        for date in dates:
+            position = bisect_right(start_dates, _as_date(date))
+            budgets.append(self._budget(rows[position - 1]) if position else None)
+
+        return budgets
+
+    def get_entries(self):
+        version, entries = self.state
+
+        if self.stale or version != get_versions('budget')[0]:
+            with self.lock:
+                # Another thread may have rebuilt it while this one waited.
+                current = get_versions('budget')[0]
+                version, entries = self.state
+
+                if self.stale or version != current:
+                    self.stale = False
+                    entries = self._build()
+                    self.state = (current, entries)
+
+        return entries
+
+    def _build(self):
+        fields = [field.attname for field in self.model._meta.concrete_fields]
+        rows = list(self.model.objects.filter(is_deleted=False)
+                                      .order_by('start_date', 'pk')
+                                      .values_list(*fields))
+        position = fields.index('start_date')
+
+        return tuple(row[position] for row in rows), tuple(rows)
+
+    def _budget(self, row):
+        # A new instance each time, so what is memoized on it is not shared
+        # between requests.
+        budget = self.model(*row)
+        budget._state.adding = False
+        budget._state.db = DEFAULT_DB_ALIAS
+        return budget
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+
+        return value.date()
+
+    return value
@@ -5,17 +5,27 @@ from decimal import Decimal
 
 from django.db import models
 from django.db.models import Sum
+from django.db.models.signals import post_delete, post_save
 from django.utils.translation import ugettext_lazy as _
 from django.utils.encoding import python_2_unicode_compatible
 
-from base.models import ActiveManager, StandardMetadata
+from base.cache import bump_version, bump_version_on_change
+from base.models import ActiveManager, SoftDeleteManager, StandardMetadata
+from base.signals import post_restore, post_soft_delete, pre_restore, pre_soft_delete
 from category.models import Category
-from transaction.models import Transaction
+from transaction.models import ArchivedTransaction, MonthlyCategoryTotal, Transaction
+from .index import BudgetIndex
 
 
 class BudgetLatestManager(ActiveManager):
     def most_current_for_date(self, date):
-        return super(BudgetLatestManager, self).get_query_set().filter(start_date__lte=date).latest('start_date')
+        return budget_index.budget_for_date(date)
+
+    def most_current_for_dates(self, dates):
+        """
+        The budget for each date, or None, with at most one query.
+        """
+        return budget_index.budgets_for_dates(dates)
 
 
 @python_2_unicode_compatible
@@ -26,41 +36,106 @@ class Budget(StandardMetadata):
                                   default=date.today,
                                   db_index=True)
 
-    objects = models.Manager()
+    objects = SoftDeleteManager()
     active = BudgetLatestManager()
 
+    soft_delete_cascade = ('estimates',)
+
     def __str__(self):
         return self.name
 
     def actual_total(self, start_date, end_date):
-        actual_total = Decimal('0.0')
+        """
+        The total spent in the period, memoized on the instance so templates
+        can ask for it again for free.
+        """
+        if not hasattr(self, '_actual_totals'):
+            self._actual_totals = {}
 
-        for estimate in self.estimates.exclude(is_deleted=True):
-            actual_amount = estimate.actual_amount(start_date, end_date)
-            actual_total += actual_amount
+        if (start_date, end_date) not in self._actual_totals:
+            category_ids = list(self.estimates.exclude(is_deleted=True).values_list('category', flat=True))
+            amounts = {}
 
-        return actual_total
+            if category_ids:
+                amounts = MonthlyCategoryTotal.objects.amounts_by_category(start_date, end_date, category_ids)
 
-    def estimates_and_transactions(self, start_date, end_date):
-        estimates_and_transactions = []
+            actual_amounts = (amounts.get(category_id, Decimal('0.0')) for category_id in category_ids)
+            self._actual_totals[(start_date, end_date)] = sum(actual_amounts, Decimal('0.0'))
+
+        return self._actual_totals[(start_date, end_date)]
+
+    def estimates_and_actual_amounts(self, start_date, end_date):
+        """
+        Pairs the budget estimates with the expenses total of their category
+        in the given period, in two queries, without the expenses themselves.
+        """
+        estimates = list(self.estimates.exclude(is_deleted=True).select_related('category'))
+        category_ids = set(estimate.category_id for estimate in estimates)
+        self._monthly_estimated_total = sum((estimate.amount for estimate in estimates), Decimal('0.0'))
+
+        if not category_ids:
+            return ([], Decimal('0.0'))
+
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(start_date, end_date, category_ids)
+
+        estimates_and_amounts = []
         actual_total = Decimal('0.0')
 
-        for estimate in self.estimates.exclude(is_deleted=True):
-            actual_amount = estimate.actual_amount(start_date, end_date)
+        for estimate in estimates:
+            actual_amount = amounts.get(estimate.category_id) or Decimal('0.0')
             actual_total += actual_amount
-            estimates_and_transactions.append({
+            estimates_and_amounts.append({
                 'estimate': estimate,
-                'transactions': estimate.actual_transactions(start_date, end_date),
                 'actual_amount': actual_amount,
             })
 
+        return (estimates_and_amounts, actual_total)
+
+    def estimates_and_transactions(self, start_date, end_date):
+        """
+        Groups the budget estimates with the expenses of its category in the
+        given period.
+
+        The number of queries is fixed: the estimates and their totals, as in
+        estimates_and_actual_amounts, and one for the expenses themselves,
+        plus one for the archived ones when the archive has the period, which
+        are bucketed by category in Python, by date.
+        """
+        estimates_and_transactions, actual_total = self.estimates_and_actual_amounts(start_date, end_date)
+        category_ids = set(group['estimate'].category_id for group in estimates_and_transactions)
+
+        if not category_ids:
+            return (estimates_and_transactions, actual_total)
+
+        expenses = [Transaction.expenses.filter(category__in=category_ids,
+                                                date__range=(start_date, end_date))]
+
+        if ArchivedTransaction.objects.covers(start_date, end_date):
+            expenses.append(ArchivedTransaction.objects.filter(category__in=category_ids,
+                                                               transaction_type=Transaction.EXPENSE,
+                                                               is_deleted=False,
+                                                               date__range=(start_date, end_date)))
+
+        transactions = dict((category_id, []) for category_id in category_ids)
+        for queryset in expenses:
+            for transaction in queryset.order_by('date', 'id'):
+                transactions[transaction.category_id].append(transaction)
+
+        for group in estimates_and_transactions:
+            group['transactions'] = sorted(transactions[group['estimate'].category_id],
+                                           key=lambda transaction: (transaction.date, transaction.pk))
+
         return (estimates_and_transactions, actual_total)
 
     def monthly_estimated_total(self):
-        total = Decimal('0.0')
-        for estimate in self.estimates.exclude(is_deleted=True):
-            total += estimate.amount
-        return total
+        """
+        Memoized on the instance, like actual_total.
+        """
+        if not hasattr(self, '_monthly_estimated_total'):
+            total = self.estimates.exclude(is_deleted=True).aggregate(Sum('amount'))['amount__sum']
+            self._monthly_estimated_total = total or Decimal('0.0')
+
+        return self._monthly_estimated_total
 
     def yearly_estimated_total(self):
         return self.monthly_estimated_total() * 12
@@ -70,6 +145,16 @@ class Budget(StandardMetadata):
         verbose_name_plural = _('Budgets')
 
 
+budget_index = BudgetIndex(Budget)
+
+
+def estimates_version(budget_id):
+    """
+    The name of the version of the estimates of a budget.
+    """
+    return 'estimate:%d' % budget_id
+
+
 @python_2_unicode_compatible
 class BudgetEstimate(StandardMetadata):
     budget = models.ForeignKey(Budget,
@@ -82,7 +167,7 @@ class BudgetEstimate(StandardMetadata):
                                  limit_choices_to={'is_deleted': False})
     amount = models.DecimalField(_('Amount'), max_digits=11, decimal_places=2)
 
-    objects = models.Manager()
+    objects = SoftDeleteManager()
     active = ActiveManager()
 
     def __str__(self):
@@ -94,9 +179,8 @@ class BudgetEstimate(StandardMetadata):
                                            ).order_by('date')
 
     def actual_amount(self, start_date, end_date):
-        return Transaction.expenses.filter(category=self.category,
-                                           date__range=(start_date, end_date)
-                                           ).aggregate(Sum('amount'))['amount__sum'] or Decimal('0.0')
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(start_date, end_date, [self.category_id])
+        return amounts.get(self.category_id, Decimal('0.0'))
 
     def yearly_estimated_amount(self):
         return self.amount * 12
@@ -104,3 +188,26 @@ class BudgetEstimate(StandardMetadata):
     class Meta:
         verbose_name = _('Budget estimate')
         verbose_name_plural = _('Budget estimates')
+
+
+bump_version_on_change(Budget, 'budget')
+post_save.connect(budget_index.invalidate, sender=Budget)
+post_delete.connect(budget_index.invalidate, sender=Budget)
+post_soft_delete.connect(budget_index.invalidate, sender=Budget)
+post_restore.connect(budget_index.invalidate, sender=Budget)
+bump_version_on_change(BudgetEstimate, 'estimate')
+
+
+def bump_estimates_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version(estimates_version(instance.budget_id))
+
+
+def bump_estimates_versions(sender, queryset, **kwargs):
+    budget_ids = queryset.order_by().values_list('budget', flat=True).distinct()
+    bump_version(*[estimates_version(budget_id) for budget_id in budget_ids])
+
+post_save.connect(bump_estimates_version, sender=BudgetEstimate)
+post_delete.connect(bump_estimates_version, sender=BudgetEstimate)
+pre_soft_delete.connect(bump_estimates_versions, sender=BudgetEstimate)
+pre_restore.connect(bump_estimates_versions, sender=BudgetEstimate)
@@ -1,10 +1,13 @@
 from __future__ import unicode_literals
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
 from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
 
+from mock import patch
 from model_mommy import mommy
 
 
@@ -76,6 +79,87 @@ class BudgetModelTest(TestCase):
         self.assertEqual(e2, estimates[1]['estimate'])
         self.assertEqual(Decimal('30.0'), estimates[1]['actual_amount'])
 
+    def test_budget_estimates_and_transactions_ignores_other_transactions(self):
+        from transaction.models import Transaction
+
+        budget = mommy.make('Budget')
+        start_date, end_date = date.today(), date.today()
+        category = mommy.make('Category')
+        estimate = mommy.make('BudgetEstimate', category=category, budget=budget)
+        expense = mommy.make('Transaction', amount=Decimal('10.0'), date=start_date, category=category)
+        mommy.make('Transaction', date=start_date, category=category, transaction_type=Transaction.INCOME)
+        mommy.make('Transaction', date=start_date - timedelta(days=1), category=category)
+        mommy.make('Transaction', date=start_date, category=category, is_deleted=True)
+        mommy.make('Transaction', date=start_date)
+
+        estimates, total = budget.estimates_and_transactions(start_date, end_date)
+
+        self.assertEqual(Decimal('10.0'), total)
+        self.assertEqual(estimate, estimates[0]['estimate'])
+        self.assertEqual([expense], estimates[0]['transactions'])
+
+    def test_budget_estimates_and_transactions_reads_the_archive_too(self):
+        from transaction.archive import archive_transactions, closed_year
+
+        budget = mommy.make('Budget')
+        category = mommy.make('Category')
+        estimate = mommy.make('BudgetEstimate', category=category, budget=budget)
+        archived = mommy.make('Transaction', amount=Decimal('10.0'), date=date(2013, 12, 20), category=category)
+        live = mommy.make('Transaction', amount=Decimal('5.0'), date=date(2014, 1, 5), category=category)
+        archive_transactions(closed_year(2013))
+
+        estimates, total = budget.estimates_and_transactions(date(2013, 12, 1), date(2014, 1, 31))
+
+        self.assertEqual(Decimal('15.0'), total)
+        self.assertEqual(estimate, estimates[0]['estimate'])
+        self.assertEqual([archived.pk, live.pk], [transaction.pk for transaction in estimates[0]['transactions']])
+
+    def test_budget_estimates_and_transactions_query_count_is_fixed(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        start_date, end_date = date.today(), date.today()
+
+        def count_queries(estimates):
+            budget = mommy.make('Budget')
+            for category in mommy.make('Category', _quantity=estimates):
+                mommy.make('BudgetEstimate', category=category, budget=budget)
+                mommy.make('Transaction', date=start_date, category=category, _quantity=2)
+
+            with CaptureQueriesContext(connection) as context:
+                budget.estimates_and_transactions(start_date, end_date)
+
+            return len(context)
+
+        self.assertEqual(count_queries(1), count_queries(10))
+
+    def test_budget_monthly_estimated_total(self):
+        budget = mommy.make('Budget')
+        mommy.make('BudgetEstimate', budget=budget, amount=Decimal('10.0'))
+        mommy.make('BudgetEstimate', budget=budget, amount=Decimal('2.5'))
+        mommy.make('BudgetEstimate', budget=budget, amount=Decimal('5.0'), is_deleted=True)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Decimal('12.5'), budget.monthly_estimated_total())
+            self.assertEqual(Decimal('12.5'), budget.monthly_estimated_total())
+            self.assertEqual(Decimal('150.0'), budget.yearly_estimated_total())
+
+    def test_budget_monthly_estimated_total_without_estimates(self):
+        budget = mommy.make('Budget')
+
+        self.assertEqual(Decimal('0.0'), budget.monthly_estimated_total())
+
+    def test_budget_actual_total_is_memoized(self):
+        budget = mommy.make('Budget')
+        category = mommy.make('Category')
+        mommy.make('BudgetEstimate', category=category, budget=budget)
+        mommy.make('Transaction', amount=Decimal('10.0'), date=date.today(), category=category)
+
+        self.assertEqual(Decimal('10.0'), budget.actual_total(date.today(), date.today()))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(Decimal('10.0'), budget.actual_total(date.today(), date.today()))
+
     def test_budget_most_current_for_date(self):
         from budget.models import Budget
 
@@ -90,3 +174,104 @@ class BudgetModelTest(TestCase):
 
         self.assertEqual(3, Budget.active.count())
         self.assertEqual(budget, Budget.active.most_current_for_date(end_date))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'budget-index-tests'}})
+class BudgetIndexTest(TestCase):
+    def setUp(self):
+        from base.cache import get_budget_cache
+
+        get_budget_cache().clear()
+
+    def test_lookups_are_served_from_the_index(self):
+        from budget.models import Budget
+
+        today = date.today()
+        budget = mommy.make(Budget, start_date=today - timedelta(days=1))
+        Budget.active.most_current_for_date(today)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(budget, Budget.active.most_current_for_date(today))
+            self.assertEqual(budget.name, Budget.active.most_current_for_date(today).name)
+
+    def test_lookups_return_new_instances(self):
+        from budget.models import Budget
+
+        today = date.today()
+        mommy.make(Budget, start_date=today)
+
+        self.assertIsNot(Budget.active.most_current_for_date(today),
+                         Budget.active.most_current_for_date(today))
+
+    def test_index_is_rebuilt_when_a_budget_changes(self):
+        from budget.models import Budget
+
+        today = date.today()
+        old_budget = mommy.make(Budget, start_date=today - timedelta(days=7))
+        self.assertEqual(old_budget, Budget.active.most_current_for_date(today))
+
+        new_budget = mommy.make(Budget, start_date=today)
+        self.assertEqual(new_budget, Budget.active.most_current_for_date(today))
+
+        new_budget.delete()
+        self.assertEqual(old_budget, Budget.active.most_current_for_date(today))
+
+        old_budget.delete()
+        self.assertRaises(Budget.DoesNotExist, Budget.active.most_current_for_date, today)
+
+    def test_index_is_rebuilt_when_the_version_changes(self):
+        from base.cache import bump_version
+        from budget.models import Budget
+
+        today = date.today()
+        budget = mommy.make(Budget, start_date=today)
+        self.assertEqual(budget, Budget.active.most_current_for_date(today))
+
+        # A change made by another process.
+        Budget.objects.filter(pk=budget.pk).update(is_deleted=True)
+        bump_version('budget')
+
+        self.assertRaises(Budget.DoesNotExist, Budget.active.most_current_for_date, today)
+
+    def test_a_change_during_a_rebuild_is_not_missed(self):
+        from base.cache import bump_version, get_versions
+        from budget.models import Budget, budget_index
+
+        today = date.today()
+        budget = mommy.make(Budget, start_date=today)
+        build = budget_index._build
+
+        def build_while_another_process_changes_a_budget():
+            entries = build()
+            Budget.objects.filter(pk=budget.pk).update(is_deleted=True)
+            bump_version('budget')
+            return entries
+
+        with patch.object(budget_index, '_build', build_while_another_process_changes_a_budget):
+            self.assertEqual(budget, Budget.active.most_current_for_date(today))
+
+        self.assertNotEqual(budget_index.state[0], get_versions('budget')[0])
+        self.assertRaises(Budget.DoesNotExist, Budget.active.most_current_for_date, today)
+
+    def test_budgets_for_many_dates_in_one_query(self):
+        from budget.models import Budget
+
+        first = mommy.make(Budget, start_date=date(2014, 3, 1))
+        second = mommy.make(Budget, start_date=date(2014, 7, 15))
+        months = [date(2014, month, 1) for month in range(1, 13)]
+
+        with self.assertNumQueries(1):
+            budgets = Budget.active.most_current_for_dates(months)
+
+        self.assertEqual([None, None] + [first] * 5 + [second] * 5, budgets)
+
+    def test_datetimes_are_looked_up_by_their_local_date(self):
+        from budget.models import Budget
+
+        budget = mommy.make(Budget, start_date=date(2014, 3, 1))
+        midnight = timezone.make_aware(datetime(2014, 3, 1), timezone.get_current_timezone())
+
+        self.assertEqual(budget, Budget.active.most_current_for_date(midnight))
+        self.assertRaises(Budget.DoesNotExist, Budget.active.most_current_for_date,
+                          midnight - timedelta(seconds=1))
@@ -8,11 +8,13 @@ from django.utils.translation import ugettext_lazy as _
 
 from braces.views import LoginRequiredMixin
 
+from base.views import ConditionalGetMixin
+
 from .forms import BudgetEstimateForm, BudgetForm
 from .models import Budget, BudgetEstimate
 
 
-class BudgetListView(LoginRequiredMixin, ListView):
+class BudgetListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Budget
     template_name = 'budget/list.html'
     context_object_name = 'budgets'
@@ -51,12 +53,14 @@ class BudgetDeleteView(LoginRequiredMixin, DeleteView):
 budget_delete = BudgetDeleteView.as_view()
 
 
-class BudgetEstimateListView(LoginRequiredMixin, ListView):
+class BudgetEstimateListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = BudgetEstimate
     template_name = "estimate/list.html"
     context_object_name = 'estimates'
     queryset = BudgetEstimate.active.select_related().all()
     paginate_by = 10
+    # The page shows the budget and the names of the categories too.
+    validator_versions = ('budget', 'estimate', 'category')
 
     def get_context_data(self, *args, **kwargs):
         context = super(BudgetEstimateListView, self).get_context_data(*args, **kwargs)
@@ -5,7 +5,8 @@ from django.db import models
 from django.utils.translation import ugettext_lazy as _
 from django.utils.encoding import python_2_unicode_compatible
 
-from base.models import ActiveManager, StandardMetadata
+from base.cache import bump_version_on_change
+from base.models import ActiveManager, SoftDeleteManager, StandardMetadata
 
 
 @python_2_unicode_compatible
@@ -21,9 +22,11 @@ class Category(StandardMetadata):
     name = models.CharField(_('Name'), max_length=100)
     slug = models.SlugField(_('Slug'), unique=True)
 
-    objects = models.Manager()
+    objects = SoftDeleteManager()
     active = ActiveManager()
 
+    soft_delete_cascade = ('estimates', 'transaction_set')
+
     def __str__(self):
         return self.name
 
@@ -33,3 +36,6 @@ class Category(StandardMetadata):
     class Meta:
         verbose_name = _('Category')
         verbose_name_plural = _('Categories')
+
+
+bump_version_on_change(Category, 'category')
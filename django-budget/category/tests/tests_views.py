@@ -94,6 +94,22 @@ class CategoryListViewTest(BaseTestCase):
         self.assertEqual(302, response.status_code)
         self.assertEqual('%s?next=%s' % (reverse('login'), self.url), response._headers['location'][1])
 
+    def test_not_modified(self):
+        mommy.make('Category')
+        etag = self.get()['ETag']
+
+        request = self.factory.get(path=self.url, user=self.mock_user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, self.view(request).status_code)
+
+    def test_modified_when_a_category_changes(self):
+        category = mommy.make('Category')
+        etag = self.get()['ETag']
+
+        category.delete()
+
+        request = self.factory.get(path=self.url, user=self.mock_user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, self.view(request).status_code)
+
     def get(self):
         request = self.factory.get(path=self.url, user=self.mock_user)
         response = self.view(request)
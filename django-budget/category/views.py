@@ -7,11 +7,13 @@ from django.utils.translation import ugettext_lazy as _
 
 from braces.views import LoginRequiredMixin
 
+from base.views import ConditionalGetMixin
+
 from .forms import CategoryForm
 from .models import Category
 
 
-class CategoryListView(LoginRequiredMixin, ListView):
+class CategoryListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Category
     template_name = 'category/list.html'
     context_object_name = 'categories'
@@ -59,6 +59,44 @@ DATABASES = {
 # END DATABASE CONFIGURATION
 
 
+# CACHE CONFIGURATION
+# See: https://docs.djangoproject.com/en/dev/ref/settings/#caches
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Cache used for the dashboard and the summaries, its entries are versioned
+# by the data they depend on, so the timeout only bounds the memory used.
+BUDGET_CACHE_ALIAS = 'default'
+BUDGET_CACHE_TIMEOUT = 60 * 60
+# The cache also holds the versions of the data, so with several processes
+# it must be shared by them, checked at startup by config.wsgi when on.
+BUDGET_REQUIRE_SHARED_CACHE = False
+# END CACHE CONFIGURATION
+
+
+# PAGINATION CONFIGURATION
+# Paginate the transaction list by cursor, without OFFSET and COUNT(*),
+# for large ledgers.
+BUDGET_CURSOR_PAGINATION = False
+# END PAGINATION CONFIGURATION
+
+
+# SQL PROFILING CONFIGURATION
+# The requests over these thresholds are logged to budget.sql, the duplicate
+# threshold is the number of runs of one statement that flags an N+1.
+BUDGET_SQL_PROFILING = True
+BUDGET_SLOW_REQUEST_MS = 500
+BUDGET_SLOW_QUERY_MS = 100
+BUDGET_MAX_REQUEST_QUERIES = 50
+BUDGET_DUPLICATE_QUERY_THRESHOLD = 5
+# Send the database and total timings in a Server-Timing header.
+BUDGET_SERVER_TIMING = False
+# END SQL PROFILING CONFIGURATION
+
+
 # GENERAL CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#time-zone
 TIME_ZONE = 'America/Los_Angeles'
@@ -159,12 +197,24 @@ TEMPLATE_LOADERS = (
 TEMPLATE_DIRS = (
     normpath(join(SITE_ROOT, 'templates')),
 )
+
+# Compile every template when the WSGI application is loaded, only useful
+# with the cached loader, as in production.
+BUDGET_WARM_TEMPLATES = False
+
+# Measure the time spent rendering each template, the requests that spend
+# BUDGET_SLOW_RENDER_MS or more rendering are logged to budget.templates.
+BUDGET_TEMPLATE_TIMING = False
+BUDGET_SLOW_RENDER_MS = 100
 # END TEMPLATE CONFIGURATION
 
 
 # MIDDLEWARE CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#middleware-classes
 MIDDLEWARE_CLASSES = (
+    # First, so the queries of every other middleware are profiled too.
+    'base.middleware.QueryProfilingMiddleware',
+    'base.middleware.RenderTimingMiddleware',
     # Default Django middleware.
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -214,6 +264,7 @@ LOCAL_APPS = (
     'budget',
     'summary',
     'dashboard',
+    'api',
 )
 
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -241,6 +292,10 @@ LOGGING = {
             'level': 'ERROR',
             'filters': ['require_debug_false'],
             'class': 'django.utils.log.AdminEmailHandler'
+        },
+        'console': {
+            'level': 'DEBUG',
+            'class': 'logging.StreamHandler'
         }
     },
     'loggers': {
@@ -249,6 +304,21 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'budget.sql': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'budget.templates': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'budget.search': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     }
 }
 # END LOGGING CONFIGURATION
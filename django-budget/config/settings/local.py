@@ -15,6 +15,11 @@ TEMPLATE_DEBUG = DEBUG
 # END DEBUG CONFIGURATION
 
 
+# TEMPLATE CONFIGURATION
+BUDGET_TEMPLATE_TIMING = True
+# END TEMPLATE CONFIGURATION
+
+
 # EMAIL CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
@@ -57,10 +57,52 @@ DATABASES = {}
 
 # CACHE CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#caches
-CACHES = {}
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    # LOCATION is the directory where the cache files are stored.
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    # LOCATION is the table name, create it with createcachetable.
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    # LOCATION is the address of the server, e.g. 127.0.0.1:11211.
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+}
+
+# The database cache by default, shared by every process without another
+# server, create its table once with make createcachetable.
+CACHE_BACKEND = environ.get('CACHE_BACKEND', 'db')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': environ.get('CACHE_LOCATION', 'budget_cache' if CACHE_BACKEND == 'db' else ''),
+    }
+}
+
+# locmem is only right for a single process, set BUDGET_REQUIRE_SHARED_CACHE
+# to off to use it.
+BUDGET_REQUIRE_SHARED_CACHE = environ.get('BUDGET_REQUIRE_SHARED_CACHE', '') != 'off'
 # END CACHE CONFIGURATION
 
 
+# SQL PROFILING CONFIGURATION
+BUDGET_SLOW_REQUEST_MS = int(environ.get('BUDGET_SLOW_REQUEST_MS', BUDGET_SLOW_REQUEST_MS))
+BUDGET_SLOW_QUERY_MS = int(environ.get('BUDGET_SLOW_QUERY_MS', BUDGET_SLOW_QUERY_MS))
+BUDGET_SERVER_TIMING = environ.get('BUDGET_SERVER_TIMING', '') == 'on'
+# END SQL PROFILING CONFIGURATION
+
+
+# TEMPLATE CONFIGURATION
+# See: https://docs.djangoproject.com/en/dev/ref/templates/api/#django.template.loaders.cached.Loader
+TEMPLATE_LOADERS = (
+    ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+)
+
+BUDGET_WARM_TEMPLATES = True
+BUDGET_TEMPLATE_TIMING = environ.get('BUDGET_TEMPLATE_TIMING', '') == 'on'
+BUDGET_SLOW_RENDER_MS = int(environ.get('BUDGET_SLOW_RENDER_MS', BUDGET_SLOW_RENDER_MS))
+# END TEMPLATE CONFIGURATION
+
+
 # SECRET CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#secret-key
 SECRET_KEY = get_env_setting('SECRET_KEY')
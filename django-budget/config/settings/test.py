@@ -21,6 +21,15 @@ DATABASES = {
     },
 }
 
+# CACHE CONFIGURATION
+# Tests share the process, so nothing is cached unless a test enables it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+# END CACHE CONFIGURATION
+
 # TEMPLATE CONFIGURATION
 # https://docs.djangoproject.com/en/dev/ref/settings/#template-string-if-invalid
 TEMPLATE_STRING_IF_INVALID = 'INVALID VARIABLE: (%s)'
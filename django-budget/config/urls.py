@@ -15,6 +15,8 @@ urlpatterns = patterns(
 
     url(r'^i18n/',
         include('django.conf.urls.i18n')),
+    url(r'^api/',
+        include('api.urls', namespace='api')),
 )
 
 urlpatterns += i18n_patterns(
@@ -14,3 +14,11 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
+
+# Refuse to start with a cache that the other processes don't see.
+from base.cache import check_shared_cache
+check_shared_cache()
+
+# Fill the cached template loader before the first request.
+from base.rendering import warm_templates
+warm_templates()
@@ -1,9 +1,13 @@
 from __future__ import unicode_literals
 
+from datetime import date
 from decimal import Decimal
 
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 
+from mock import patch
 from model_mommy import mommy
 
 from base.utils import BaseTestCase
@@ -130,6 +134,18 @@ class DashboardViewTest(BaseTestCase):
 
         self.assertContains(response, 'style="width: 75%;"')
 
+    def test_amount_used_is_the_current_month_only(self):
+        category = mommy.make('Category')
+        budget = mommy.make('Budget', start_date=date(2014, 1, 1))
+        mommy.make('BudgetEstimate', budget=budget, category=category, amount=Decimal('100.0'))
+        mommy.make('Transaction', category=category, amount=Decimal('10.0'), date=date(2014, 11, 30))
+        mommy.make('Transaction', category=category, amount=Decimal('20.0'), date=date(2014, 12, 1))
+        mommy.make('Transaction', category=category, amount=Decimal('40.0'), date=date(2015, 1, 1))
+
+        for day, amount_used in ((date(2014, 11, 15), Decimal('10.0')), (date(2014, 12, 31), Decimal('20.0'))):
+            with patch('dashboard.views.today', return_value=day):
+                self.assertEqual(amount_used, self.get().context['amount_used'])
+
     def test_view_redirect_if_anonymous(self):
         url = reverse('dashboard')
         request = self.factory.get(path=url, user=self.anonymous_user)
@@ -147,3 +163,57 @@ class DashboardViewTest(BaseTestCase):
         url = reverse('dashboard')
         request = self.factory.get(path=url, user=self.mock_user)
         return self.view(request)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'dashboard-tests'}})
+class DashboardCacheTest(BaseTestCase):
+    def setUp(self):
+        from base.cache import get_budget_cache
+
+        super(DashboardCacheTest, self).setUp()
+        get_budget_cache().clear()
+
+        self.budget = mommy.make('Budget')
+        self.category = mommy.make('Category')
+        mommy.make('BudgetEstimate', budget=self.budget, category=self.category, amount=Decimal('10.0'))
+
+    def test_warm_request_runs_no_queries(self):
+        mommy.make('Transaction', category=self.category, amount=Decimal('2.5'))
+        self.get()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get()
+
+        self.assertFalse([query for query in queries if 'transaction' in query['sql'] or 'budget' in query['sql']])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(Decimal('2.5'), response.context['amount_used'])
+        self.assertEqual(1, response.context['latest_expenses'].count())
+
+    def test_cache_is_invalidated_by_a_new_transaction(self):
+        self.get()
+        mommy.make('Transaction', category=self.category, amount=Decimal('2.5'))
+        response = self.get()
+
+        self.assertEqual(Decimal('2.5'), response.context['amount_used'])
+        self.assertEqual(25, response.context['progress_bar_percent'])
+
+    def test_cache_is_invalidated_by_a_deleted_transaction(self):
+        transaction = mommy.make('Transaction', category=self.category, amount=Decimal('2.5'))
+        self.get()
+        transaction.delete()
+        response = self.get()
+
+        self.assertEqual(Decimal('0.0'), response.context['amount_used'])
+        self.assertEqual(0, response.context['latest_expenses'].count())
+
+    def test_cache_is_invalidated_by_a_changed_estimate(self):
+        self.get()
+        mommy.make('BudgetEstimate', budget=self.budget, amount=Decimal('10.0'))
+        response = self.get()
+
+        self.assertEqual(Decimal('20.0'), response.context['estimated_amount'])
+
+    def get(self):
+        self.login()
+        return self.client.get(reverse('dashboard'))
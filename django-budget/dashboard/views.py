@@ -1,47 +1,51 @@
 from __future__ import unicode_literals
 
-from datetime import date, timedelta
 from decimal import InvalidOperation
 
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
-from django.utils import timezone
 
+from base.cache import get_budget_cache, get_cache_timeout, get_versions, make_key
+from base.dates import month_window, today
 from budget.models import Budget
 from transaction.models import Transaction
 
 
 @login_required
 def dashboard(request):
-    try:
-        budget = Budget.active.most_current_for_date(timezone.now())
+    day = today()
+    start_date, end_date = month_window(day)
 
-    except Budget.DoesNotExist:
-        return redirect('setup')
+    cache = get_budget_cache()
+    key = make_key('dashboard', day, *get_versions('transaction', 'estimate', 'budget', 'category'))
+    ctx = cache.get(key)
 
-    latest_expenses = Transaction.expenses.get_latest()
-    latest_incomes = Transaction.incomes.get_latest()
+    if ctx is None:
+        try:
+            budget = Budget.active.most_current_for_date(day)
 
-    now = timezone.now()
-    start_date = date(now.year, now.month, 1)
-    end_year, end_month = now.year, now.month + 1
+        except Budget.DoesNotExist:
+            return redirect('setup')
 
-    end_date = date(end_year, end_month + 1, 1) - timedelta(days=1)
+        latest_expenses = Transaction.expenses.get_latest()
+        latest_incomes = Transaction.incomes.get_latest()
 
-    estimated_amount = budget.monthly_estimated_total()
-    amount_used = budget.actual_total(start_date, end_date)
+        estimated_amount = budget.monthly_estimated_total()
+        amount_used = budget.actual_total(start_date, end_date)
 
-    try:
-        progress_bar_percent = min(100, amount_used / estimated_amount * 100)
+        try:
+            progress_bar_percent = min(100, amount_used / estimated_amount * 100)
 
-    except InvalidOperation:
-        progress_bar_percent = 0
+        except InvalidOperation:
+            progress_bar_percent = 0
 
-    ctx = {'budget': budget,
-           'estimated_amount': estimated_amount,
-           'amount_used': amount_used,
-           'latest_incomes': latest_incomes,
-           'latest_expenses': latest_expenses,
-           'progress_bar_percent': progress_bar_percent}
+        ctx = {'budget': budget,
+               'estimated_amount': estimated_amount,
+               'amount_used': amount_used,
+               'latest_incomes': latest_incomes,
+               'latest_expenses': latest_expenses,
+               'progress_bar_percent': progress_bar_percent}
+
+        cache.set(key, ctx, get_cache_timeout())
 
     return render(request, 'dashboard.html', ctx)
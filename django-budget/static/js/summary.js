@@ -1,3 +1,42 @@
 $(document).ready(function() {
-    $('.collapse').collapse();
+    // The expenses of a category are loaded the first time it is expanded,
+    // a page at a time.
+    function loadTransactions(panel, cursor) {
+        var url = panel.data('url');
+
+        if (cursor) {
+            url += '&cursor=' + encodeURIComponent(cursor);
+        }
+
+        $.getJSON(url, function(data) {
+            var tbody = panel.find('tbody');
+
+            $.each(data.transactions, function(index, transaction) {
+                $('<tr>')
+                    .append($('<td>').text(transaction.notes))
+                    .append($('<td>').text(transaction.date_display))
+                    .append($('<td class="numeric">').text('$' + transaction.amount))
+                    .appendTo(tbody);
+            });
+
+            panel.find('.summary-transactions-empty').toggleClass('hidden', tbody.children().length > 0);
+            panel.find('.summary-transactions-more')
+                .toggleClass('hidden', !data.next_cursor)
+                .data('cursor', data.next_cursor);
+        });
+    }
+
+    $('.summary-transactions').on('show.bs.collapse', function() {
+        var panel = $(this);
+
+        if (!panel.data('loaded')) {
+            panel.data('loaded', true);
+            loadTransactions(panel);
+        }
+    });
+
+    $('.summary-transactions-more').on('click', function() {
+        var button = $(this);
+        loadTransactions(button.closest('.summary-transactions'), button.data('cursor'));
+    });
 });
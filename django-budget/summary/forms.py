@@ -0,0 +1,69 @@
+from __future__ import unicode_literals
+
+from datetime import date
+
+from django import forms
+from django.utils.translation import ugettext_lazy as _
+
+from crispy_forms.helper import FormHelper
+from crispy_forms.layout import Field, Layout
+
+from base.dates import last_day_of_month, months_between, today
+from category.models import Category
+
+
+class SummaryReportForm(forms.Form):
+    """
+    The months of the report, the last 12 by default. Only the month of
+    each date matters.
+    """
+    DEFAULT_MONTHS = 12
+    MAX_MONTHS = 120
+
+    start_date = forms.DateField(label=_('Start Date'), required=False)
+    end_date = forms.DateField(label=_('End Date'), required=False)
+
+    def __init__(self, *args, **kwargs):
+        super(SummaryReportForm, self).__init__(*args, **kwargs)
+
+        self.helper = FormHelper()
+        self.helper.form_method = 'get'
+        self.helper.form_class = 'form-inline'
+        self.helper.disable_csrf = True
+        self.helper.layout = Layout(
+            Field('start_date'),
+            Field('end_date'))
+
+    def clean(self):
+        cleaned_data = super(SummaryReportForm, self).clean()
+
+        if self._errors:
+            return cleaned_data
+
+        end_date = last_day_of_month(cleaned_data.get('end_date') or today())
+        start_date = cleaned_data.get('start_date')
+
+        if start_date is None:
+            year, month = divmod(end_date.year * 12 + end_date.month - self.DEFAULT_MONTHS, 12)
+            start_date = date(year, month + 1, 1)
+
+        start_date = start_date.replace(day=1)
+
+        if start_date > end_date:
+            raise forms.ValidationError(_('The start date must be before the end date.'))
+
+        if len(months_between(start_date, end_date)) > self.MAX_MONTHS:
+            raise forms.ValidationError(_('The report can have at most %d months.') % self.MAX_MONTHS)
+
+        cleaned_data['start_date'] = start_date
+        cleaned_data['end_date'] = end_date
+
+        return cleaned_data
+
+
+class SummaryTransactionsForm(forms.Form):
+    PAGE_SIZE = 50
+
+    category = forms.ModelChoiceField(queryset=Category.objects.all(), to_field_name='slug')
+    start_date = forms.DateField()
+    end_date = forms.DateField()
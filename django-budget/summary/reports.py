@@ -0,0 +1,138 @@
+"""
+Summaries of the estimated and the actual expenses.
+
+The period summary backs summary_month and summary_year, and is cached once
+the period is over, under the versions of its months' transactions and of
+its budget estimates.
+
+The category by month report reads the actual amounts of the whole period
+from the monthly totals in one query, and estimates each month by the budget
+active at its end, as in summary_month, resolved for every month at once.
+"""
+
+from __future__ import unicode_literals
+
+from datetime import date
+from decimal import Decimal
+
+from base.cache import get_budget_cache, get_cache_timeout, get_versions, make_key
+from base.dates import last_day_of_month, month_window, months_between, today, year_window
+from budget.models import Budget, BudgetEstimate, estimates_version
+from category.models import Category
+from transaction.models import MonthlyCategoryTotal, month_version
+
+ZERO = Decimal('0.0')
+
+
+def year_period(year):
+    return year_window(date(int(year), 1, 1))
+
+
+def month_period(year, month):
+    return month_window(date(int(year), int(month), 1))
+
+
+def period_versions(budget, start_date, end_date):
+    """
+    The versions of the data the summary of the period is computed from.
+    """
+    return get_versions('budget', 'category', estimates_version(budget.pk),
+                        *[month_version(month.year, month.month) for month in months_between(start_date, end_date)])
+
+
+def period_summary(start_date, end_date, budget=None):
+    """
+    Returns the budget of the period, its estimates with their actual amounts
+    and the actual total, raises Budget.DoesNotExist if there is no budget.
+    The budget may be given if it was already looked up.
+    """
+    budget = budget or Budget.active.most_current_for_date(end_date)
+
+    if end_date >= today():
+        return (budget,) + budget.estimates_and_actual_amounts(start_date, end_date)
+
+    key = make_key('summary', start_date, end_date, budget.pk, *period_versions(budget, start_date, end_date))
+
+    cache = get_budget_cache()
+    summary = cache.get(key)
+
+    if summary is None:
+        summary = (budget,) + budget.estimates_and_actual_amounts(start_date, end_date)
+        cache.set(key, summary, get_cache_timeout())
+
+    return summary
+
+
+def category_month_report(start_date, end_date):
+    """
+    Returns the months of the period, the budget of each, a row per category
+    with its estimated and actual amount for every month, and the totals.
+    """
+    months = months_between(start_date, end_date)
+    budgets = Budget.active.most_current_for_dates([last_day_of_month(month) for month in months])
+
+    estimates = {}
+    budget_ids = set(budget.pk for budget in budgets if budget)
+
+    if budget_ids:
+        amounts = BudgetEstimate.active.filter(budget__in=budget_ids).values_list('budget', 'category', 'amount')
+
+        for budget_id, category_id, amount in amounts:
+            estimates[(budget_id, category_id)] = estimates.get((budget_id, category_id), ZERO) + amount
+
+    actuals = MonthlyCategoryTotal.objects.amounts_by_month(months[0], months[-1]) if months else {}
+
+    category_ids = set(category_id for _, category_id in estimates) | set(category_id for _, category_id in actuals)
+    categories = Category.objects.filter(pk__in=category_ids).order_by('name') if category_ids else []
+
+    rows = []
+    totals = [{'month': month, 'budget': budget, 'estimated': ZERO, 'actual': ZERO}
+              for month, budget in zip(months, budgets)]
+
+    for category in categories:
+        cells = []
+
+        for month, budget, total in zip(months, budgets, totals):
+            estimated = estimates.get((budget.pk, category.pk), ZERO) if budget else ZERO
+            actual = actuals.get((month, category.pk), ZERO)
+            total['estimated'] += estimated
+            total['actual'] += actual
+            cells.append({'month': month, 'estimated': estimated, 'actual': actual})
+
+        rows.append({'category': category,
+                     'cells': cells,
+                     'estimated_total': sum((cell['estimated'] for cell in cells), ZERO),
+                     'actual_total': sum((cell['actual'] for cell in cells), ZERO)})
+
+    return {'start_date': months[0] if months else start_date,
+            'end_date': last_day_of_month(months[-1]) if months else end_date,
+            'months': totals,
+            'rows': rows,
+            'estimated_total': sum((total['estimated'] for total in totals), ZERO),
+            'actual_total': sum((total['actual'] for total in totals), ZERO)}
+
+
+def report_as_dict(report):
+    """
+    The report with plain values, to be serialized as json.
+    """
+    def amount(value):
+        return '%.02f' % value
+
+    return {
+        'start_date': report['start_date'],
+        'end_date': report['end_date'],
+        'months': [{'month': total['month'].strftime('%Y-%m'),
+                    'budget': total['budget'].slug if total['budget'] else None,
+                    'estimated': amount(total['estimated']),
+                    'actual': amount(total['actual'])} for total in report['months']],
+        'categories': [{'id': row['category'].pk,
+                        'name': row['category'].name,
+                        'slug': row['category'].slug,
+                        'estimated': [amount(cell['estimated']) for cell in row['cells']],
+                        'actual': [amount(cell['actual']) for cell in row['cells']],
+                        'estimated_total': amount(row['estimated_total']),
+                        'actual_total': amount(row['actual_total'])} for row in report['rows']],
+        'estimated_total': amount(report['estimated_total']),
+        'actual_total': amount(report['actual_total']),
+    }
@@ -0,0 +1,182 @@
+from __future__ import unicode_literals
+
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from model_mommy import mommy
+
+
+class CategoryMonthReportTest(TestCase):
+    def report(self, start_date, end_date):
+        from summary.reports import category_month_report
+
+        return category_month_report(start_date, end_date)
+
+    def test_months_between(self):
+        from summary.reports import months_between
+
+        self.assertEqual([date(2013, 11, 1), date(2013, 12, 1), date(2014, 1, 1)],
+                         months_between(date(2013, 11, 20), date(2014, 1, 5)))
+
+    def test_report_with_no_data(self):
+        report = self.report(date(2014, 1, 1), date(2014, 3, 31))
+
+        self.assertEqual([], report['rows'])
+        self.assertEqual([date(2014, 1, 1), date(2014, 2, 1), date(2014, 3, 1)],
+                         [total['month'] for total in report['months']])
+        self.assertEqual([None] * 3, [total['budget'] for total in report['months']])
+        self.assertEqual(Decimal('0.0'), report['actual_total'])
+
+    def test_each_month_uses_the_budget_active_then(self):
+        from transaction.models import Transaction
+
+        category = mommy.make('Category')
+        first = mommy.make('Budget', start_date=date(2014, 1, 1))
+        second = mommy.make('Budget', start_date=date(2014, 2, 15))
+        mommy.make('BudgetEstimate', budget=first, category=category, amount=Decimal('100.0'))
+        mommy.make('BudgetEstimate', budget=second, category=category, amount=Decimal('200.0'))
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('10.0'))
+        mommy.make('Transaction', category=category, date=date(2014, 3, 10), amount=Decimal('30.0'))
+        mommy.make('Transaction', category=category, date=date(2014, 3, 11), amount=Decimal('5.0'),
+                   transaction_type=Transaction.INCOME)
+
+        report = self.report(date(2013, 12, 1), date(2014, 3, 31))
+
+        self.assertEqual([None, first, second, second], [total['budget'] for total in report['months']])
+
+        row = report['rows'][0]
+        self.assertEqual(category, row['category'])
+        self.assertEqual([Decimal('0.0'), Decimal('100.0'), Decimal('200.0'), Decimal('200.0')],
+                         [cell['estimated'] for cell in row['cells']])
+        self.assertEqual([Decimal('0.0'), Decimal('10.0'), Decimal('0.0'), Decimal('30.0')],
+                         [cell['actual'] for cell in row['cells']])
+        self.assertEqual(Decimal('500.0'), row['estimated_total'])
+        self.assertEqual(Decimal('40.0'), row['actual_total'])
+        self.assertEqual(Decimal('40.0'), report['actual_total'])
+
+    def test_categories_with_expenses_and_no_estimate_are_reported(self):
+        category = mommy.make('Category')
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('10.0'))
+
+        report = self.report(date(2014, 1, 1), date(2014, 1, 31))
+
+        self.assertEqual([category], [row['category'] for row in report['rows']])
+        self.assertEqual(Decimal('0.0'), report['estimated_total'])
+
+    def test_number_of_queries_does_not_depend_on_the_months(self):
+        category = mommy.make('Category')
+        budget = mommy.make('Budget', start_date=date(2013, 1, 1))
+        mommy.make('BudgetEstimate', budget=budget, category=category)
+
+        for month in range(1, 13):
+            mommy.make('Transaction', category=category, date=date(2014, month, 1))
+
+        # The budgets, the estimates, the monthly totals and the categories.
+        with self.assertNumQueries(4):
+            self.report(date(2014, 1, 1), date(2014, 12, 31))
+
+    def test_report_as_dict(self):
+        from summary.reports import report_as_dict
+
+        category = mommy.make('Category')
+        budget = mommy.make('Budget', start_date=date(2014, 1, 1))
+        mommy.make('BudgetEstimate', budget=budget, category=category, amount=Decimal('100.0'))
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('10.5'))
+
+        data = report_as_dict(self.report(date(2014, 1, 1), date(2014, 1, 31)))
+
+        self.assertEqual([{'month': '2014-01', 'budget': budget.slug, 'estimated': '100.00', 'actual': '10.50'}],
+                         data['months'])
+        self.assertEqual(['10.50'], data['categories'][0]['actual'])
+        self.assertEqual(category.slug, data['categories'][0]['slug'])
+        self.assertEqual('10.50', data['actual_total'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'period-summary-tests'}})
+class PeriodSummaryCacheTest(TestCase):
+    def setUp(self):
+        from base.cache import get_budget_cache
+
+        get_budget_cache().clear()
+
+        self.category = mommy.make('Category')
+        self.budget = mommy.make('Budget', start_date=date(2014, 1, 1))
+        self.estimate = mommy.make('BudgetEstimate', budget=self.budget, category=self.category,
+                                   amount=Decimal('100.0'))
+        mommy.make('Transaction', category=self.category, date=date(2014, 2, 10), amount=Decimal('10.0'))
+
+    def summary(self, start_date=date(2014, 2, 1), end_date=date(2014, 2, 28)):
+        from summary.reports import period_summary
+
+        return period_summary(start_date, end_date)
+
+    def test_closed_periods_are_cached(self):
+        budget, estimates_and_amounts, actual_total = self.summary()
+
+        with self.assertNumQueries(0):
+            budget, estimates_and_amounts, actual_total = self.summary()
+            self.assertEqual(Decimal('100.0'), budget.monthly_estimated_total())
+
+        self.assertEqual(self.budget, budget)
+        self.assertEqual(self.estimate, estimates_and_amounts[0]['estimate'])
+        self.assertEqual(Decimal('10.0'), actual_total)
+
+    def test_open_periods_are_not_cached(self):
+        today = date.today()
+        self.summary(today.replace(day=1), today)
+
+        with self.assertNumQueries(2):
+            self.summary(today.replace(day=1), today)
+
+    def test_a_transaction_of_the_period_invalidates_it(self):
+        self.summary()
+        mommy.make('Transaction', category=self.category, date=date(2014, 2, 20), amount=Decimal('5.0'))
+
+        self.assertEqual(Decimal('15.0'), self.summary()[2])
+
+    def test_a_transaction_of_another_period_does_not_invalidate_it(self):
+        self.summary()
+        mommy.make('Transaction', category=self.category, date=date(2014, 3, 20))
+
+        with self.assertNumQueries(0):
+            self.summary()
+
+    def test_a_transaction_moved_out_of_the_period_invalidates_it(self):
+        from transaction.models import Transaction
+
+        self.summary()
+        transaction = Transaction.objects.get()
+        transaction.date = date(2014, 3, 1)
+        transaction.save()
+
+        self.assertEqual(Decimal('0.0'), self.summary()[2])
+
+    def test_an_estimate_of_the_budget_invalidates_it(self):
+        self.summary()
+        self.estimate.amount = Decimal('50.0')
+        self.estimate.save()
+
+        budget, estimates_and_amounts, actual_total = self.summary()
+        self.assertEqual(Decimal('50.0'), estimates_and_amounts[0]['estimate'].amount)
+
+    def test_an_estimate_of_another_budget_does_not_invalidate_it(self):
+        other_budget = mommy.make('Budget', start_date=date(2015, 1, 1))
+        self.summary()
+        mommy.make('BudgetEstimate', budget=other_budget, category=self.category)
+
+        with self.assertNumQueries(0):
+            self.summary()
+
+    def test_bulk_changes_of_the_period_invalidate_it(self):
+        from transaction.models import Transaction
+        from transaction.signals import transactions_bulk_changed
+
+        self.summary()
+        transactions_bulk_changed.send(sender=Transaction, months=set([(2014, 2)]))
+
+        with self.assertNumQueries(2):
+            self.summary()
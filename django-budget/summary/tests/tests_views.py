@@ -4,6 +4,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 from model_mommy import mommy
 
 from base.utils import BaseTestCase
@@ -26,7 +27,7 @@ class SummaryArchiveViewTest(BaseTestCase):
         response = self.get()
         month = transaction.date.replace(day=1)
 
-        self.assertEqual(1, response.context_data['date_list'].count())
+        self.assertEqual(1, len(response.context_data['date_list']))
         self.assertIn(month, response.context_data['date_list'])
 
     def test_view_with_no_active_transaction(self):
@@ -46,7 +47,7 @@ class SummaryArchiveViewTest(BaseTestCase):
         request = self.factory.get(user=self.mock_user)
         response = self.view(request)
 
-        self.assertEqual(2, response.context_data['date_list'].count())
+        self.assertEqual(2, len(response.context_data['date_list']))
         self.assertIn(month_1, response.context_data['date_list'])
         self.assertIn(month_2, response.context_data['date_list'])
 
@@ -80,9 +81,25 @@ class SummaryArchiveViewTest(BaseTestCase):
         self.assertEqual(302, response.status_code)
         self.assertEqual('%s?next=%s' % (reverse('login'), url), response._headers['location'][1])
 
-    def get(self):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'summary-list-tests'}})
+    def test_modified_when_the_last_transaction_of_a_month_moves(self):
+        category = mommy.make('Category')
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10))
+        transaction = mommy.make('Transaction', category=category, date=date(2014, 1, 10))
+        etag = self.get(HTTP_IF_NONE_MATCH='')['ETag']
+
+        # The totals keep the same number of rows and transactions.
+        transaction.date = date(2014, 2, 11)
+        transaction.save()
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([date(2014, 2, 1)], list(response.context_data['date_list']))
+
+    def get(self, **headers):
         url = reverse('summary:summary_list')
-        request = self.factory.get(path=url, user=self.mock_user)
+        request = self.factory.get(path=url, user=self.mock_user, **headers)
         return self.view(request)
 
 
@@ -101,7 +118,7 @@ class SummaryYearViewTest(BaseTestCase):
         self.assertEqual(None, response.context['budget'])
         self.assertEqual(start_date, response.context['start_date'])
         self.assertEqual(None, response.context['actual_total'])
-        self.assertEqual(None, response.context['estimates_and_transactions'])
+        self.assertEqual(None, response.context['estimates_and_amounts'])
 
     def test_view_with_no_estimate_and_no_transaction(self):
         budget = mommy.make('Budget')
@@ -113,7 +130,7 @@ class SummaryYearViewTest(BaseTestCase):
         self.assertEqual(budget, response.context['budget'])
         self.assertEqual(start_date, response.context['start_date'])
         self.assertEqual(Decimal('0.0'), response.context['actual_total'])
-        self.assertEqual([], response.context['estimates_and_transactions'])
+        self.assertEqual([], response.context['estimates_and_amounts'])
 
     def test_view_with_two_estimates_and_no_transaction(self):
 
@@ -123,13 +140,11 @@ class SummaryYearViewTest(BaseTestCase):
         response = self.get(budget.start_date.year)
 
         self.assertEqual(Decimal('0.0'), response.context['actual_total'])
-        self.assertEqual(2, len(response.context['estimates_and_transactions']))
-        self.assertEqual(e1, response.context['estimates_and_transactions'][0]['estimate'])
-        self.assertEqual([], list(response.context['estimates_and_transactions'][0]['transactions']))
-        self.assertEqual(Decimal('0.0'), response.context['estimates_and_transactions'][0]['actual_amount'])
-        self.assertEqual(e2, response.context['estimates_and_transactions'][1]['estimate'])
-        self.assertEqual(Decimal('0.0'), response.context['estimates_and_transactions'][1]['actual_amount'])
-        self.assertEqual([], list(response.context['estimates_and_transactions'][1]['transactions']))
+        self.assertEqual(2, len(response.context['estimates_and_amounts']))
+        self.assertEqual(e1, response.context['estimates_and_amounts'][0]['estimate'])
+        self.assertEqual(Decimal('0.0'), response.context['estimates_and_amounts'][0]['actual_amount'])
+        self.assertEqual(e2, response.context['estimates_and_amounts'][1]['estimate'])
+        self.assertEqual(Decimal('0.0'), response.context['estimates_and_amounts'][1]['actual_amount'])
 
     def test_view_with_estimates_and_transactions(self):
         budget = mommy.make('Budget')
@@ -146,15 +161,13 @@ class SummaryYearViewTest(BaseTestCase):
 
         self.assertEqual(200, response.status_code)
         self.assertEqual(actual_total, response.context['actual_total'])
-        self.assertEqual(2, len(response.context['estimates_and_transactions']))
+        self.assertEqual(2, len(response.context['estimates_and_amounts']))
 
-        self.assertEqual(e1, response.context['estimates_and_transactions'][0]['estimate'])
-        self.assertIn(t1, response.context['estimates_and_transactions'][0]['transactions'])
-        self.assertEqual(t1.amount, response.context['estimates_and_transactions'][0]['actual_amount'])
+        self.assertEqual(e1, response.context['estimates_and_amounts'][0]['estimate'])
+        self.assertEqual(t1.amount, response.context['estimates_and_amounts'][0]['actual_amount'])
 
-        self.assertEqual(e2, response.context['estimates_and_transactions'][1]['estimate'])
-        self.assertEqual(t2.amount, response.context['estimates_and_transactions'][1]['actual_amount'])
-        self.assertIn(t2, response.context['estimates_and_transactions'][1]['transactions'])
+        self.assertEqual(e2, response.context['estimates_and_amounts'][1]['estimate'])
+        self.assertEqual(t2.amount, response.context['estimates_and_amounts'][1]['actual_amount'])
 
     def test_html_content_with_no_estimate_and_no_transaction(self):
         budget = mommy.make('Budget')
@@ -184,10 +197,11 @@ class SummaryYearViewTest(BaseTestCase):
         self.assertNotContains(response, 'No data to show.')
         self.assertNotContains(response, "Not found no budget this year!")
         self.assertContains(response, category.name)
-        self.assertContains(response, t1.notes)
-        self.assertContains(response, t1.date.strftime('%m/%d/%Y'))
-        self.assertContains(response, t2.notes)
-        self.assertContains(response, t2.date.strftime('%m/%d/%Y'))
+        self.assertNotContains(response, t1.notes)
+        self.assertNotContains(response, t2.notes)
+        self.assertContains(response, '%s?category=%s&amp;start_date=%s-01-01&amp;end_date=%s-12-31' % (
+            reverse('summary:summary_transactions'), category.slug, start_date.year, start_date.year))
+        self.assertContains(response, t1.amount + t2.amount)
         self.assertContains(response, estimate.yearly_estimated_amount())
         self.assertContains(response, budget.yearly_estimated_total())
 
@@ -234,7 +248,7 @@ class SummaryMonthViewTest(BaseTestCase):
         self.assertEqual(None, response.context['budget'])
         self.assertEqual(start_date, response.context['start_date'])
         self.assertEqual(None, response.context['actual_total'])
-        self.assertEqual(None, response.context['estimates_and_transactions'])
+        self.assertEqual(None, response.context['estimates_and_amounts'])
 
     def test_view_with_no_estimate_and_no_transaction(self):
         budget = mommy.make('Budget')
@@ -246,7 +260,7 @@ class SummaryMonthViewTest(BaseTestCase):
         self.assertEqual(budget, response.context['budget'])
         self.assertEqual(start_date, response.context['start_date'])
         self.assertEqual(Decimal('0.0'), response.context['actual_total'])
-        self.assertEqual([], response.context['estimates_and_transactions'])
+        self.assertEqual([], response.context['estimates_and_amounts'])
 
     def test_view_with_estimates_and_transactions(self):
         budget = mommy.make('Budget')
@@ -261,10 +275,9 @@ class SummaryMonthViewTest(BaseTestCase):
         self.assertEqual(budget, response.context['budget'])
         self.assertEqual(start_date, response.context['start_date'])
         self.assertEqual(t1.amount + t2.amount, response.context['actual_total'])
-        self.assertEqual(1, len(response.context['estimates_and_transactions']))
-        self.assertEqual(estimate, response.context['estimates_and_transactions'][0]['estimate'])
-        self.assertIn(t1, response.context['estimates_and_transactions'][0]['transactions'])
-        self.assertIn(t2, response.context['estimates_and_transactions'][0]['transactions'])
+        self.assertEqual(1, len(response.context['estimates_and_amounts']))
+        self.assertEqual(estimate, response.context['estimates_and_amounts'][0]['estimate'])
+        self.assertEqual(t1.amount + t2.amount, response.context['estimates_and_amounts'][0]['actual_amount'])
 
     def test_html_content_with_no_estimates_and_no_transaction(self):
         budget = mommy.make('Budget')
@@ -292,9 +305,10 @@ class SummaryMonthViewTest(BaseTestCase):
         self.assertNotContains(response, 'No data to show.')
         self.assertNotContains(response, 'Not found no budget this month!')
         self.assertContains(response, category.name)
-        self.assertContains(response, transaction.notes)
+        self.assertNotContains(response, transaction.notes)
         self.assertContains(response, transaction.amount)
-        self.assertContains(response, transaction.date.strftime('%m/%d/%Y'))
+        self.assertContains(response, '%s?category=%s&amp;start_date=%s' % (
+            reverse('summary:summary_transactions'), category.slug, start_date.strftime('%Y-%m-%d')))
         self.assertContains(response, estimate.amount)
         self.assertContains(response, budget.monthly_estimated_total())
 
@@ -315,13 +329,185 @@ class SummaryMonthViewTest(BaseTestCase):
         self.assertEqual(302, response.status_code)
         self.assertEqual('%s?next=%s' % (reverse('login'), url), response._headers['location'][1])
 
-    def get(self, year, month):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'summary-month-tests'}})
+    def test_not_modified_until_the_month_changes(self):
+        category = mommy.make('Category')
+        mommy.make('Budget', start_date=date(2014, 1, 1))
+        etag = self.get(2014, 2)['ETag']
+
+        mommy.make('Transaction', category=category, date=date(2014, 3, 10))
+        self.assertEqual(304, self.get(2014, 2, HTTP_IF_NONE_MATCH=etag).status_code)
+
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10))
+        self.assertEqual(200, self.get(2014, 2, HTTP_IF_NONE_MATCH=etag).status_code)
+
+    def get(self, year, month, **headers):
         url = reverse('summary:summary_month', kwargs={'year': year, 'month': month})
         self.login()
-        return self.client.get(url)
+        return self.client.get(url, **headers)
 
     def getf(self, year, month):
         url = reverse('summary:summary_month', kwargs={'year': year, 'month': month})
         request = self.factory.get(path=url, user=self.mock_user)
         response = self.view(request, year=year, month=month)
         return response
+
+
+class SummaryReportViewTest(BaseTestCase):
+    from summary.views import summary_report
+
+    view_function = summary_report
+
+    def test_view_defaults_to_the_last_12_months(self):
+        response = self.get()
+
+        self.assertEqual(200, response.status_code)
+        self.assertTemplateUsed(response, 'summary/report.html')
+        months = [total['month'] for total in response.context['report']['months']]
+        self.assertEqual(12, len(months))
+        self.assertEqual(date.today().replace(day=1), months[-1])
+
+    def test_view_with_a_period(self):
+        category = mommy.make('Category', name='Spam')
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10), amount=Decimal('10.0'))
+        response = self.get(start_date='2014-01-15', end_date='2014-03-01')
+
+        report = response.context['report']
+        self.assertEqual(date(2014, 1, 1), report['start_date'])
+        self.assertEqual(date(2014, 3, 31), report['end_date'])
+        self.assertContains(response, 'Spam')
+        self.assertContains(response, '$10.00')
+
+    def test_view_with_an_invalid_period(self):
+        response = self.get(start_date='2014-03-01', end_date='2014-01-01')
+
+        self.assertEqual(200, response.status_code)
+        self.assertIsNone(response.context['report'])
+        self.assertContains(response, 'The start date must be before the end date.')
+
+    def test_redirect_if_anonymous(self):
+        url = reverse('summary:summary_report')
+        request = self.factory.get(path=url, user=self.anonymous_user)
+        response = self.view(request)
+
+        self.assertEqual(302, response.status_code)
+
+    def get(self, **params):
+        self.login()
+        return self.client.get(reverse('summary:summary_report'), params)
+
+
+class SummaryReportJsonViewTest(BaseTestCase):
+    from summary.views import summary_report_json
+
+    view_function = summary_report_json
+
+    def test_view_returns_the_report(self):
+        import json
+
+        category = mommy.make('Category')
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10), amount=Decimal('10.0'))
+        response = self.get(start_date='2014-01-01', end_date='2014-02-28')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/json', response['Content-Type'])
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual('2014-01-01', data['start_date'])
+        self.assertEqual(['2014-01', '2014-02'], [month['month'] for month in data['months']])
+        self.assertEqual(['0.00', '10.00'], data['categories'][0]['actual'])
+
+    def test_view_with_an_invalid_period(self):
+        response = self.get(start_date='spam')
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn('start_date', response.content.decode('utf-8'))
+
+    def get(self, **params):
+        self.login()
+        return self.client.get(reverse('summary:summary_report_json'), params)
+
+
+class SummaryTransactionsViewTest(BaseTestCase):
+    from summary.views import summary_transactions
+
+    view_function = summary_transactions
+
+    def test_view_returns_the_expenses_of_the_category_in_the_period(self):
+        from transaction.models import Transaction
+
+        category = mommy.make('Category')
+        t1 = mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('10.5'), notes='Spam')
+        t2 = mommy.make('Transaction', category=category, date=date(2014, 1, 5))
+        mommy.make('Transaction', category=category, date=date(2014, 2, 1))
+        mommy.make('Transaction', category=category, date=date(2014, 1, 5), transaction_type=Transaction.INCOME)
+        mommy.make('Transaction', category=category, date=date(2014, 1, 5), is_deleted=True)
+        mommy.make('Transaction', date=date(2014, 1, 5))
+
+        data = self.get(category=category.slug, start_date='2014-01-01', end_date='2014-01-31')
+
+        self.assertEqual([t2.pk, t1.pk], [transaction['id'] for transaction in data['transactions']])
+        self.assertEqual({'id': t1.pk, 'date': '2014-01-10', 'date_display': '01/10/2014',
+                          'notes': 'Spam', 'amount': '10.50'}, data['transactions'][1])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_view_is_paginated(self):
+        from summary.forms import SummaryTransactionsForm
+
+        category = mommy.make('Category')
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10),
+                   _quantity=SummaryTransactionsForm.PAGE_SIZE + 1)
+        params = {'category': category.slug, 'start_date': '2014-01-01', 'end_date': '2014-01-31'}
+
+        first_page = self.get(**params)
+        second_page = self.get(cursor=first_page['next_cursor'], **params)
+
+        self.assertEqual(SummaryTransactionsForm.PAGE_SIZE, len(first_page['transactions']))
+        self.assertEqual(1, len(second_page['transactions']))
+        self.assertIsNone(second_page['next_cursor'])
+
+    def test_view_reads_the_archive_too(self):
+        from transaction.archive import archive_transactions, closed_year
+
+        category = mommy.make('Category')
+        archived = mommy.make('Transaction', category=category, date=date(2013, 12, 20))
+        live = mommy.make('Transaction', category=category, date=date(2014, 1, 5))
+        archive_transactions(closed_year(2013))
+
+        data = self.get(category=category.slug, start_date='2013-12-01', end_date='2014-01-31')
+
+        self.assertEqual([archived.pk, live.pk], [transaction['id'] for transaction in data['transactions']])
+
+    def test_view_with_invalid_parameters(self):
+        self.login()
+        response = self.client.get(reverse('summary:summary_transactions'), {'category': 'spam'})
+
+        self.assertEqual(400, response.status_code)
+        self.assertIn('category', response.content.decode('utf-8'))
+        self.assertIn('start_date', response.content.decode('utf-8'))
+
+    def test_view_with_an_invalid_cursor(self):
+        category = mommy.make('Category')
+        self.login()
+        response = self.client.get(reverse('summary:summary_transactions'),
+                                   {'category': category.slug, 'start_date': '2014-01-01',
+                                    'end_date': '2014-01-31', 'cursor': 'spam'})
+
+        self.assertEqual(400, response.status_code)
+
+    def test_redirect_if_anonymous(self):
+        url = reverse('summary:summary_transactions')
+        request = self.factory.get(path=url, user=self.anonymous_user)
+        response = self.view(request)
+
+        self.assertEqual(302, response.status_code)
+
+    def get(self, **params):
+        import json
+
+        self.login()
+        response = self.client.get(reverse('summary:summary_transactions'), params)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/json', response['Content-Type'])
+        return json.loads(response.content.decode('utf-8'))
@@ -5,6 +5,9 @@ from django.conf.urls import patterns, url
 urlpatterns = patterns(
     'summary.views',
     url(r'^$', 'summary_list', name='summary_list'),
+    url(r'^report/$', 'summary_report', name='summary_report'),
+    url(r'^report/json/$', 'summary_report_json', name='summary_report_json'),
+    url(r'^transactions/$', 'summary_transactions', name='summary_transactions'),
     url(r'^(?P<year>\d{4})/$', 'summary_year', name='summary_year'),
     url(r'^(?P<year>\d{4})/(?P<month>\d{1,2})/$', 'summary_month', name='summary_month'),
 )
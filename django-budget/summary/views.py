@@ -1,69 +1,150 @@
 from __future__ import unicode_literals
 
-from calendar import monthrange
-from datetime import date
+import json
 
 from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render
-from django.views.generic.dates import ArchiveIndexView
+from django.utils.formats import date_format
+from django.utils.translation import ugettext as _
+from django.views.generic import TemplateView
 
 from braces.views import LoginRequiredMixin
 
+from base.cache import get_versions
+from base.pagination import CursorPaginator, InvalidCursor, MergedCursorPaginator
+from base.views import ConditionalGetMixin, conditional_response
 from budget.models import Budget
-from transaction.models import Transaction
+from transaction.models import ArchivedTransaction, MonthlyCategoryTotal, Transaction
+from .forms import SummaryReportForm, SummaryTransactionsForm
+from .reports import category_month_report, month_period, period_summary, period_versions, report_as_dict, year_period
 
 
-class SummaryArchiveView(LoginRequiredMixin, ArchiveIndexView):
-    model = Transaction
+class SummaryArchiveView(LoginRequiredMixin, ConditionalGetMixin, TemplateView):
+    """
+    The months with transactions, read from the monthly totals instead of
+    extracting the distinct months of the whole ledger.
+    """
     template_name = "summary/list.html"
-    date_field = 'date'
-    date_list_period = 'month'
-    queryset = Transaction.active.all()
-    allow_empty = True
+    validator_versions = ('transaction',)
 
-summary_list = SummaryArchiveView.as_view()
+    def get_context_data(self, **kwargs):
+        context = super(SummaryArchiveView, self).get_context_data(**kwargs)
+        context['date_list'] = MonthlyCategoryTotal.objects.months()
+        return context
 
+summary_list = SummaryArchiveView.as_view()
 
-@login_required
-def summary_year(request, year):
-    start_date = date(int(year), 1, 1)
-    end_date = date(int(year), 12, 31)
 
+def render_period_summary(request, template_name, start_date, end_date):
+    """
+    Renders the summary of the period, or answers 304 Not Modified if the
+    versions it is computed from have not changed.
+    """
     try:
         budget = Budget.active.most_current_for_date(end_date)
-        estimates_and_transactions, actual_total = budget.estimates_and_transactions(start_date, end_date)
+        validators = (budget.pk,) + period_versions(budget, start_date, end_date)
 
     except Budget.DoesNotExist:
         budget = None
-        estimates_and_transactions = None
-        actual_total = None
+        validators = get_versions('budget')
+
+    def render_summary():
+        if budget:
+            _, estimates_and_amounts, actual_total = period_summary(start_date, end_date, budget)
+
+        else:
+            estimates_and_amounts = None
+            actual_total = None
+
+        context = {'start_date': start_date,
+                   'end_date': end_date,
+                   'budget': budget,
+                   'actual_total': actual_total,
+                   'estimates_and_amounts': estimates_and_amounts}
 
-    context = {'start_date': start_date,
-               'budget': budget,
-               'actual_total': actual_total,
-               'estimates_and_transactions': estimates_and_transactions}
+        return render(request, template_name, context)
 
-    return render(request, 'summary/year.html', context)
+    return conditional_response(request, validators, render_summary)
+
+
+@login_required
+def summary_year(request, year):
+    start_date, end_date = year_period(year)
+    return render_period_summary(request, 'summary/year.html', start_date, end_date)
 
 
 @login_required
 def summary_month(request, year, month):
-    start_date = date(int(year), int(month), 1)
-    _, last_day_of_month = monthrange(int(year), int(month))
-    end_date = date(int(year), int(month), last_day_of_month)
+    start_date, end_date = month_period(year, month)
+    return render_period_summary(request, 'summary/month.html', start_date, end_date)
+
+
+@login_required
+def summary_report(request):
+    def render_report():
+        form = SummaryReportForm(request.GET)
+        report = category_month_report(form.cleaned_data['start_date'],
+                                       form.cleaned_data['end_date']) if form.is_valid() else None
+
+        return render(request, 'summary/report.html', {'form': form, 'report': report})
+
+    return conditional_response(request, get_versions('budget', 'estimate', 'category', 'transaction'), render_report)
+
+
+@login_required
+def summary_report_json(request):
+    form = SummaryReportForm(request.GET)
+
+    if not form.is_valid():
+        return HttpResponseBadRequest(json.dumps({'errors': form.errors}),
+                                      content_type='application/json')
+
+    report = category_month_report(form.cleaned_data['start_date'], form.cleaned_data['end_date'])
+
+    return HttpResponse(json.dumps(report_as_dict(report), cls=DjangoJSONEncoder),
+                        content_type='application/json')
+
+
+@login_required
+def summary_transactions(request):
+    """
+    The expenses of a category in a period, a page at a time, loaded when
+    the category is expanded in the summaries.
+    """
+    form = SummaryTransactionsForm(request.GET)
+
+    if not form.is_valid():
+        return HttpResponseBadRequest(json.dumps({'errors': form.errors}),
+                                      content_type='application/json')
+
+    start_date, end_date = form.cleaned_data['start_date'], form.cleaned_data['end_date']
+    expenses = Transaction.expenses.filter(category=form.cleaned_data['category'],
+                                           date__range=(start_date, end_date))
+
+    if ArchivedTransaction.objects.covers(start_date, end_date):
+        archived = ArchivedTransaction.objects.filter(category=form.cleaned_data['category'],
+                                                      transaction_type=Transaction.EXPENSE,
+                                                      is_deleted=False,
+                                                      date__range=(start_date, end_date))
+        paginator = MergedCursorPaginator((expenses, archived), SummaryTransactionsForm.PAGE_SIZE, ('date', 'id'))
+
+    else:
+        paginator = CursorPaginator(expenses, SummaryTransactionsForm.PAGE_SIZE, ('date', 'id'))
 
     try:
-        budget = Budget.active.most_current_for_date(end_date)
-        estimates_and_transactions, actual_total = budget.estimates_and_transactions(start_date, end_date)
+        page = paginator.page(request.GET.get('cursor'))
 
-    except Budget.DoesNotExist:
-        budget = None
-        estimates_and_transactions = None
-        actual_total = None
+    except InvalidCursor:
+        return HttpResponseBadRequest(json.dumps({'errors': {'cursor': [_('Invalid cursor.')]}}),
+                                      content_type='application/json')
 
-    context = {'start_date': start_date,
-               'estimates_and_transactions': estimates_and_transactions,
-               'actual_total': actual_total,
-               'budget': budget}
+    data = {'transactions': [{'id': transaction.pk,
+                              'date': transaction.date,
+                              'date_display': date_format(transaction.date, 'SHORT_DATE_FORMAT'),
+                              'notes': transaction.notes,
+                              'amount': '%.02f' % transaction.amount} for transaction in page],
+            'next_cursor': page.next_cursor}
 
-    return render(request, 'summary/month.html', context)
+    return HttpResponse(json.dumps(data, cls=DjangoJSONEncoder), content_type='application/json')
@@ -2,7 +2,8 @@ from __future__ import unicode_literals
 
 from django.contrib import admin
 
-from .models import Transaction
+from .models import ArchivedTransaction, Transaction
+from .search import search_transactions
 
 
 class TransactionAdmin(admin.ModelAdmin):
@@ -20,5 +21,23 @@ class TransactionAdmin(admin.ModelAdmin):
     list_filter = ('is_deleted',)
     search_fields = ('notes',)
 
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index instead of an icontains scan of the notes.
+        return search_transactions(queryset, search_term), False
+
+
+class ArchivedTransactionAdmin(admin.ModelAdmin):
+    date_hierarchy = 'date'
+    list_display = ('notes', 'transaction_type', 'amount', 'date', 'is_deleted', 'archived')
+    list_filter = ('is_deleted',)
+    search_fields = ('notes',)
+
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in self.model._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
 
 admin.site.register(Transaction, TransactionAdmin)
+admin.site.register(ArchivedTransaction, ArchivedTransactionAdmin)
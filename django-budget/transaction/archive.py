@@ -0,0 +1,81 @@
+"""
+Archive tier of the transactions.
+
+The rows are moved in batches by primary key, each batch copied to the
+archive and deleted from the transaction table in its own database
+transaction, so a long run neither holds a lock for its whole duration nor
+leaves a row in both tables or in none.
+
+The delete skips the model signals on purpose: the rows are not gone, the
+active ones keep counting in the monthly totals, so the rollup must not
+subtract them.
+"""
+
+from __future__ import unicode_literals
+
+from datetime import timedelta
+
+from django.db.models.sql import DeleteQuery
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from base.cache import bump_version
+from base.dates import today
+from .models import ArchivedTransaction, Transaction
+from .search import unindex_transactions
+
+BATCH_SIZE = 1000
+
+DELETED_AFTER_DAYS = 90
+
+
+def deleted_before(days=DELETED_AFTER_DAYS):
+    """
+    The soft deleted transactions last changed more than days ago.
+    """
+    return Transaction.objects.filter(is_deleted=True, updated__lt=timezone.now() - timedelta(days=days))
+
+
+def closed_year(year):
+    """
+    All the transactions of a year that has ended, deleted or not.
+    """
+    if year >= today().year:
+        raise ValueError('The year %d is not closed yet.' % year)
+
+    return Transaction.objects.filter(date__year=year)
+
+
+def archive_transactions(queryset, batch_size=BATCH_SIZE):
+    """
+    Moves the transactions of the queryset to the archive and returns how
+    many were moved.
+    """
+    fields = [field.attname for field in Transaction._meta.concrete_fields]
+    queryset = queryset.order_by('pk')
+    count = 0
+    last_pk = None
+
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+
+        with atomic(using=queryset.db):
+            rows = list(batch.values_list(*fields)[:batch_size])
+
+            if not rows:
+                break
+
+            ArchivedTransaction.objects.using(queryset.db).bulk_create(
+                [ArchivedTransaction(**dict(zip(fields, row))) for row in rows])
+
+            pks = [row[fields.index('id')] for row in rows]
+            DeleteQuery(Transaction).delete_batch(pks, queryset.db)
+            unindex_transactions(pks, queryset.db)
+
+        count += len(rows)
+        last_pk = pks[-1]
+
+    if count:
+        bump_version('archive', 'transaction')
+
+    return count
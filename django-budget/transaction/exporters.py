@@ -0,0 +1,89 @@
+"""
+Streaming export of the transactions.
+
+The rows are read in chunks seeking on the primary key, instead of with
+OFFSET or one huge cursor, so the memory used is the same for any number of
+transactions.
+"""
+
+from __future__ import unicode_literals
+
+import csv
+
+from django.utils import six
+from django.utils.encoding import force_bytes, force_text
+
+from .models import Transaction
+
+CHUNK_SIZE = 2000
+
+COLUMNS = ('id', 'date', 'transaction_type', 'category__name', 'amount', 'notes')
+
+HEADER = ('id', 'date', 'transaction_type', 'category', 'amount', 'notes')
+
+
+def filter_transactions(queryset, start_date=None, end_date=None, transaction_type=None):
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+
+    if transaction_type:
+        queryset = queryset.filter(transaction_type=transaction_type)
+
+    return queryset
+
+
+def export_rows(queryset=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields a tuple with the COLUMNS of each transaction, by id.
+    """
+    if queryset is None:
+        queryset = Transaction.active.all()
+
+    queryset = queryset.order_by('pk').values_list(*COLUMNS)
+    last_pk = None
+
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+
+        for row in rows:
+            yield row
+
+        if len(rows) < chunk_size:
+            break
+
+        last_pk = rows[-1][0]
+
+
+def export_csv(queryset=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields the CSV lines, as UTF-8 bytes, of the transactions with a header.
+    """
+    writer = csv.writer(_Echo())
+    yield _write_row(writer, HEADER)
+
+    amount = COLUMNS.index('amount')
+
+    for row in export_rows(queryset, chunk_size):
+        row = list(row)
+        row[amount] = '%.02f' % row[amount]
+        yield _write_row(writer, row)
+
+
+def _write_row(writer, row):
+    if six.PY2:
+        return writer.writerow([force_bytes(value) for value in row])
+
+    return force_bytes(writer.writerow([force_text(value) for value in row]))
+
+
+class _Echo(object):
+    """
+    A file-like object that returns what is written to it, so the csv
+    writer output can be yielded.
+    """
+    def write(self, value):
+        return value
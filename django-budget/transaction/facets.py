@@ -0,0 +1,84 @@
+"""
+Facets of the transaction list.
+
+The number and the amount of the transactions per category and per type are
+read with a single GROUP BY over the filtered transactions, by category and
+type, and summed up per facet here. They are cached under the filters and
+the versions of the transactions and categories, so paging or sorting the
+same filters does not compute them again.
+"""
+
+from __future__ import unicode_literals
+
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from base.cache import get_budget_cache, get_cache_timeout, get_versions, make_key
+from .models import Transaction
+
+FILTERS = ('q', 'start_date', 'end_date', 'category', 'transaction_type', 'min_amount', 'max_amount')
+
+
+def filter_signature(cleaned_data):
+    """
+    The filters of a TransactionListForm, without the sort, as cache key
+    parts.
+    """
+    parts = []
+
+    for name in FILTERS:
+        value = cleaned_data.get(name)
+        parts.append('%s=%s' % (name, getattr(value, 'pk', value) if value not in (None, '') else ''))
+
+    return parts
+
+
+def transaction_facets(queryset):
+    """
+    The count and amount of the transactions of the queryset per category,
+    by name, and per type with any, in the order of the choices.
+    """
+    rows = queryset.values('category', 'category__name', 'category__slug', 'transaction_type')
+    rows = rows.annotate(count=Count('id'), amount=Sum('amount')).order_by()
+
+    categories = {}
+    types = dict((value, {'value': value, 'count': 0, 'amount': Decimal('0.0')})
+                 for value, label in Transaction.TRANSACTION_TYPES)
+
+    for row in rows:
+        category = categories.setdefault(row['category'], {'id': row['category'],
+                                                           'name': row['category__name'],
+                                                           'slug': row['category__slug'],
+                                                           'count': 0,
+                                                           'amount': Decimal('0.0')})
+
+        for facet in (category, types[row['transaction_type']]):
+            facet['count'] += row['count']
+            facet['amount'] += row['amount']
+
+    return {'categories': sorted(categories.values(), key=lambda category: category['name']),
+            'types': [types[value] for value, label in Transaction.TRANSACTION_TYPES if types[value]['count']]}
+
+
+def cached_transaction_facets(queryset, cleaned_data):
+    """
+    The facets of the queryset filtered by the cleaned data of a
+    TransactionListForm, cached per filter signature. The labels of the
+    types are translated after reading the cache, which is shared by every
+    language.
+    """
+    cache = get_budget_cache()
+    key = make_key('transaction_facets', *(filter_signature(cleaned_data) + list(get_versions('transaction', 'category'))))
+    facets = cache.get(key)
+
+    if facets is None:
+        facets = transaction_facets(queryset)
+        cache.set(key, facets, get_cache_timeout())
+
+    labels = dict(Transaction.TRANSACTION_TYPES)
+
+    for facet in facets['types']:
+        facet['label'] = labels[facet['value']]
+
+    return facets
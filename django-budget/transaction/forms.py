@@ -5,10 +5,12 @@ from django.utils.translation import ugettext_lazy as _
 
 from crispy_forms.bootstrap import PrependedText
 from crispy_forms.helper import FormHelper
-from crispy_forms.layout import Field, Layout
+from crispy_forms.layout import Field, Layout, Submit
 
 from base.forms import DatePickerInput
+from category.models import Category
 from .models import Transaction
+from .search import search_transactions
 
 
 class TransactionForm(forms.ModelForm):
@@ -31,3 +33,147 @@ class TransactionForm(forms.ModelForm):
     class Meta:
         model = Transaction
         widgets = {'date': DatePickerInput()}
+
+
+class TransactionImportForm(forms.Form):
+    CSV = 'csv'
+    OFX = 'ofx'
+    FILE_FORMATS = (
+        (CSV, _('CSV')),
+        (OFX, _('OFX')))
+
+    file = forms.FileField(label=_('File'))
+    file_format = forms.ChoiceField(label=_('Format'), choices=FILE_FORMATS, initial=CSV)
+    category = forms.ModelChoiceField(label=_('Default category'),
+                                      queryset=Category.active.all(),
+                                      required=False,
+                                      help_text=_('Used for the rows without a category, like the ones of OFX files.'))
+
+    def __init__(self, *args, **kwargs):
+        super(TransactionImportForm, self).__init__(*args, **kwargs)
+
+        self.helper = FormHelper()
+        self.helper.form_tag = False
+        self.helper.disable_csrf = True
+        self.helper.label_class = 'col-md-2'
+        self.helper.field_class = 'col-md-6'
+        self.helper.layout = Layout(
+            Field('file'),
+            Field('file_format'),
+            Field('category'))
+
+
+class TransactionExportForm(forms.Form):
+    start_date = forms.DateField(label=_('Start Date'), required=False)
+    end_date = forms.DateField(label=_('End Date'), required=False)
+    transaction_type = forms.ChoiceField(label=_('Transaction Type'),
+                                         choices=(('', _('All')),) + Transaction.TRANSACTION_TYPES,
+                                         required=False)
+
+
+class TransactionListForm(forms.Form):
+    """
+    The filters, search and sorting of the transaction list, from the query
+    string. Only orderings served by an index can be chosen, each one ending
+    with the id so the pages are stable. A search without a sort lists the
+    best matches first.
+    """
+    SORTS = {
+        '-date': ('-date', '-id'),
+        'date': ('date', 'id'),
+        '-amount': ('-amount', '-id'),
+        'amount': ('amount', 'id'),
+    }
+    DEFAULT_SORT = '-date'
+
+    q = forms.CharField(label=_('Search'), max_length=100, required=False)
+    start_date = forms.DateField(label=_('Start Date'), required=False)
+    end_date = forms.DateField(label=_('End Date'), required=False)
+    category = forms.ModelChoiceField(label=_('Category'),
+                                      queryset=Category.active.all(),
+                                      to_field_name='slug',
+                                      required=False)
+    transaction_type = forms.ChoiceField(label=_('Transaction Type'),
+                                         choices=(('', _('All')),) + Transaction.TRANSACTION_TYPES,
+                                         required=False)
+    min_amount = forms.DecimalField(label=_('Minimum Amount'), max_digits=11, decimal_places=2, required=False)
+    max_amount = forms.DecimalField(label=_('Maximum Amount'), max_digits=11, decimal_places=2, required=False)
+    sort = forms.ChoiceField(label=_('Sort'),
+                             choices=(('-date', _('Newest first')),
+                                      ('date', _('Oldest first')),
+                                      ('-amount', _('Largest first')),
+                                      ('amount', _('Smallest first'))),
+                             required=False)
+
+    def __init__(self, *args, **kwargs):
+        super(TransactionListForm, self).__init__(*args, **kwargs)
+
+        self.helper = FormHelper()
+        self.helper.form_method = 'get'
+        self.helper.form_class = 'form-inline'
+        self.helper.disable_csrf = True
+        self.helper.layout = Layout(
+            Field('q', placeholder=_('Search...')),
+            Field('start_date'),
+            Field('end_date'),
+            Field('category'),
+            Field('transaction_type'),
+            Field('min_amount'),
+            Field('max_amount'),
+            Field('sort'))
+        self.helper.add_input(Submit('', _('Filter')))
+
+    def clean(self):
+        cleaned_data = super(TransactionListForm, self).clean()
+        start_date, end_date = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        min_amount, max_amount = cleaned_data.get('min_amount'), cleaned_data.get('max_amount')
+
+        if start_date and end_date and start_date > end_date:
+            raise forms.ValidationError(_('The start date must be before the end date.'))
+
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            raise forms.ValidationError(_('The minimum amount must not be greater than the maximum amount.'))
+
+        return cleaned_data
+
+    def filter(self, queryset):
+        """
+        The transactions of the queryset that match the filters and the
+        search, in one query.
+        """
+        data = self.cleaned_data
+
+        if data['start_date']:
+            queryset = queryset.filter(date__gte=data['start_date'])
+
+        if data['end_date']:
+            queryset = queryset.filter(date__lte=data['end_date'])
+
+        if data['category']:
+            queryset = queryset.filter(category=data['category'])
+
+        if data['transaction_type']:
+            queryset = queryset.filter(transaction_type=data['transaction_type'])
+
+        if data['min_amount'] is not None:
+            queryset = queryset.filter(amount__gte=data['min_amount'])
+
+        if data['max_amount'] is not None:
+            queryset = queryset.filter(amount__lte=data['max_amount'])
+
+        if data['q']:
+            queryset = search_transactions(queryset, data['q'])
+
+        return queryset
+
+    def get_ordering(self):
+        """
+        The ordering of the sort, or None when the matches of a search keep
+        their ranking.
+        """
+        sort = self.cleaned_data.get('sort')
+
+        if not sort and self.cleaned_data.get('q'):
+            return None
+
+        return self.SORTS[sort or self.DEFAULT_SORT]
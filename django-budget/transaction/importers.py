@@ -0,0 +1,193 @@
+"""
+Streaming import of bank statements.
+
+The readers turn a file into a generator of row dicts, one line at a time,
+and import_transactions saves them with bulk_create in batches, so memory
+use doesn't depend on the size of the file.
+"""
+
+from __future__ import unicode_literals
+
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Max
+from django.db.transaction import atomic
+from django.template.defaultfilters import slugify
+from django.utils import six
+from django.utils.encoding import force_text
+from django.utils.translation import ugettext as _
+
+from category.models import Category
+from .models import MonthlyCategoryTotal, Transaction
+from .search import index_transactions
+from .signals import transactions_bulk_changed
+
+BATCH_SIZE = 500
+
+CSV_COLUMNS = ('date', 'category', 'amount', 'transaction_type', 'notes')
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y%m%d')
+
+OFX_TAG = re.compile(r'<(/?)(\w+)>([^<\r\n]*)')
+
+
+class TransactionImportError(ValueError):
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+        super(TransactionImportError, self).__init__(_('Line %(line)d: %(message)s') % {'line': line, 'message': message})
+
+
+def read_csv(lines, encoding='utf-8'):
+    """
+    Yields (line number, row) for each row of a CSV file with a header with
+    date, category and amount columns and optional transaction_type and
+    notes columns.
+    """
+    rows = _csv_reader(force_text(line, encoding) for line in lines)
+    header = [column.strip().lower() for column in next(rows, [])]
+
+    for column in CSV_COLUMNS[:3]:
+        if column not in header:
+            raise TransactionImportError(1, _('The column %s is missing.') % column)
+
+    for line, values in enumerate(rows, 2):
+        if any(values):
+            yield line, dict((column, value) for column, value in zip(header, values) if column in CSV_COLUMNS)
+
+
+def read_ofx(lines, encoding='utf-8'):
+    """
+    Yields (line number, row) for each STMTTRN of an OFX statement. Negative
+    amounts are expenses, positive ones incomes.
+    """
+    row = None
+
+    for line, text in enumerate((force_text(line, encoding) for line in lines), 1):
+        for closing, tag, value in OFX_TAG.findall(text):
+            tag, value = tag.upper(), value.strip()
+
+            if tag == 'STMTTRN':
+                if not closing:
+                    row = {'notes': ''}
+
+                elif row is not None:
+                    amount = row.get('amount', '')
+                    row['transaction_type'] = Transaction.EXPENSE if amount.startswith('-') else Transaction.INCOME
+                    row['amount'] = amount.lstrip('-+')
+                    yield line, row
+                    row = None
+
+            elif row is None or closing:
+                continue
+
+            elif tag == 'DTPOSTED':
+                row['date'] = value[:8]
+
+            elif tag == 'TRNAMT':
+                row['amount'] = value.replace(',', '.')
+
+            elif tag in ('NAME', 'MEMO') and value:
+                row['notes'] = ' - '.join(part for part in (row['notes'], value) if part)
+
+
+def import_transactions(rows, default_category=None, batch_size=BATCH_SIZE):
+    """
+    Saves the rows from one of the readers in a single database transaction
+    and returns how many were imported.
+
+    The categories are matched by slug against a map loaded once, rows without
+    a category use the default one. The first invalid row aborts the import.
+    """
+    categories = dict(Category.active.values_list('slug', 'id'))
+    totals = {}
+    batch = []
+    count = 0
+
+    with atomic():
+        last_pk = Transaction.objects.aggregate(Max('id'))['id__max'] or 0
+
+        for line, row in rows:
+            transaction = _build_transaction(line, row, categories, default_category)
+            key = (transaction.date.year, transaction.date.month, transaction.category_id, transaction.transaction_type)
+            total = totals.setdefault(key, [Decimal('0.0'), 0])
+            total[0] += transaction.amount
+            total[1] += 1
+            batch.append(transaction)
+
+            if len(batch) >= batch_size:
+                Transaction.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            Transaction.objects.bulk_create(batch)
+            count += len(batch)
+
+        for (year, month, category_id, transaction_type), (amount, total_count) in totals.items():
+            MonthlyCategoryTotal.objects.add(year, month, category_id, transaction_type, amount, total_count)
+
+        # bulk_create does not send post_save, nor return the ids on SQLite.
+        index_transactions(Transaction.objects.filter(pk__gt=last_pk))
+
+    if count:
+        transactions_bulk_changed.send(sender=Transaction, months=set(key[:2] for key in totals))
+
+    return count
+
+
+def _build_transaction(line, row, categories, default_category):
+    category_id = default_category.pk if default_category else None
+    category_name = (row.get('category') or '').strip()
+
+    if category_name:
+        category_id = categories.get(slugify(category_name))
+
+        if category_id is None:
+            raise TransactionImportError(line, _('The category %s does not exist.') % category_name)
+
+    elif category_id is None:
+        raise TransactionImportError(line, _('The category is missing.'))
+
+    transaction_type = (row.get('transaction_type') or Transaction.EXPENSE).strip().lower()
+
+    if transaction_type not in dict(Transaction.TRANSACTION_TYPES):
+        raise TransactionImportError(line, _('Invalid transaction type %s.') % transaction_type)
+
+    try:
+        amount = Decimal((row.get('amount') or '').strip()).quantize(Decimal('0.01'))
+
+    except InvalidOperation:
+        raise TransactionImportError(line, _('Invalid amount %s.') % row.get('amount'))
+
+    return Transaction(transaction_type=transaction_type,
+                       category_id=category_id,
+                       notes=(row.get('notes') or '').strip()[:255],
+                       amount=amount,
+                       date=_parse_date(line, row.get('date')))
+
+
+def _parse_date(line, value):
+    value = (value or '').strip()
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+
+        except ValueError:
+            pass
+
+    raise TransactionImportError(line, _('Invalid date %s.') % value)
+
+
+def _csv_reader(lines):
+    if six.PY2:
+        for row in csv.reader(line.encode('utf-8') for line in lines):
+            yield [value.decode('utf-8') for value in row]
+
+    else:
+        for row in csv.reader(lines):
+            yield row
@@ -0,0 +1,45 @@
+from __future__ import unicode_literals
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transaction.archive import BATCH_SIZE, DELETED_AFTER_DAYS, archive_transactions, closed_year, deleted_before
+
+
+class Command(BaseCommand):
+    help = ('Moves the transactions soft deleted long ago, and all the transactions of the given closed years, '
+            'to the archive.')
+    option_list = BaseCommand.option_list + (
+        make_option('--days',
+                    dest='days',
+                    type='int',
+                    default=DELETED_AFTER_DAYS,
+                    help='Archive the transactions deleted more than this number of days ago.'),
+        make_option('--year',
+                    dest='years',
+                    type='int',
+                    action='append',
+                    default=[],
+                    help='Also archive every transaction of this closed year. Can be repeated.'),
+        make_option('--batch-size',
+                    dest='batch_size',
+                    type='int',
+                    default=BATCH_SIZE,
+                    help='Number of transactions moved per database transaction.'),
+    )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('The days cannot be negative and the batch size must be positive.')
+
+        try:
+            querysets = [closed_year(year) for year in options['years']]
+
+        except ValueError as e:
+            raise CommandError(e)
+
+        querysets.insert(0, deleted_before(options['days']))
+        count = sum(archive_transactions(queryset, options['batch_size']) for queryset in querysets)
+
+        self.stdout.write('Archived %d transactions.' % count)
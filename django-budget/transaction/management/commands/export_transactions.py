@@ -0,0 +1,49 @@
+from __future__ import unicode_literals
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transaction.exporters import CHUNK_SIZE, export_csv, filter_transactions
+from transaction.forms import TransactionExportForm
+from transaction.models import Transaction
+
+
+class Command(BaseCommand):
+    args = '<file>'
+    help = 'Exports the active transactions to a CSV file.'
+    option_list = BaseCommand.option_list + (
+        make_option('--start-date',
+                    dest='start_date',
+                    help='Only transactions from this date, as YYYY-MM-DD.'),
+        make_option('--end-date',
+                    dest='end_date',
+                    help='Only transactions until this date, as YYYY-MM-DD.'),
+        make_option('--type',
+                    dest='transaction_type',
+                    help='Only transactions of this type, income or expense.'),
+        make_option('--chunk-size',
+                    dest='chunk_size',
+                    type='int',
+                    default=CHUNK_SIZE,
+                    help='Number of transactions read per query.'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Give the path of the file to write.')
+
+        if options['chunk_size'] < 1:
+            raise CommandError('The chunk size must be at least 1.')
+
+        form = TransactionExportForm(dict((name, options[name]) for name in ('start_date', 'end_date', 'transaction_type')
+                                          if options[name]))
+
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+
+        queryset = filter_transactions(Transaction.active.all(), **form.cleaned_data)
+
+        with open(args[0], 'wb') as output:
+            for line in export_csv(queryset, options['chunk_size']):
+                output.write(line)
@@ -0,0 +1,73 @@
+from __future__ import unicode_literals
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from category.models import Category
+from transaction.importers import BATCH_SIZE, TransactionImportError, import_transactions, read_csv, read_ofx
+
+
+class Command(BaseCommand):
+    args = '<file>'
+    help = 'Imports the transactions of a CSV or OFX file.'
+    option_list = BaseCommand.option_list + (
+        make_option('--format',
+                    dest='file_format',
+                    choices=('csv', 'ofx'),
+                    default='csv',
+                    help='Format of the file, csv or ofx.'),
+        make_option('--category',
+                    dest='category',
+                    help='Slug of the category of the rows without one.'),
+        make_option('--batch-size',
+                    dest='batch_size',
+                    type='int',
+                    default=BATCH_SIZE,
+                    help='Number of transactions inserted per query.'),
+        make_option('--encoding',
+                    dest='encoding',
+                    default='utf-8',
+                    help='Encoding of the file.'),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Give the path of the file to import.')
+
+        category = None
+
+        if options['category']:
+            try:
+                category = Category.active.get(slug=options['category'])
+
+            except Category.DoesNotExist:
+                raise CommandError('The category %s does not exist.' % options['category'])
+
+        reader = read_ofx if options['file_format'] == 'ofx' else read_csv
+
+        with open(args[0], 'rb') as lines:
+            try:
+                count = import_transactions(reader(self.numbered(lines), options['encoding']),
+                                            default_category=category,
+                                            batch_size=options['batch_size'])
+
+            except TransactionImportError as e:
+                raise CommandError(e)
+
+            except UnicodeDecodeError as e:
+                raise CommandError('Line %d: not valid %s text at byte %d, try another --encoding.'
+                                   % (self.line, options['encoding'], e.start))
+
+        self.stdout.write('Imported %d transactions.' % count)
+
+    def numbered(self, lines):
+        """
+        Yields the lines, keeping the number of the last one read, which is
+        the one being decoded when the decoding fails.
+        """
+        self.line = 0
+
+        for line in lines:
+            self.line += 1
+            yield line
@@ -0,0 +1,13 @@
+from __future__ import unicode_literals
+
+from django.core.management.base import NoArgsCommand
+
+from transaction.models import MonthlyCategoryTotal
+
+
+class Command(NoArgsCommand):
+    help = 'Rebuilds the monthly category totals from the active transactions.'
+
+    def handle_noargs(self, **options):
+        count = MonthlyCategoryTotal.objects.rebuild()
+        self.stdout.write('Rebuilt %d monthly category totals.' % count)
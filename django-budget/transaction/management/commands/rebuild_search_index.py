@@ -0,0 +1,17 @@
+from __future__ import unicode_literals
+
+from django.core.management.base import NoArgsCommand
+
+from transaction.models import Transaction
+from transaction.search import create_index
+
+
+class Command(NoArgsCommand):
+    help = 'Creates the full-text index of the transaction notes if needed and indexes every transaction again.'
+
+    def handle_noargs(self, **options):
+        if create_index(Transaction):
+            self.stdout.write('Indexed the notes of the transactions.')
+
+        else:
+            self.stdout.write('The database does not support the full-text index, searches will scan the notes.')
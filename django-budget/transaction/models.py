@@ -1,13 +1,22 @@
 from __future__ import unicode_literals
 
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
 
-from django.db import models
+from django.db import IntegrityError, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_delete, post_init, post_save, post_syncdb
+from django.db.transaction import atomic
 from django.utils.translation import ugettext_lazy as _
 from django.utils.encoding import python_2_unicode_compatible
 
-from base.models import ActiveManager, StandardMetadata
+from base.cache import bump_version, bump_version_on_change, get_budget_cache, get_cache_timeout, get_versions, make_key
+from base.dates import first_day_of_next_month, last_day_of_month, months_between
+from base.models import ActiveManager, SoftDeleteManager, StandardMetadata
+from base.signals import pre_restore, pre_soft_delete
 from category.models import Category
+from .search import create_index, index_on_save, unindex_on_delete
+from .signals import transactions_bulk_changed
 
 
 class TransactionLatestManager(ActiveManager):
@@ -25,11 +34,6 @@ class TransactionExpenseManager(TransactionLatestManager):
         return super(TransactionExpenseManager, self).get_query_set().filter(transaction_type=Transaction.EXPENSE)
 
 
-class TransactionByMonthManager(ActiveManager):
-    def get_query_set(self):
-        return super(TransactionByMonthManager, self).get_query_set().dates('date', 'month')
-
-
 @python_2_unicode_compatible
 class Transaction(StandardMetadata):
     EXPENSE = 'expense'
@@ -47,21 +51,411 @@ class Transaction(StandardMetadata):
                                  verbose_name=_('Category'),
                                  limit_choices_to={'is_deleted': False})
     notes = models.TextField(_('Notes'), max_length=255, blank=True)
-    amount = models.DecimalField(_('Amount'), max_digits=11, decimal_places=2)
+    amount = models.DecimalField(_('Amount'), max_digits=11, decimal_places=2, db_index=True)
     date = models.DateField(_('Date'), db_index=True, default=date.today)
 
-    objects = models.Manager()
+    objects = SoftDeleteManager()
     active = ActiveManager()
     latest = TransactionLatestManager()
     incomes = TransactionIncomeManager()
     expenses = TransactionExpenseManager()
-    months = TransactionByMonthManager()
 
     def __str__(self):
         return '%s (%s) - %.02f' % (self.notes,
                                     self.get_transaction_type_display(),
                                     self.amount)
 
+    def delete(self):
+        super(Transaction, self).delete()
+        self._rollup_state = None
+
+    def restore(self):
+        super(Transaction, self).restore()
+        self._rollup_state = _rollup_bucket(self)
+
     class Meta:
         verbose_name = _('Transaction')
         verbose_name_plural = _('Transactions')
+        # Serves the expenses of a category in a period, used by the summaries.
+        index_together = (('category', 'transaction_type', 'is_deleted', 'date'),)
+
+
+class ArchivedTransactionManager(models.Manager):
+    def years(self):
+        """
+        The years with archived active transactions, the ones the summaries
+        read from the archive too, cached until the archive changes.
+        """
+        cache = get_budget_cache()
+        key = make_key('archived_years', *get_versions('archive'))
+        years = cache.get(key)
+
+        if years is None:
+            years = sorted(set(day.year for day in self.filter(is_deleted=False).dates('date', 'year')))
+            cache.set(key, years, get_cache_timeout())
+
+        return years
+
+    def covers(self, start_date, end_date):
+        """
+        If the archive may have active transactions in the period.
+        """
+        return any(start_date.year <= year <= end_date.year for year in self.years())
+
+
+@python_2_unicode_compatible
+class ArchivedTransaction(models.Model):
+    """
+    A transaction moved out of the transaction table by the
+    archive_transactions command, with its id and metadata unchanged.
+
+    The monthly totals keep counting the active ones, so only the reads of
+    the transactions themselves, as the days at the edges of a period or the
+    details of the summaries, go to the archive, and only for the years it
+    has.
+    """
+    id = models.IntegerField(primary_key=True)
+    transaction_type = models.CharField(_('Transaction Type'),
+                                        choices=Transaction.TRANSACTION_TYPES,
+                                        max_length=32,
+                                        default=Transaction.EXPENSE)
+    category = models.ForeignKey(Category,
+                                 related_name='archived_transactions',
+                                 verbose_name=_('Category'))
+    notes = models.TextField(_('Notes'), max_length=255, blank=True)
+    amount = models.DecimalField(_('Amount'), max_digits=11, decimal_places=2)
+    date = models.DateField(_('Date'))
+    created = models.DateTimeField(_('Created'))
+    updated = models.DateTimeField(_('Updated'))
+    is_deleted = models.BooleanField(_('Is deleted'), default=False)
+    archived = models.DateTimeField(_('Archived'), auto_now_add=True)
+
+    objects = ArchivedTransactionManager()
+
+    def __str__(self):
+        return '%s (%s) - %.02f' % (self.notes,
+                                    self.get_transaction_type_display(),
+                                    self.amount)
+
+    class Meta:
+        verbose_name = _('Archived transaction')
+        verbose_name_plural = _('Archived transactions')
+        index_together = (('category', 'transaction_type', 'is_deleted', 'date'),)
+
+
+class MonthlyCategoryTotalManager(models.Manager):
+    def add(self, year, month, category_id, transaction_type, amount, count):
+        """
+        Adds the amount and count to the total of the given month, creating
+        the row if it does not exist yet.
+        """
+        totals = self.filter(year=year,
+                             month=month,
+                             category=category_id,
+                             transaction_type=transaction_type)
+
+        if totals.update(amount=F('amount') + amount, count=F('count') + count):
+            return
+
+        try:
+            with atomic():
+                self.create(year=year,
+                            month=month,
+                            category_id=category_id,
+                            transaction_type=transaction_type,
+                            amount=amount,
+                            count=count)
+
+        except IntegrityError:
+            totals.update(amount=F('amount') + amount, count=F('count') + count)
+
+    def subtract(self, year, month, category_id, transaction_type, amount, count):
+        """
+        Subtracts the amount and count from the total of the given month. It
+        never creates the row: when it is gone, as when its category is being
+        deleted, there is nothing left to subtract from.
+        """
+        self.filter(year=year,
+                    month=month,
+                    category=category_id,
+                    transaction_type=transaction_type).update(amount=F('amount') - amount, count=F('count') - count)
+
+    def amounts_by_category(self, start_date, end_date, categories, transaction_type=None):
+        """
+        Returns a dict with the total amount per category id in the period.
+
+        Whole months are read from the period totals, only the days of the
+        partial months at the edges of the period are summed from the
+        transactions.
+        """
+        transaction_type = transaction_type or Transaction.EXPENSE
+        amounts = {}
+
+        first_day = start_date if start_date.day == 1 else first_day_of_next_month(start_date)
+        last_day = end_date if end_date == last_day_of_month(end_date) else end_date.replace(day=1) - timedelta(days=1)
+
+        if first_day > last_day:
+            edges = Q(date__range=(start_date, end_date))
+
+        else:
+            totals = self.period_totals(first_day, last_day, transaction_type)
+            _sum_into(amounts, ((category_id, totals[category_id]) for category_id in set(categories) if category_id in totals))
+
+            edges = Q()
+            if start_date < first_day:
+                edges |= Q(date__range=(start_date, first_day - timedelta(days=1)))
+            if end_date > last_day:
+                edges |= Q(date__range=(last_day + timedelta(days=1), end_date))
+
+        if edges:
+            transactions = Transaction.active.filter(edges,
+                                                     category__in=categories,
+                                                     transaction_type=transaction_type)
+            _sum_into(amounts, transactions.values_list('category').annotate(Sum('amount')).order_by())
+
+            if ArchivedTransaction.objects.covers(start_date, end_date):
+                archived = ArchivedTransaction.objects.filter(edges,
+                                                              category__in=categories,
+                                                              transaction_type=transaction_type,
+                                                              is_deleted=False)
+                _sum_into(amounts, archived.values_list('category').annotate(Sum('amount')).order_by())
+
+        return amounts
+
+    def period_totals(self, first_month, last_month, transaction_type=None):
+        """
+        Returns a dict with the total amount per category id of the whole
+        months between the given ones, cached under the versions of those
+        months. A change only invalidates the periods that include its
+        month, so the closed ones stay cached while the current month's
+        expenses come in, and the current ones are recomputed from the
+        rollup rows of the period alone.
+        """
+        transaction_type = transaction_type or Transaction.EXPENSE
+        months = months_between(first_month, last_month)
+        versions = get_versions(*[month_version(month.year, month.month) for month in months])
+
+        cache = get_budget_cache()
+        key = make_key('period_totals', months[0], months[-1], transaction_type, *versions)
+        totals = cache.get(key)
+
+        if totals is None:
+            rows = self.filter(Q(year__gt=first_month.year) | Q(year=first_month.year, month__gte=first_month.month),
+                               Q(year__lt=last_month.year) | Q(year=last_month.year, month__lte=last_month.month),
+                               transaction_type=transaction_type)
+            totals = {}
+            _sum_into(totals, rows.values_list('category').annotate(Sum('amount')).order_by())
+            cache.set(key, totals, get_cache_timeout())
+
+        return totals
+
+    def amounts_by_month(self, first_month, last_month, transaction_type=None):
+        """
+        Returns a dict with the total amount per (month, category id) for the
+        whole months between the given ones, the months as their first day.
+        """
+        transaction_type = transaction_type or Transaction.EXPENSE
+        totals = self.filter(Q(year__gt=first_month.year) | Q(year=first_month.year, month__gte=first_month.month),
+                             Q(year__lt=last_month.year) | Q(year=last_month.year, month__lte=last_month.month),
+                             transaction_type=transaction_type)
+
+        return dict(((date(year, month, 1), category_id), amount)
+                    for year, month, category_id, amount in totals.values_list('year', 'month', 'category', 'amount'))
+
+    def months(self):
+        """
+        The first day of each month with active transactions, the latest
+        first, cached until a transaction changes.
+        """
+        cache = get_budget_cache()
+        key = make_key('months', *get_versions('transaction'))
+        months = cache.get(key)
+
+        if months is None:
+            months = [date(year, month, 1) for year, month in self.filter(count__gt=0)
+                                                                  .values_list('year', 'month')
+                                                                  .distinct()
+                                                                  .order_by('-year', '-month')]
+            cache.set(key, months, get_cache_timeout())
+
+        return months
+
+    def rebuild(self):
+        """
+        Recomputes every monthly total from the active transactions, the
+        archived ones included.
+        """
+        totals = _monthly_totals(Transaction.active.all(), ArchivedTransaction.objects.filter(is_deleted=False))
+        months = set(key[:2] for key in totals)
+
+        with atomic():
+            months.update(self.values_list('year', 'month').distinct())
+            self.all().delete()
+            self.bulk_create([MonthlyCategoryTotal(year=year,
+                                                   month=month,
+                                                   category_id=category_id,
+                                                   transaction_type=transaction_type,
+                                                   amount=amount,
+                                                   count=count)
+                              for (year, month, category_id, transaction_type), (amount, count) in totals.items()],
+                             batch_size=500)
+
+        # The cached summaries may have been computed from wrong totals.
+        transactions_bulk_changed.send(sender=Transaction, months=months)
+
+        return len(totals)
+
+
+class MonthlyCategoryTotal(models.Model):
+    """
+    Materialized sum of the active transactions of a category per month.
+
+    It is kept up to date by the signals on Transaction, so the summaries can
+    read the totals without scanning the transactions. Run the
+    rebuild_monthly_totals command if it gets out of sync.
+    """
+    year = models.PositiveSmallIntegerField(_('Year'))
+    month = models.PositiveSmallIntegerField(_('Month'))
+    category = models.ForeignKey(Category,
+                                 related_name='monthly_totals',
+                                 verbose_name=_('Category'))
+    transaction_type = models.CharField(_('Transaction Type'),
+                                        choices=Transaction.TRANSACTION_TYPES,
+                                        max_length=32)
+    amount = models.DecimalField(_('Amount'), max_digits=15, decimal_places=2, default=Decimal('0.0'))
+    count = models.IntegerField(_('Count'), default=0)
+
+    objects = MonthlyCategoryTotalManager()
+
+    class Meta:
+        verbose_name = _('Monthly category total')
+        verbose_name_plural = _('Monthly category totals')
+        unique_together = ('year', 'month', 'category', 'transaction_type')
+
+
+def _monthly_totals(*querysets):
+    """
+    The amount and count of the transactions per (year, month, category id,
+    transaction type), summed by the database per day.
+    """
+    totals = {}
+
+    for transactions in querysets:
+        days = transactions.values_list('date', 'category', 'transaction_type')
+        days = days.annotate(Sum('amount'), Count('id')).order_by()
+
+        for day, category_id, transaction_type, amount, count in days.iterator():
+            total = totals.setdefault((day.year, day.month, category_id, transaction_type),
+                                      [Decimal('0.0'), 0])
+            total[0] += amount
+            total[1] += count
+
+    return totals
+
+
+def _sum_into(amounts, rows):
+    for category_id, amount in rows:
+        amounts[category_id] = amounts.get(category_id, Decimal('0.0')) + amount
+
+
+def month_version(year, month):
+    """
+    The name of the version of the active transactions of a month, bumped
+    only when one of them changes.
+    """
+    return 'transaction:%d-%02d' % (year, month)
+
+
+def _rollup_bucket(instance):
+    """
+    The rollup bucket and amount the transaction accounts for, or None when
+    it is not active.
+    """
+    if instance.is_deleted or None in (instance.date, instance.category_id, instance.amount):
+        return None
+
+    amount = Transaction._meta.get_field('amount').to_python(instance.amount)
+    return (instance.date.year, instance.date.month, instance.category_id, instance.transaction_type), amount
+
+
+def remember_rollup_state(sender, instance, **kwargs):
+    instance._rollup_state = _rollup_bucket(instance)
+
+
+def update_rollup_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+
+    old = None if created else getattr(instance, '_rollup_state', None)
+    new = _rollup_bucket(instance)
+
+    if old and new and old[0] == new[0]:
+        if old[1] != new[1]:
+            MonthlyCategoryTotal.objects.add(*new[0], amount=new[1] - old[1], count=0)
+
+    else:
+        if old:
+            MonthlyCategoryTotal.objects.subtract(*old[0], amount=old[1], count=1)
+        if new:
+            MonthlyCategoryTotal.objects.add(*new[0], amount=new[1], count=1)
+
+    if old != new:
+        bump_version(*set(month_version(*bucket[0][:2]) for bucket in (old, new) if bucket))
+
+    instance._rollup_state = new
+
+
+def update_rollup_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_rollup_state', None)
+
+    if old:
+        MonthlyCategoryTotal.objects.subtract(*old[0], amount=old[1], count=1)
+        bump_version(month_version(*old[0][:2]))
+
+
+def update_rollup_on_soft_delete(sender, queryset, **kwargs):
+    _add_to_rollup(queryset, -1)
+
+
+def update_rollup_on_restore(sender, queryset, **kwargs):
+    _add_to_rollup(queryset, 1)
+
+
+def _add_to_rollup(transactions, sign):
+    """
+    Adds, or subtracts, the transactions changed by a soft delete or a
+    restore to the rollup, with one query to sum them.
+    """
+    totals = _monthly_totals(transactions)
+
+    for bucket, (amount, count) in totals.items():
+        if sign > 0:
+            MonthlyCategoryTotal.objects.add(*bucket, amount=amount, count=count)
+
+        else:
+            MonthlyCategoryTotal.objects.subtract(*bucket, amount=amount, count=count)
+
+    if totals:
+        bump_version(*set(month_version(*bucket[:2]) for bucket in totals))
+
+
+def bump_version_on_bulk_change(sender, months=(), **kwargs):
+    bump_version('transaction', *[month_version(year, month) for year, month in months])
+
+
+def create_search_index(sender, created_models=(), db='default', **kwargs):
+    if Transaction in created_models:
+        create_index(Transaction, db)
+
+
+post_init.connect(remember_rollup_state, sender=Transaction)
+post_save.connect(update_rollup_on_save, sender=Transaction)
+post_delete.connect(update_rollup_on_delete, sender=Transaction)
+pre_soft_delete.connect(update_rollup_on_soft_delete, sender=Transaction)
+pre_restore.connect(update_rollup_on_restore, sender=Transaction)
+post_save.connect(index_on_save, sender=Transaction)
+post_delete.connect(unindex_on_delete, sender=Transaction)
+post_syncdb.connect(create_search_index)
+
+bump_version_on_change(Transaction, 'transaction')
+transactions_bulk_changed.connect(bump_version_on_bulk_change, sender=Transaction)
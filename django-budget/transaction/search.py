@@ -0,0 +1,148 @@
+"""
+Full-text search over the notes of the transactions.
+
+On SQLite the notes are copied to an FTS5 table, with the id of the
+transaction as its rowid, kept in sync by the signals of the transactions
+and by the bulk operations that skip them. A search then reads the matching
+ids from the full-text index, ranked by bm25, instead of scanning every
+note.
+
+On the other backends, or an SQLite built without FTS5, each word is looked
+up with icontains instead, which gives the same matches unranked.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+import re
+from functools import reduce
+from operator import and_
+
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+logger = logging.getLogger('budget.search')
+
+FTS_TABLE = 'transaction_transaction_fts'
+
+WORDS = re.compile(r'\w+', re.UNICODE)
+
+_available = {}
+
+
+def is_available(using='default'):
+    """
+    If the full-text index exists in the database, checked once per alias.
+    """
+    if using not in _available:
+        connection = connections[using]
+        _available[using] = False
+
+        if connection.vendor == 'sqlite':
+            _available[using] = FTS_TABLE in connection.introspection.table_names()
+
+    return _available[using]
+
+
+def create_index(model, using='default'):
+    """
+    Creates the full-text table if it does not exist and fills it with the
+    notes of every transaction. Returns if the backend supports it.
+    """
+    connection = connections[using]
+    _available.pop(using, None)
+
+    if connection.vendor != 'sqlite':
+        return False
+
+    try:
+        connection.cursor().execute('CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(notes, '
+                                    'tokenize="unicode61 remove_diacritics 1")' % FTS_TABLE)
+
+    except DatabaseError as e:
+        logger.warning('The full-text index was not created, searches will scan the notes: %s', e)
+        return False
+
+    rebuild_index(model, using)
+    return True
+
+
+def rebuild_index(model, using='default'):
+    """
+    Indexes the notes of every transaction again, returns how many.
+    """
+    connection = connections[using]
+    connection.cursor().execute('DELETE FROM %s' % FTS_TABLE)
+    return index_transactions(model._default_manager.using(using).all())
+
+
+def index_transactions(queryset):
+    """
+    Indexes the transactions of the queryset with one INSERT ... SELECT,
+    for the ones created without post_save, e.g. by bulk_create.
+    """
+    if not is_available(queryset.db):
+        return 0
+
+    sql, params = queryset.exclude(notes='').values_list('id', 'notes').order_by().query.sql_with_params()
+    cursor = connections[queryset.db].cursor()
+    cursor.execute('INSERT INTO %s (rowid, notes) %s' % (FTS_TABLE, sql), params)
+    return cursor.rowcount
+
+
+def unindex_transactions(pks, using='default'):
+    if not is_available(using):
+        return
+
+    pks = list(pks)
+    cursor = connections[using].cursor()
+
+    # Under the limit of variables of the older SQLite versions.
+    for offset in range(0, len(pks), 500):
+        chunk = pks[offset:offset + 500]
+        cursor.execute('DELETE FROM %s WHERE rowid IN (%s)' % (FTS_TABLE, ', '.join(['%s'] * len(chunk))), chunk)
+
+
+def match_expression(terms):
+    """
+    The FTS5 query for the words of the terms, all of them required and
+    each one matched as a prefix, so "lun caf" finds "Lunch at the cafe".
+    Anything but the words is dropped, so no input is a syntax error.
+    """
+    return ' '.join('"%s"*' % word for word in WORDS.findall(terms))
+
+
+def search_transactions(queryset, terms):
+    """
+    The transactions of the queryset whose notes have every word of the
+    terms, the best matches first when the full-text index is available.
+    """
+    words = WORDS.findall(terms)
+
+    if not words:
+        return queryset
+
+    if not is_available(queryset.db):
+        return queryset.filter(reduce(and_, [Q(notes__icontains=word) for word in words])).order_by('-date', '-id')
+
+    table = queryset.model._meta.db_table
+    queryset = queryset.extra(select={'search_rank': '%s.rank' % FTS_TABLE},
+                              tables=[FTS_TABLE],
+                              where=['%s.rowid = %s.id' % (FTS_TABLE, table), '%s MATCH %%s' % FTS_TABLE],
+                              params=[match_expression(terms)])
+    return queryset.order_by('search_rank', '-id')
+
+
+def index_on_save(sender, instance, raw=False, using='default', **kwargs):
+    if not is_available(using):
+        return
+
+    cursor = connections[using].cursor()
+    cursor.execute('DELETE FROM %s WHERE rowid = %%s' % FTS_TABLE, [instance.pk])
+
+    if instance.notes:
+        cursor.execute('INSERT INTO %s (rowid, notes) VALUES (%%s, %%s)' % FTS_TABLE, [instance.pk, instance.notes])
+
+
+def unindex_on_delete(sender, instance, using='default', **kwargs):
+    unindex_transactions([instance.pk], using)
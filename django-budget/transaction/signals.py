@@ -0,0 +1,7 @@
+from __future__ import unicode_literals
+
+from django.dispatch import Signal
+
+# Sent after transactions were changed without their post_save/post_delete
+# signals, e.g. by bulk_create. months is a set of (year, month) tuples.
+transactions_bulk_changed = Signal(providing_args=['months'])
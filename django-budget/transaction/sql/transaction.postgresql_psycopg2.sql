@@ -0,0 +1,3 @@
+-- Active transactions only, for the ActiveManager queries. SQLite supports
+-- partial indexes too, but can't use them with bound parameters.
+CREATE INDEX "transaction_transaction_active" ON "transaction_transaction" ("category_id", "transaction_type", "date") WHERE "is_deleted" = false;
@@ -0,0 +1,98 @@
+from __future__ import unicode_literals
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from model_mommy import mommy
+
+
+class ArchiveTransactionsTest(TestCase):
+
+    def setUp(self):
+        from transaction.models import Transaction
+
+        self.category = mommy.make('Category')
+        self.old = mommy.make('Transaction', category=self.category, amount=Decimal('10.0'), date=date(2013, 5, 10),
+                              _quantity=3)
+        self.current = mommy.make('Transaction', category=self.category, amount=Decimal('5.0'), date=date.today())
+        self.deleted = mommy.make('Transaction', category=self.category, date=date.today())
+        self.deleted.delete()
+        Transaction.objects.filter(pk=self.deleted.pk).update(updated=timezone.now() - timedelta(days=100))
+
+    def test_archive_in_batches(self):
+        from transaction.archive import archive_transactions, closed_year
+        from transaction.models import ArchivedTransaction, Transaction
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(3, archive_transactions(closed_year(2013), batch_size=1))
+
+        statements = [query['sql'] for query in context.captured_queries]
+        self.assertEqual(3, len([sql for sql in statements if 'INSERT ' in sql]))
+        self.assertEqual(3, len([sql for sql in statements if 'DELETE FROM "transaction_transaction"' in sql]))
+
+        self.assertEqual(set(t.pk for t in self.old), set(ArchivedTransaction.objects.values_list('pk', flat=True)))
+        self.assertFalse(Transaction.objects.filter(date__year=2013).exists())
+
+        archived = ArchivedTransaction.objects.get(pk=self.old[0].pk)
+        self.assertEqual((self.old[0].amount, self.old[0].created, self.old[0].category_id),
+                         (archived.amount, archived.created, archived.category_id))
+        self.assertTrue(archived.archived)
+
+    def test_archived_rows_keep_counting_in_the_totals(self):
+        from transaction.archive import archive_transactions, closed_year
+        from transaction.models import MonthlyCategoryTotal
+
+        archive_transactions(closed_year(2013))
+
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(date(2013, 5, 1), date(2013, 5, 31), [self.category.pk])
+        self.assertEqual(Decimal('30.0'), amounts[self.category.pk])
+
+        MonthlyCategoryTotal.objects.rebuild()
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(date(2013, 5, 1), date(2013, 5, 31), [self.category.pk])
+        self.assertEqual(Decimal('30.0'), amounts[self.category.pk])
+
+    def test_edges_of_a_period_are_summed_from_the_archive(self):
+        from transaction.archive import archive_transactions, closed_year
+        from transaction.models import MonthlyCategoryTotal
+
+        archive_transactions(closed_year(2013))
+
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(date(2013, 5, 5), date(2013, 5, 20), [self.category.pk])
+        self.assertEqual(Decimal('30.0'), amounts[self.category.pk])
+
+    def test_open_year_is_not_archived(self):
+        from transaction.archive import closed_year
+
+        self.assertRaises(ValueError, closed_year, date.today().year)
+
+    def test_command(self):
+        from django.core.management import call_command
+        from transaction.models import ArchivedTransaction, Transaction
+
+        stdout = StringIO()
+        call_command('archive_transactions', years=[2013], stdout=stdout)
+
+        self.assertIn('Archived 4 transactions.', stdout.getvalue())
+        self.assertEqual([self.current], list(Transaction.objects.all()))
+        self.assertTrue(ArchivedTransaction.objects.get(pk=self.deleted.pk).is_deleted)
+        self.assertEqual([2013], ArchivedTransaction.objects.years())
+
+    def test_command_keeps_the_recently_deleted(self):
+        from django.core.management import call_command
+        from transaction.models import Transaction
+
+        call_command('archive_transactions', days=200, stdout=StringIO())
+
+        self.assertTrue(Transaction.objects.filter(pk=self.deleted.pk).exists())
+
+    def test_command_with_an_open_year(self):
+        from django.core.management import call_command
+
+        self.assertRaises(CommandError, call_command, 'archive_transactions', years=[date.today().year])
@@ -0,0 +1,80 @@
+from __future__ import unicode_literals
+
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from model_mommy import mommy
+
+
+class ExportTransactionsTest(TestCase):
+
+    def setUp(self):
+        from transaction.models import Transaction
+
+        category = mommy.make('Category', name='Food')
+        self.t1 = mommy.make('Transaction', category=category, amount=Decimal('1.50'), date=date(2014, 3, 1), notes='Lunch, "cheap"')
+        self.t2 = mommy.make('Transaction', category=category, amount=Decimal('2.00'), date=date(2014, 4, 1))
+        self.t3 = mommy.make('Transaction', category=category, transaction_type=Transaction.INCOME, date=date(2014, 4, 2))
+        mommy.make('Transaction', is_deleted=True)
+
+    def test_export_rows_in_chunks(self):
+        from transaction.exporters import export_rows
+
+        with self.assertNumQueries(2):
+            rows = list(export_rows(chunk_size=2))
+
+        self.assertEqual([self.t1.pk, self.t2.pk, self.t3.pk], [row[0] for row in rows])
+
+    def test_export_csv(self):
+        from transaction.exporters import export_csv
+
+        lines = list(export_csv())
+
+        self.assertEqual(4, len(lines))
+        self.assertEqual(b'id,date,transaction_type,category,amount,notes\r\n', lines[0])
+        self.assertEqual(('%d,2014-03-01,expense,Food,1.50,"Lunch, ""cheap"""\r\n' % self.t1.pk).encode('utf-8'), lines[1])
+
+    def test_filter_transactions(self):
+        from transaction.exporters import filter_transactions
+        from transaction.models import Transaction
+
+        queryset = filter_transactions(Transaction.active.all(),
+                                       start_date=date(2014, 4, 1),
+                                       end_date=date(2014, 4, 30),
+                                       transaction_type=Transaction.EXPENSE)
+
+        self.assertEqual([self.t2], list(queryset))
+
+    def test_export_command(self):
+        import os
+        import tempfile
+
+        from django.core.management import call_command
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command('export_transactions', path, start_date='2014-04-01', chunk_size=1)
+
+        with open(path, 'rb') as output:
+            self.assertEqual(3, len(output.readlines()))
+
+    def test_export_command_with_an_invalid_chunk_size(self):
+        import os
+        import shutil
+        import tempfile
+
+        from django.core.management import CommandError, call_command
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'transactions.csv')
+
+        for chunk_size in (0, -1):
+            with self.assertRaises(CommandError):
+                call_command('export_transactions', path, chunk_size=chunk_size)
+
+        self.assertFalse(os.path.exists(path))
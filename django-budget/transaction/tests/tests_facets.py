@@ -0,0 +1,71 @@
+from __future__ import unicode_literals
+
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from model_mommy import mommy
+
+
+class TransactionFacetsTest(TestCase):
+
+    def setUp(self):
+        from transaction.models import Transaction
+
+        self.spam = mommy.make('Category', name='Spam')
+        self.eggs = mommy.make('Category', name='Eggs')
+        mommy.make('Transaction', category=self.spam, amount=Decimal('10.0'), notes='Lunch', _quantity=2)
+        mommy.make('Transaction', category=self.spam, amount=Decimal('100.0'), transaction_type=Transaction.INCOME)
+        mommy.make('Transaction', category=self.eggs, amount=Decimal('5.0'), notes='Lunch')
+        mommy.make('Transaction', category=self.eggs, amount=Decimal('50.0'), is_deleted=True)
+
+    def test_facets_in_one_query(self):
+        from transaction.facets import transaction_facets
+        from transaction.models import Transaction
+
+        with self.assertNumQueries(1):
+            facets = transaction_facets(Transaction.active.all())
+
+        self.assertEqual([{'id': self.eggs.pk, 'name': 'Eggs', 'slug': self.eggs.slug, 'count': 1, 'amount': Decimal('5.0')},
+                          {'id': self.spam.pk, 'name': 'Spam', 'slug': self.spam.slug, 'count': 3, 'amount': Decimal('120.0')}],
+                         facets['categories'])
+        self.assertEqual([{'value': 'income', 'count': 1, 'amount': Decimal('100.0')},
+                          {'value': 'expense', 'count': 3, 'amount': Decimal('25.0')}], facets['types'])
+
+    def test_facets_of_a_search(self):
+        from transaction.facets import transaction_facets
+        from transaction.models import Transaction
+        from transaction.search import search_transactions
+
+        facets = transaction_facets(search_transactions(Transaction.active.all(), 'lunch'))
+
+        self.assertEqual([1, 2], [category['count'] for category in facets['categories']])
+        self.assertEqual([{'value': 'expense', 'count': 3, 'amount': Decimal('25.0')}], facets['types'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'transaction-facets-tests'}})
+    def test_facets_are_cached_per_filter_signature(self):
+        from base.cache import get_budget_cache
+        from transaction.facets import cached_transaction_facets
+        from transaction.models import Transaction
+
+        get_budget_cache().clear()
+        spam_only = {'category': self.spam, 'start_date': date(2014, 1, 1)}
+
+        with self.assertNumQueries(1):
+            cached_transaction_facets(Transaction.active.filter(category=self.spam), spam_only)
+
+        with self.assertNumQueries(0):
+            facets = cached_transaction_facets(Transaction.active.filter(category=self.spam), spam_only)
+
+        self.assertEqual('Income', facets['types'][0]['label'])
+
+        with self.assertNumQueries(1):
+            cached_transaction_facets(Transaction.active.all(), {})
+
+        mommy.make('Transaction', category=self.spam)
+
+        with self.assertNumQueries(1):
+            cached_transaction_facets(Transaction.active.filter(category=self.spam), spam_only)
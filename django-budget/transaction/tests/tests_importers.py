@@ -0,0 +1,147 @@
+from __future__ import unicode_literals
+
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from model_mommy import mommy
+
+CSV = b'''Date,Category,Amount,Transaction_Type,Notes
+2014-03-01,Food,10.50,expense,"Lunch, with friends"
+02/03/2014,Salary,1000,income,
+'''
+
+OFX = b'''OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20140305120000
+<TRNAMT>-25.00
+<NAME>Market
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20140306<TRNAMT>50.00<MEMO>Refund</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+'''
+
+
+class ImportTransactionsTest(TestCase):
+
+    def setUp(self):
+        self.food = mommy.make('Category', name='Food', slug='food')
+        self.salary = mommy.make('Category', name='Salary', slug='salary')
+
+    def test_read_csv(self):
+        from transaction.importers import read_csv
+
+        rows = list(read_csv(CSV.splitlines(True)))
+
+        self.assertEqual(2, len(rows))
+        self.assertEqual((2, {'date': '2014-03-01',
+                              'category': 'Food',
+                              'amount': '10.50',
+                              'transaction_type': 'expense',
+                              'notes': 'Lunch, with friends'}), rows[0])
+
+    def test_read_csv_without_required_column(self):
+        from transaction.importers import TransactionImportError, read_csv
+
+        self.assertRaises(TransactionImportError, list, read_csv([b'date,amount\n']))
+
+    def test_read_ofx(self):
+        from transaction.importers import read_ofx
+
+        rows = [row for _, row in read_ofx(OFX.splitlines(True))]
+
+        self.assertEqual([{'date': '20140305', 'amount': '25.00', 'transaction_type': 'expense', 'notes': 'Market'},
+                          {'date': '20140306', 'amount': '50.00', 'transaction_type': 'income', 'notes': 'Refund'}],
+                         rows)
+
+    def test_import_csv_in_batches(self):
+        from transaction.importers import import_transactions, read_csv
+        from transaction.models import MonthlyCategoryTotal, Transaction
+
+        with CaptureQueriesContext(connection) as queries:
+            count = import_transactions(read_csv(CSV.splitlines(True)), batch_size=1)
+
+        inserts = [query for query in queries if 'INSERT INTO "transaction_transaction"' in query['sql']]
+
+        self.assertEqual(2, len(inserts))
+        self.assertEqual(2, count)
+        self.assertEqual(2, Transaction.active.count())
+
+        expense = Transaction.expenses.get()
+        self.assertEqual(self.food, expense.category)
+        self.assertEqual(Decimal('10.50'), expense.amount)
+        self.assertEqual(date(2014, 3, 1), expense.date)
+        self.assertEqual('Lunch, with friends', expense.notes)
+
+        income = Transaction.incomes.get()
+        self.assertEqual(self.salary, income.category)
+        self.assertEqual(date(2014, 3, 2), income.date)
+
+        self.assertEqual({self.food.pk: Decimal('10.50')},
+                         MonthlyCategoryTotal.objects.amounts_by_category(date(2014, 3, 1), date(2014, 3, 31), [self.food.pk]))
+
+    def test_import_ofx_with_default_category(self):
+        from transaction.importers import import_transactions, read_ofx
+        from transaction.models import Transaction
+
+        count = import_transactions(read_ofx(OFX.splitlines(True)), default_category=self.food)
+
+        self.assertEqual(2, count)
+        self.assertEqual(1, Transaction.expenses.filter(category=self.food, amount=Decimal('25.0')).count())
+        self.assertEqual(1, Transaction.incomes.filter(category=self.food, amount=Decimal('50.0')).count())
+
+    def test_import_is_aborted_by_an_invalid_row(self):
+        from transaction.importers import TransactionImportError, import_transactions, read_csv
+        from transaction.models import Transaction
+
+        lines = CSV.splitlines(True) + [b'2014-03-01,Unknown,1.0,expense,\n']
+
+        with self.assertRaises(TransactionImportError) as context:
+            import_transactions(read_csv(lines), batch_size=1)
+
+        self.assertEqual(4, context.exception.line)
+        self.assertEqual(0, Transaction.objects.count())
+
+    def test_import_command(self):
+        import os
+        import tempfile
+
+        from django.core.management import call_command
+        from django.utils.six import StringIO
+
+        from transaction.models import Transaction
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.write(handle, CSV)
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        stdout = StringIO()
+
+        call_command('import_transactions', path, stdout=stdout)
+
+        self.assertEqual(2, Transaction.objects.count())
+        self.assertIn('Imported 2 transactions.', stdout.getvalue())
+
+    def test_import_command_with_the_wrong_encoding(self):
+        import os
+        import tempfile
+
+        from django.core.management import CommandError, call_command
+
+        from transaction.models import Transaction
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.write(handle, CSV + b'2014-03-02,Food,5,expense,Caf\xe9\n')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        with self.assertRaises(CommandError) as context:
+            call_command('import_transactions', path)
+
+        self.assertEqual('Line 4: not valid utf-8 text at byte 29, try another --encoding.', '%s' % context.exception)
+        self.assertEqual(0, Transaction.objects.count())
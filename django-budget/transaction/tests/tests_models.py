@@ -1,9 +1,10 @@
 from __future__ import unicode_literals
 
-from datetime import timedelta
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.core.exceptions import ValidationError
 
 from model_mommy import mommy
@@ -83,14 +84,150 @@ class TransactionModelTest(TestCase):
 
         self.assertTrue(transaction.is_deleted)
 
-    def test_months_transaction_manager(self):
+
+class MonthlyCategoryTotalTest(TestCase):
+
+    def setUp(self):
+        self.category = mommy.make('Category')
+        self.day = date(2014, 3, 15)
+
+    def test_new_transaction_is_added_to_the_total(self):
+        mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        mommy.make('Transaction', amount=Decimal('5.0'), date=self.day, category=self.category)
+
+        self.assertTotal(Decimal('15.0'), 2)
+
+    def test_changed_transaction_updates_the_total(self):
+        transaction = mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        transaction.amount = Decimal('4.0')
+        transaction.save()
+
+        self.assertTotal(Decimal('4.0'), 1)
+
+    def test_transaction_moved_to_another_month(self):
+        transaction = mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        transaction.date = date(2014, 4, 1)
+        transaction.save()
+
+        self.assertTotal(Decimal('0.0'), 0)
+        self.assertTotal(Decimal('10.0'), 1, month=4)
+
+    def test_soft_deleted_transaction_is_removed_from_the_total(self):
+        transaction = mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        mommy.make('Transaction', amount=Decimal('5.0'), date=self.day, category=self.category)
+        transaction.delete()
+
+        self.assertTotal(Decimal('5.0'), 1)
+
+    def test_hard_deleted_category_leaves_no_total(self):
+        from category.models import Category
+        from transaction.models import MonthlyCategoryTotal
+
+        mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category, _quantity=2)
+        Category.objects.filter(pk=self.category.pk).delete()
+
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+
+    def test_hard_deleted_transaction_is_removed_from_the_total(self):
         from transaction.models import Transaction
 
-        t1 = mommy.make('Transaction')
-        t2 = mommy.make('Transaction', date=t1.date - timedelta(days=35))
-        month_1 = t1.date.replace(day=1)
-        month_2 = t2.date.replace(day=1)
+        mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        Transaction.objects.all().delete()
+
+        self.assertTotal(Decimal('0.0'), 0)
+
+    def test_amounts_by_category_with_partial_months(self):
+        from transaction.models import MonthlyCategoryTotal
+
+        mommy.make('Transaction', amount=Decimal('1.0'), date=date(2014, 2, 27), category=self.category)
+        mommy.make('Transaction', amount=Decimal('2.0'), date=date(2014, 2, 28), category=self.category)
+        mommy.make('Transaction', amount=Decimal('4.0'), date=date(2014, 3, 1), category=self.category)
+        mommy.make('Transaction', amount=Decimal('8.0'), date=date(2014, 4, 30), category=self.category)
+        mommy.make('Transaction', amount=Decimal('16.0'), date=date(2014, 5, 1), category=self.category)
+
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(date(2014, 2, 28), date(2014, 4, 30), [self.category.pk])
+
+        self.assertEqual({self.category.pk: Decimal('14.0')}, amounts)
+
+    def test_amounts_by_category_inside_a_month(self):
+        from transaction.models import MonthlyCategoryTotal
+
+        mommy.make('Transaction', amount=Decimal('1.0'), date=self.day, category=self.category)
+        mommy.make('Transaction', amount=Decimal('2.0'), date=self.day + timedelta(days=1), category=self.category)
+
+        amounts = MonthlyCategoryTotal.objects.amounts_by_category(self.day, self.day, [self.category.pk])
+
+        self.assertEqual({self.category.pk: Decimal('1.0')}, amounts)
+
+    def test_rebuild(self):
+        from transaction.models import MonthlyCategoryTotal
+
+        mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        mommy.make('Transaction', amount=Decimal('5.0'), date=self.day, category=self.category)
+        mommy.make('Transaction', amount=Decimal('5.0'), date=self.day, category=self.category, is_deleted=True)
+        MonthlyCategoryTotal.objects.all().update(amount=0, count=0)
+
+        self.assertEqual(1, MonthlyCategoryTotal.objects.rebuild())
+        self.assertTotal(Decimal('15.0'), 2)
+
+    def test_months_with_transactions(self):
+        from transaction.models import MonthlyCategoryTotal, Transaction
+
+        mommy.make('Transaction', date=self.day, category=self.category)
+        mommy.make('Transaction', date=date(2014, 1, 20), transaction_type=Transaction.INCOME)
+        mommy.make('Transaction', date=date(2013, 12, 1), is_deleted=True)
+        deleted = mommy.make('Transaction', date=date(2013, 11, 1))
+        deleted.delete()
+
+        self.assertEqual([date(2014, 3, 1), date(2014, 1, 1)], MonthlyCategoryTotal.objects.months())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'months-tests'}})
+    def test_months_are_cached_until_a_transaction_changes(self):
+        from base.cache import get_budget_cache
+        from transaction.models import MonthlyCategoryTotal
+
+        get_budget_cache().clear()
+        transaction = mommy.make('Transaction', date=self.day, category=self.category)
+        MonthlyCategoryTotal.objects.months()
+
+        with self.assertNumQueries(0):
+            self.assertEqual([date(2014, 3, 1)], MonthlyCategoryTotal.objects.months())
+
+        transaction.date = date(2014, 5, 1)
+        transaction.save()
+
+        self.assertEqual([date(2014, 5, 1)], MonthlyCategoryTotal.objects.months())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'period-totals-tests'}})
+    def test_period_totals_are_refreshed_by_their_months_only(self):
+        from base.cache import get_budget_cache
+        from transaction.models import MonthlyCategoryTotal
+
+        get_budget_cache().clear()
+        mommy.make('Transaction', amount=Decimal('10.0'), date=self.day, category=self.category)
+        first_quarter = (date(2014, 1, 1), date(2014, 3, 1))
+
+        self.assertEqual({self.category.pk: Decimal('10.0')}, MonthlyCategoryTotal.objects.period_totals(*first_quarter))
+
+        mommy.make('Transaction', amount=Decimal('5.0'), date=date(2014, 4, 1), category=self.category)
+
+        with self.assertNumQueries(0):
+            self.assertEqual({self.category.pk: Decimal('10.0')}, MonthlyCategoryTotal.objects.period_totals(*first_quarter))
+
+        mommy.make('Transaction', amount=Decimal('5.0'), date=self.day, category=self.category)
+
+        self.assertEqual({self.category.pk: Decimal('15.0')}, MonthlyCategoryTotal.objects.period_totals(*first_quarter))
+
+    def assertTotal(self, amount, count, month=3):
+        from transaction.models import MonthlyCategoryTotal, Transaction
+
+        total = MonthlyCategoryTotal.objects.filter(year=2014,
+                                                    month=month,
+                                                    category=self.category,
+                                                    transaction_type=Transaction.EXPENSE)
+        total = total.values_list('amount', 'count').first() or (Decimal('0.0'), 0)
 
-        self.assertEqual(2, Transaction.months.count())
-        self.assertIn(month_1, Transaction.months.all())
-        self.assertIn(month_2, Transaction.months.all())
+        self.assertEqual(amount, total[0])
+        self.assertEqual(count, total[1])
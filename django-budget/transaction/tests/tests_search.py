@@ -0,0 +1,128 @@
+from __future__ import unicode_literals
+
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from mock import patch
+from model_mommy import mommy
+
+
+class SearchTransactionsTest(TestCase):
+
+    def test_index_follows_the_changes(self):
+        transaction = mommy.make('Transaction', notes='Lunch at the cafe')
+
+        self.assertEqual([transaction], self.search('lunch'))
+
+        transaction.notes = 'Dinner'
+        transaction.save()
+        self.assertEqual([], self.search('lunch'))
+        self.assertEqual([transaction], self.search('dinner'))
+
+        type(transaction).objects.filter(pk=transaction.pk).delete()
+        self.assertEqual([], self.search('dinner'))
+
+    def test_every_word_is_a_required_prefix(self):
+        lunch = mommy.make('Transaction', notes='Lunch at the caf\xe9')
+        mommy.make('Transaction', notes='Lunch at home')
+
+        self.assertEqual([lunch], self.search('lun CAFE'))
+
+    def test_best_matches_first(self):
+        once = mommy.make('Transaction', notes='Spam and eggs, and a lot of other things to eat')
+        twice = mommy.make('Transaction', notes='Spam spam')
+
+        self.assertEqual([twice, once], self.search('spam'))
+
+    def test_operators_are_plain_words(self):
+        transaction = mommy.make('Transaction', notes='Spam or eggs')
+
+        self.assertEqual([transaction], self.search('spam" OR (eggs'))
+        self.assertEqual([], self.search('spam NOT'))
+
+    def test_other_filters_still_apply(self):
+        from transaction.models import Transaction
+
+        mommy.make('Transaction', notes='Spam', is_deleted=True)
+        transaction = mommy.make('Transaction', notes='Spam')
+
+        self.assertEqual([transaction], self.search('spam', Transaction.active.all()))
+        self.assertEqual(1, self.search_queryset('spam', Transaction.active.all()).count())
+
+    def test_search_uses_the_full_text_index(self):
+        from django.db import connection
+
+        from transaction.models import Transaction
+
+        sql, params = self.search_queryset('spam', Transaction.active.all()).query.sql_with_params()
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN QUERY PLAN %s' % sql, params)
+
+        self.assertIn('VIRTUAL TABLE INDEX', ' '.join(row[-1] for row in cursor.fetchall()))
+
+    def test_imported_transactions_are_indexed(self):
+        from transaction.importers import import_transactions
+
+        category = mommy.make('Category', slug='food')
+        import_transactions([(2, {'date': '2014-01-10', 'category': 'food', 'amount': '10.0',
+                                  'transaction_type': 'expense', 'notes': 'Imported spam'})])
+
+        self.assertEqual(['Imported spam'], [t.notes for t in self.search('spam')])
+        self.assertEqual(category, self.search('spam')[0].category)
+
+    def test_archived_transactions_leave_the_index(self):
+        from transaction.archive import archive_transactions
+        from transaction.models import Transaction
+
+        transaction = mommy.make('Transaction', notes='Spam')
+        archive_transactions(Transaction.objects.filter(pk=transaction.pk))
+
+        self.assertEqual([], self.search('spam'))
+
+    def test_fallback_without_the_index(self):
+        first = mommy.make('Transaction', notes='Lunch at the cafe')
+        mommy.make('Transaction', notes='Lunch at home')
+
+        with patch('transaction.search.is_available', return_value=False):
+            self.assertEqual([first], self.search('lun cafe'))
+
+    def test_rebuild_command(self):
+        from django.core.management import call_command
+        from transaction.search import FTS_TABLE
+
+        transaction = mommy.make('Transaction', notes='Spam')
+        self.execute('DELETE FROM %s' % FTS_TABLE)
+        self.assertEqual([], self.search('spam'))
+
+        stdout = StringIO()
+        call_command('rebuild_search_index', stdout=stdout)
+
+        self.assertIn('Indexed', stdout.getvalue())
+        self.assertEqual([transaction], self.search('spam'))
+
+    def test_admin_search(self):
+        from django.contrib.admin import site
+
+        from transaction.admin import TransactionAdmin
+        from transaction.models import Transaction
+
+        transaction = mommy.make('Transaction', notes='Spam')
+        mommy.make('Transaction', notes='Eggs')
+        queryset, distinct = TransactionAdmin(Transaction, site).get_search_results(None, Transaction.objects.all(), 'spam')
+
+        self.assertEqual([transaction], list(queryset))
+        self.assertFalse(distinct)
+
+    def search(self, terms, queryset=None):
+        return list(self.search_queryset(terms, queryset))
+
+    def search_queryset(self, terms, queryset=None):
+        from transaction.models import Transaction
+        from transaction.search import search_transactions
+
+        return search_transactions(queryset if queryset is not None else Transaction.objects.all(), terms)
+
+    def execute(self, sql):
+        from django.db import connection
+
+        connection.cursor().execute(sql)
@@ -5,6 +5,7 @@ from django.contrib.messages.middleware import MessageMiddleware
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.core.paginator import Page, Paginator
 from django.core.urlresolvers import reverse
+from django.test.utils import override_settings
 
 from djet.testcases import MiddlewareType
 from model_mommy import mommy
@@ -55,8 +56,10 @@ class TransactionListViewTest(BaseTestCase):
         self.assertIn(transaction, response.context_data['transactions'])
 
     def test_view_pagination(self):
+        from datetime import date, timedelta
+
         mommy.make('Transaction', _quantity=10)
-        transaction = mommy.make('Transaction')
+        transaction = mommy.make('Transaction', date=date.today() - timedelta(days=1))
 
         url = '%s?page=2' % self.url
         request = self.factory.get(path=url, user=self.mock_user)
@@ -69,6 +72,34 @@ class TransactionListViewTest(BaseTestCase):
         self.assertEqual(1, response.context_data['transactions'].count())
         self.assertIn(transaction, response.context_data['transactions'])
 
+    @override_settings(BUDGET_CURSOR_PAGINATION=True)
+    def test_view_cursor_pagination(self):
+        from base.pagination import CursorPage
+
+        transactions = mommy.make('Transaction', _quantity=11)
+        response = self.get()
+        page = response.context_data['page_obj']
+
+        self.assertIsInstance(page, CursorPage)
+        self.assertTrue(response.context_data['is_paginated'])
+        self.assertEqual(10, len(response.context_data['transactions']))
+        self.assertContains(response, '?cursor=%s' % page.next_cursor)
+
+        request = self.factory.get(path=self.url, data={'cursor': page.next_cursor}, user=self.mock_user)
+        response = self.view(request)
+        response.render()
+
+        self.assertEqual([transactions[0]], response.context_data['transactions'])
+        self.assertContains(response, '?cursor=%s' % response.context_data['page_obj'].previous_cursor)
+
+    @override_settings(BUDGET_CURSOR_PAGINATION=True)
+    def test_view_cursor_pagination_with_invalid_cursor(self):
+        from django.http import Http404
+
+        request = self.factory.get(path=self.url, data={'cursor': 'foo'}, user=self.mock_user)
+
+        self.assertRaises(Http404, self.view, request)
+
     def test_html_content_with_no_transaction(self):
         response = self.get()
 
@@ -103,8 +134,103 @@ class TransactionListViewTest(BaseTestCase):
         self.assertEqual(302, response.status_code)
         self.assertEqual('%s?next=%s' % (reverse('login'), self.url), response._headers['location'][1])
 
-    def get(self):
-        request = self.factory.get(path=self.url, user=self.mock_user)
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'transaction-list-tests'}})
+    def test_not_modified_until_a_transaction_changes(self):
+        category = mommy.make('Category')
+        etag = self.get()['ETag']
+
+        request = self.factory.get(path=self.url, user=self.mock_user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, self.view(request).status_code)
+
+        mommy.make('Transaction', category=category)
+
+        request = self.factory.get(path=self.url, user=self.mock_user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, self.view(request).status_code)
+
+    def test_view_filters(self):
+        from datetime import date
+        from decimal import Decimal
+
+        from transaction.models import Transaction
+
+        category = mommy.make('Category')
+        expected = mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('15.0'),
+                              notes='Lunch with Spam')
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('50.0'), notes='Spam')
+        mommy.make('Transaction', category=category, date=date(2014, 2, 10), amount=Decimal('15.0'), notes='Spam')
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('15.0'), notes='Eggs')
+        mommy.make('Transaction', date=date(2014, 1, 10), amount=Decimal('15.0'), notes='Spam')
+        mommy.make('Transaction', category=category, date=date(2014, 1, 10), amount=Decimal('15.0'), notes='Spam',
+                   transaction_type=Transaction.INCOME)
+
+        response = self.get(q='spam', start_date='2014-01-01', end_date='2014-01-31', category=category.slug,
+                            transaction_type='expense', min_amount='10', max_amount='20')
+
+        self.assertEqual([expected], list(response.context_data['transactions']))
+
+    def test_view_sorting(self):
+        from datetime import date
+        from decimal import Decimal
+
+        first = mommy.make('Transaction', date=date(2014, 1, 10), amount=Decimal('30.0'))
+        second = mommy.make('Transaction', date=date(2014, 1, 11), amount=Decimal('10.0'))
+        third = mommy.make('Transaction', date=date(2014, 1, 12), amount=Decimal('20.0'))
+
+        self.assertEqual([third, second, first], list(self.get().context_data['transactions']))
+        self.assertEqual([first, second, third], list(self.get(sort='date').context_data['transactions']))
+        self.assertEqual([second, third, first], list(self.get(sort='amount').context_data['transactions']))
+        self.assertEqual([first, third, second], list(self.get(sort='-amount').context_data['transactions']))
+
+    def test_view_search_lists_the_best_matches_first(self):
+        once = mommy.make('Transaction', notes='Spam and eggs, and a lot of other things to eat')
+        twice = mommy.make('Transaction', notes='Spam spam')
+        mommy.make('Transaction', notes='Eggs')
+
+        self.assertEqual([twice, once], list(self.get(q='spam').context_data['transactions']))
+        self.assertEqual([twice, once], list(self.get(q='spam', sort='-date').context_data['transactions']))
+
+    def test_view_facets(self):
+        spam = mommy.make('Category', name='Spam')
+        mommy.make('Transaction', category=spam, notes='Lunch', _quantity=2)
+        mommy.make('Transaction', notes='Dinner')
+
+        response = self.get(q='lunch')
+
+        self.assertEqual([2], [facet['count'] for facet in response.context_data['facets']['categories']])
+        self.assertContains(response, 'category=%s' % spam.slug)
+
+    def test_view_with_invalid_filters(self):
+        mommy.make('Transaction')
+        response = self.get(sort='notes', min_amount='spam')
+
+        self.assertEqual(0, response.context_data['transactions'].count())
+        self.assertIn('sort', response.context_data['filter_form'].errors)
+        self.assertIn('min_amount', response.context_data['filter_form'].errors)
+
+    def test_view_pagination_keeps_the_filters(self):
+        import re
+
+        from django.http import QueryDict
+
+        mommy.make('Transaction', notes='Spam', _quantity=11)
+        response = self.get(q='Spam', sort='amount')
+
+        href = re.search(r'href="\?([^"]*page=2[^"]*)"', response.content.decode('utf-8')).group(1)
+        self.assertEqual({'q': 'Spam', 'sort': 'amount', 'page': '2'}, QueryDict(href).dict())
+
+    @override_settings(BUDGET_CURSOR_PAGINATION=True)
+    def test_view_cursor_pagination_follows_the_sort(self):
+        from decimal import Decimal
+
+        transactions = [mommy.make('Transaction', amount=Decimal(amount)) for amount in range(11, 0, -1)]
+        page = self.get(sort='amount').context_data['page_obj']
+        response = self.get(sort='amount', cursor=page.next_cursor)
+
+        self.assertEqual([transactions[0]], response.context_data['transactions'])
+
+    def get(self, **params):
+        request = self.factory.get(path=self.url, data=params, user=self.mock_user)
         response = self.view(request)
         return response.render()
 
@@ -377,3 +503,90 @@ class TransactionDeleteViewTest(BaseTestCase):
         request = self.factory.post(path=url, user=self.mock_user)
         response = self.view(request, pk=transaction.id)
         return response
+
+
+class TransactionImportViewTest(BaseTestCase):
+    from transaction.views import TransactionImportView
+
+    url = reverse('transaction:transaction_import')
+    view_class = TransactionImportView
+    middleware_classes = [
+        SessionMiddleware,
+        (MessageMiddleware, MiddlewareType.PROCESS_REQUEST),
+    ]
+
+    def test_html_with_a_unbound_form(self):
+        request = self.factory.get(path=self.url, user=self.mock_user)
+        response = self.view(request).render()
+
+        self.assertNotContains(response, 'INVALID VARIABLE:')
+        self.assertContains(response, 'Import Transactions', count=2)
+        self.assertContains(response, 'id="id_file"')
+        self.assertContains(response, 'enctype="multipart/form-data"')
+
+    def test_import_csv(self):
+        from transaction.models import Transaction
+
+        mommy.make('Category', name='Food', slug='food')
+        request, response = self.post(b'date,category,amount\n2014-03-01,Food,10.50\n')
+
+        self.assert_redirect(response, reverse('transaction:transaction_list'))
+        self.assert_message_exists(request, messages.SUCCESS, '1 transactions were imported successfuly!')
+        self.assertEqual(1, Transaction.objects.count())
+
+    def test_show_import_error(self):
+        from transaction.models import Transaction
+
+        _, response = self.post(b'date,category,amount\n2014-03-01,Food,10.50\n')
+        response.render()
+
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'Line 2: The category Food does not exist.')
+        self.assertEqual(0, Transaction.objects.count())
+
+    def post(self, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        form_data = {'file': SimpleUploadedFile('transactions.csv', content), 'file_format': 'csv'}
+        request = self.factory.post(path=self.url, data=form_data, user=self.mock_user)
+        return request, self.view(request)
+
+
+class TransactionExportViewTest(BaseTestCase):
+    from transaction.views import TransactionExportView
+
+    url = reverse('transaction:transaction_export')
+    view_class = TransactionExportView
+
+    def test_streams_csv(self):
+        transaction = mommy.make('Transaction')
+        request = self.factory.get(path=self.url, user=self.mock_user)
+        response = self.view(request)
+        content = b''.join(response.streaming_content)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('text/csv', response['Content-Type'])
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(2, len(content.splitlines()))
+        self.assertIn(('%d,' % transaction.pk).encode('utf-8'), content)
+
+    def test_filter_by_type(self):
+        from transaction.models import Transaction
+
+        mommy.make('Transaction')
+        request = self.factory.get(path=self.url, data={'transaction_type': Transaction.INCOME}, user=self.mock_user)
+        response = self.view(request)
+
+        self.assertEqual(1, len(b''.join(response.streaming_content).splitlines()))
+
+    def test_invalid_filter(self):
+        request = self.factory.get(path=self.url, data={'start_date': 'foo'}, user=self.mock_user)
+        response = self.view(request)
+
+        self.assertEqual(400, response.status_code)
+
+    def test_view_redirect_if_anonymous(self):
+        request = self.factory.get(path=self.url, user=self.anonymous_user)
+        response = self.view(request)
+
+        self.assertEqual(302, response.status_code)
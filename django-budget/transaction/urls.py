@@ -7,6 +7,8 @@ urlpatterns = patterns(
     'transaction.views',
     url(r'^$', 'transaction_list', name='transaction_list'),
     url(r'^add/$', 'transaction_add', name='transaction_add'),
+    url(r'^import/$', 'transaction_import', name='transaction_import'),
+    url(r'^export/$', 'transaction_export', name='transaction_export'),
     url(r'^edit/(?P<pk>\d+)/$', 'transaction_edit', name='transaction_edit'),
     url(r'^delete/(?P<pk>\d+)/$', 'transaction_delete', name='transaction_delete'),
 )
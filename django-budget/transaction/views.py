@@ -1,22 +1,73 @@
 from __future__ import unicode_literals
 
+from django.conf import settings
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.urlresolvers import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.contrib import messages
+from django.forms.forms import NON_FIELD_ERRORS
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views.generic import CreateView, DeleteView, FormView, ListView, UpdateView, View
 from django.utils.translation import ugettext_lazy as _
 
 from braces.views import LoginRequiredMixin
 
-from .forms import TransactionForm
+from base.pagination import CursorPaginationMixin
+from base.views import ConditionalGetMixin
+from .exporters import export_csv, filter_transactions
+from .facets import cached_transaction_facets
+from .forms import TransactionExportForm, TransactionForm, TransactionImportForm, TransactionListForm
+from .importers import TransactionImportError, import_transactions, read_csv, read_ofx
 from .models import Transaction
 
 
-class TransactionListView(LoginRequiredMixin, ListView):
+class TransactionListView(LoginRequiredMixin, ConditionalGetMixin, CursorPaginationMixin, ListView):
     model = Transaction
     template_name = 'transaction/list.html'
     context_object_name = 'transactions'
     queryset = Transaction.active.all().select_related()
     paginate_by = 10
+    cursor_ordering = ('-date', '-id')
+    # Cheaper than aggregating the whole ledger, and the page shows the
+    # names of the categories too.
+    validator_versions = ('transaction', 'category')
+
+    def get_cursor_pagination(self):
+        return getattr(settings, 'BUDGET_CURSOR_PAGINATION', False)
+
+    def get_cursor_ordering(self):
+        # The ranking of a search is not a column to seek on.
+        return self.get_filter_form().get_ordering() or TransactionListForm.SORTS[TransactionListForm.DEFAULT_SORT]
+
+    def get_filter_form(self):
+        if not hasattr(self, 'filter_form'):
+            self.filter_form = TransactionListForm(self.request.GET)
+
+        return self.filter_form
+
+    def get_queryset(self):
+        """
+        The transactions matching the filters of the query string, in the
+        chosen order, or none when the filters are invalid.
+        """
+        queryset = super(TransactionListView, self).get_queryset()
+        form = self.get_filter_form()
+
+        if not form.is_valid():
+            return queryset.none()
+
+        queryset = form.filter(queryset)
+        ordering = form.get_ordering()
+        return queryset.order_by(*ordering) if ordering else queryset
+
+    def get_context_data(self, **kwargs):
+        context = super(TransactionListView, self).get_context_data(**kwargs)
+        form = self.get_filter_form()
+        context['filter_form'] = form
+
+        if form.is_valid():
+            context['facets'] = cached_transaction_facets(self.object_list, form.cleaned_data)
+
+        return context
 
 transaction_list = TransactionListView.as_view()
 
@@ -47,3 +98,46 @@ class TransactionDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy('transaction:transaction_list')
 
 transaction_delete = TransactionDeleteView.as_view()
+
+
+class TransactionImportView(LoginRequiredMixin, FormView):
+    form_class = TransactionImportForm
+    template_name = 'transaction/import.html'
+    success_url = reverse_lazy('transaction:transaction_list')
+    readers = {TransactionImportForm.CSV: read_csv,
+               TransactionImportForm.OFX: read_ofx}
+
+    def form_valid(self, form):
+        reader = self.readers[form.cleaned_data['file_format']]
+
+        try:
+            count = import_transactions(reader(form.cleaned_data['file']),
+                                        default_category=form.cleaned_data['category'])
+
+        except (TransactionImportError, UnicodeDecodeError) as e:
+            form._errors[NON_FIELD_ERRORS] = form.error_class([e])
+            return self.form_invalid(form)
+
+        messages.success(self.request, _('%d transactions were imported successfuly!') % count)
+        return super(TransactionImportView, self).form_valid(form)
+
+transaction_import = TransactionImportView.as_view()
+
+
+class TransactionExportView(LoginRequiredMixin, View):
+    """
+    Streams the active transactions as CSV, filtered by the
+    TransactionExportForm fields in the query string.
+    """
+    def get(self, request, *args, **kwargs):
+        form = TransactionExportForm(request.GET)
+
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+
+        queryset = filter_transactions(Transaction.active.all(), **form.cleaned_data)
+        response = StreamingHttpResponse(export_csv(queryset), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="transactions.csv"'
+        return response
+
+transaction_export = TransactionExportView.as_view()